@@ -2,27 +2,145 @@
 Analytics API endpoints
 Provides insights, statistics, and visualizations
 """
-from fastapi import APIRouter, HTTPException
-from typing import Dict, List
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List, Optional
 from collections import Counter
+from datetime import datetime, timedelta, timezone
 import logging
 
+from app.core.config import settings
 from app.core.database import get_collection
 from app.models.schemas import AnalyticsResponse
+from app.services.keyword_service import get_keyword_service
+from app.services.downsampling import dominant_buckets, lttb
+from app.services.org_analytics_service import get_org_analytics_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+@router.get("/trending")
+async def get_trending_terms(
+    days: int = Query(7, ge=1, le=90),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Get terms trending across all sessions
+    Compares the last `days` with the window before it
+    """
+    try:
+        keyword_service = get_keyword_service()
+        return {
+            "days": days,
+            "terms": await keyword_service.trending_terms(days, limit)
+        }
+
+    except Exception as e:
+        logger.error(f"Trending terms error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/org/speakers")
+async def get_org_speakers(
+    start: Optional[datetime] = Query(None, description="Inclusive start (default: ORG_ANALYTICS_DEFAULT_DAYS ago)"),
+    end: Optional[datetime] = Query(None, description="Exclusive end (default: now)"),
+    speakers: Optional[str] = Query(None, description="Comma separated speaker labels"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Speaking time, share, words and sessions per speaker across sessions
+    """
+    start, end = _date_range(start, end)
+    try:
+        return {
+            "start": start,
+            "end": end,
+            "speakers": await get_org_analytics_service().speaker_report(start, end, _speaker_list(speakers), limit)
+        }
+
+    except Exception as e:
+        logger.error(f"Org speaker analytics error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/org/emotions")
+async def get_org_emotions(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    interval: str = Query("day", pattern="^(day|week|month)$"),
+    speakers: Optional[str] = Query(None, description="Comma separated speaker labels")
+):
+    """
+    Seconds spoken in each emotion per day, week or month
+    """
+    start, end = _date_range(start, end)
+    try:
+        return {
+            "start": start,
+            "end": end,
+            "interval": interval,
+            "periods": await get_org_analytics_service().emotion_trend(start, end, interval, _speaker_list(speakers))
+        }
+
+    except Exception as e:
+        logger.error(f"Org emotion analytics error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/org/volume")
+async def get_org_volume(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    interval: str = Query("day", pattern="^(day|week|month)$"),
+    speakers: Optional[str] = Query(None, description="Only sessions with any of these speakers")
+):
+    """
+    Meeting volume (sessions, recorded and speech time) per day, week or month
+    """
+    start, end = _date_range(start, end)
+    try:
+        return {
+            "start": start,
+            "end": end,
+            "interval": interval,
+            "periods": await get_org_analytics_service().meeting_volume(start, end, interval, _speaker_list(speakers))
+        }
+
+    except Exception as e:
+        logger.error(f"Org volume analytics error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _date_range(start: Optional[datetime], end: Optional[datetime]):
+    """Apply defaults and normalize to the naive UTC datetimes stored in Mongo"""
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=settings.ORG_ANALYTICS_DEFAULT_DAYS)
+    start, end = (
+        value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+        for value in (start, end)
+    )
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+def _speaker_list(speakers: Optional[str]) -> Optional[List[str]]:
+    return [name.strip() for name in speakers.split(",") if name.strip()] if speakers else None
+
 @router.get("/{session_id}", response_model=AnalyticsResponse)
-async def get_analytics(session_id: str):
+async def get_analytics(
+    session_id: str,
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Max points per timeline series"),
+    width: Optional[int] = Query(None, ge=3, le=20000, description="Chart width in pixels (alternative to points)")
+):
     """
     Get comprehensive analytics for a session
     - Speaker statistics
     - Emotion distribution
     - Conversation intensity
     - Top keywords
+    With points or width, the emotion timeline is bucketed (dominant emotion and
+    speaker per bucket) and intensity is downsampled with LTTB
     """
     try:
+        resolution = points or (
+            max(3, width // settings.ANALYTICS_PIXELS_PER_POINT) if width else None
+        )
+
         collection = get_collection("transcriptions")
         session = await collection.find_one({"session_id": session_id})
         
@@ -35,13 +153,13 @@ async def get_analytics(session_id: str):
         speaker_stats = _calculate_speaker_stats(segments)
         
         # Emotion timeline
-        emotion_timeline = _build_emotion_timeline(segments)
+        emotion_timeline = _build_emotion_timeline(segments, resolution, session.get('duration'))
         
-        # Top keywords
-        top_keywords = _extract_top_keywords(segments)
+        # Top keywords (TF-IDF against the whole corpus)
+        top_keywords = await get_keyword_service().session_keywords(session)
         
         # Conversation intensity (words per minute over time)
-        intensity = _calculate_intensity(segments)
+        intensity = _calculate_intensity(segments, resolution)
         
         return {
             "session_id": session_id,
@@ -52,6 +170,8 @@ async def get_analytics(session_id: str):
             "conversation_intensity": intensity
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -88,8 +208,11 @@ def _calculate_speaker_stats(segments: List[Dict]) -> List[Dict]:
         for data in speaker_data.values()
     ]
 
-def _build_emotion_timeline(segments: List[Dict]) -> List[Dict]:
-    """Build timeline of emotions throughout conversation"""
+def _build_emotion_timeline(segments: List[Dict], resolution: Optional[int] = None, duration: float = None) -> List[Dict]:
+    """Build timeline of emotions throughout conversation, bucketed to `resolution` points"""
+    if resolution and len(segments) > resolution:
+        return dominant_buckets(segments, resolution, duration)
+
     return [
         {
             "timestamp": seg['start_time'],
@@ -99,44 +222,37 @@ def _build_emotion_timeline(segments: List[Dict]) -> List[Dict]:
         for seg in segments
     ]
 
-def _extract_top_keywords(segments: List[Dict], limit: int = 10) -> List[str]:
-    """Extract most frequent meaningful words"""
-    # Combine all text
-    all_text = ' '.join([seg['text'] for seg in segments]).lower()
-    
-    # Simple word frequency (exclude common words)
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'is', 'was', 'are', 'were'}
-    words = [w for w in all_text.split() if w not in stop_words and len(w) > 3]
-    
-    word_counts = Counter(words)
-    return [word for word, _ in word_counts.most_common(limit)]
-
-def _calculate_intensity(segments: List[Dict]) -> List[Dict]:
+def _calculate_intensity(segments: List[Dict], resolution: Optional[int] = None) -> List[Dict]:
     """Calculate conversation intensity (words per minute) over time"""
     if not segments:
         return []
     
-    # Group segments into 30-second windows
-    window_size = 30
+    # Group segments into fixed windows in a single pass
+    window_size = settings.ANALYTICS_INTENSITY_WINDOW
     max_time = segments[-1]['end_time']
-    intensity_data = []
+    windows = max(0, -(-int(max_time) // window_size))
+    words = [0] * windows
     
-    for window_start in range(0, int(max_time), window_size):
-        window_end = window_start + window_size
-        
-        # Count words in this window
-        words_in_window = sum(
-            len(seg['text'].split())
-            for seg in segments
-            if seg['start_time'] >= window_start and seg['start_time'] < window_end
+    for seg in segments:
+        index = int(seg['start_time'] // window_size)
+        if 0 <= index < windows:
+            words[index] += len(seg['text'].split())
+    
+    # Words per minute
+    intensity_data = [
+        {
+            "timestamp": index * window_size,
+            "intensity": (count / window_size) * 60
+        }
+        for index, count in enumerate(words)
+    ]
+    
+    if resolution and len(intensity_data) > resolution:
+        kept = lttb(
+            [point["timestamp"] for point in intensity_data],
+            [point["intensity"] for point in intensity_data],
+            resolution
         )
-        
-        # Words per minute
-        wpm = (words_in_window / window_size) * 60
-        
-        intensity_data.append({
-            "timestamp": window_start,
-            "intensity": wpm
-        })
+        intensity_data = [intensity_data[index] for index in kept]
     
     return intensity_data
@@ -1,16 +1,33 @@
- """  
-Chatbot API endpoints 
-Allows users to ask questions about transcripts 
-"""  
+"""
+Chatbot API endpoints
+Allows users to ask questions about transcripts
+"""
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import ChatMessage, ChatResponse
 from app.services.chatbot_service import get_chatbot_service
 from app.core.database import get_collection
+from app.core.concurrency import PRIORITY_INTERACTIVE, AdmissionRejected, get_admission_controller
+from app.core.sse import sse_response
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+async def _load_transcript(session_id: str):
+    """Fetch a session and render its transcript for the prompt"""
+    collection = get_collection("transcriptions")
+    session = await collection.find_one({"session_id": session_id})
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Build full transcript 
+    transcript = "\n".join([
+        f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}"
+        for seg in session['segments']
+    ])
+    return session, transcript
+
 @router.post("/ask", response_model=ChatResponse)
 async def ask_question(message: ChatMessage):
     """
@@ -21,25 +38,17 @@ async def ask_question(message: ChatMessage):
     - "Summarize Speaker 2's points"
     """
     try:
-        # Get session transcript
-        collection = get_collection("transcriptions")
-        session = await collection.find_one({"session_id": message.session_id})
-        
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Build full transcript 
-        transcript = "\n".join([
-            f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}"
-            for seg in session['segments']
-        ])
+        session, transcript = await _load_transcript(message.session_id)
         
         # Get answer from chatbot
         chatbot = get_chatbot_service() 
-        result = chatbot.answer_question(
+        result = await get_admission_controller().run(
+            "llm",
+            chatbot.answer_question,
             message.question,
             transcript,
-            session['segments']
+            session['segments'],
+            priority=PRIORITY_INTERACTIVE
         )
         
         return {
@@ -47,6 +56,41 @@ async def ask_question(message: ChatMessage):
             "relevant_segments": result['relevant_segments']
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Chatbot error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ask/stream")
+async def ask_question_stream(message: ChatMessage):
+    """
+    Ask a question and stream the answer as Server-Sent Events
+    Events: segments (relevant_segments, sent first), token (one per delta), then done or error
+    Disconnecting cancels the generation
+    """
+    try:
+        session, transcript = await _load_transcript(message.session_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Chatbot error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    chatbot = get_chatbot_service()
+
+    async def events():
+        # The llm slot is held for the whole generation and released on disconnect
+        try:
+            async with get_admission_controller().admit("llm", priority=PRIORITY_INTERACTIVE):
+                answer = chatbot.stream_answer(message.question, transcript, session['segments'])
+                try:
+                    async for event in answer:
+                        yield event
+                finally:
+                    # Close the Groq stream now rather than when the generator is collected
+                    await answer.aclose()
+        except AdmissionRejected as e:
+            yield "error", {"detail": e.detail, "retry_after": e.retry_after}
+
+    return sse_response(events())
@@ -4,19 +4,19 @@ Export transcripts to PDF, DOCX, TXT formats
 """
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import FileResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from docx import Document
+from starlette.background import BackgroundTask
 import os
 import logging
+import uuid
 
+from app.core.config import settings
+from app.core.concurrency import PRIORITY_INTERACTIVE, get_admission_controller
 from app.core.database import get_collection
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-EXPORT_DIR = "exports"
+EXPORT_DIR = settings.EXPORT_DIR
 os.makedirs(EXPORT_DIR, exist_ok=True)
 
 @router.get("/pdf/{session_id}")
@@ -24,38 +24,19 @@ async def export_pdf(session_id: str):
     """Export transcript as PDF"""
     try:
         session = await _get_session(session_id)
-        
-        # Create PDF
-        pdf_path = os.path.join(EXPORT_DIR, f"{session_id}.pdf")
-        doc = SimpleDocTemplate(pdf_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        story.append(Paragraph(f"Transcript - {session_id}", styles['Title']))
-        story.append(Spacer(1, 12))
-        
-        # Summary
-        if session.get('summary'):
-            story.append(Paragraph("Summary", styles['Heading2']))
-            story.append(Paragraph(session['summary'], styles['Normal']))
-            story.append(Spacer(1, 12))
-        
-        # Transcript
-        story.append(Paragraph("Transcript", styles['Heading2']))
-        for seg in session['segments']:
-            text = f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}"
-            story.append(Paragraph(text, styles['Normal']))
-            story.append(Spacer(1, 6))
-        
-        doc.build(story)
-        
+        pdf_path = await get_admission_controller().run(
+            "export", _write_pdf, session, priority=PRIORITY_INTERACTIVE
+        )
+
         return FileResponse(
             pdf_path,
             media_type='application/pdf',
-            filename=f"transcript_{session_id}.pdf"
+            filename=f"transcript_{session_id}.pdf",
+            background=BackgroundTask(_remove_export, pdf_path)
         )
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"PDF export error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -65,37 +46,19 @@ async def export_docx(session_id: str):
     """Export transcript as DOCX"""
     try:
         session = await _get_session(session_id)
-        
-        # Create DOCX
-        doc = Document()
-        doc.add_heading(f"Transcript - {session_id}", 0)
-        
-        # Summary
-        if session.get('summary'):
-            doc.add_heading('Summary', level=1)
-            doc.add_paragraph(session['summary'])
-        
-        # Action Items
-        if session.get('action_items'):
-            doc.add_heading('Action Items', level=1)
-            for item in session['action_items']:
-                doc.add_paragraph(f"• {item['task']}", style='List Bullet')
-        
-        # Transcript
-        doc.add_heading('Transcript', level=1)
-        for seg in session['segments']:
-            text = f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}"
-            doc.add_paragraph(text)
-        
-        docx_path = os.path.join(EXPORT_DIR, f"{session_id}.docx")
-        doc.save(docx_path)
-        
+        docx_path = await get_admission_controller().run(
+            "export", _write_docx, session, priority=PRIORITY_INTERACTIVE
+        )
+
         return FileResponse(
             docx_path,
             media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            filename=f"transcript_{session_id}.docx"
+            filename=f"transcript_{session_id}.docx",
+            background=BackgroundTask(_remove_export, docx_path)
         )
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"DOCX export error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -105,45 +68,129 @@ async def export_txt(session_id: str):
     """Export transcript as plain text"""
     try:
         session = await _get_session(session_id)
-        
-        # Build text content
-        lines = [f"Transcript - {session_id}", "=" * 50, ""]
-        
-        if session.get('summary'):
-            lines.append("SUMMARY")
-            lines.append(session['summary'])
-            lines.append("")
-        
-        if session.get('action_items'):
-            lines.append("ACTION ITEMS")
-            for item in session['action_items']:
-                lines.append(f"• {item['task']}")
-            lines.append("")
-        
-        lines.append("TRANSCRIPT")
-        for seg in session['segments']:
-            lines.append(f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}")
-        
-        txt_path = os.path.join(EXPORT_DIR, f"{session_id}.txt")
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-        
+        txt_path = await get_admission_controller().run(
+            "export", _write_txt, session, priority=PRIORITY_INTERACTIVE
+        )
+
         return FileResponse(
             txt_path,
             media_type='text/plain',
-            filename=f"transcript_{session_id}.txt"
+            filename=f"transcript_{session_id}.txt",
+            background=BackgroundTask(_remove_export, txt_path)
         )
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"TXT export error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _write_pdf(session: dict) -> str:
+    """Render the PDF export (blocking, runs in the threadpool)"""
+    # Imported on first use so workers that never export skip loading reportlab
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    session_id = session['session_id']
+    pdf_path = _export_path(session_id, "pdf")
+    doc = SimpleDocTemplate(pdf_path, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+
+    # Title
+    story.append(Paragraph(f"Transcript - {session_id}", styles['Title']))
+    story.append(Spacer(1, 12))
+
+    # Summary
+    if session.get('summary'):
+        story.append(Paragraph("Summary", styles['Heading2']))
+        story.append(Paragraph(session['summary'], styles['Normal']))
+        story.append(Spacer(1, 12))
+
+    # Transcript
+    story.append(Paragraph("Transcript", styles['Heading2']))
+    for seg in session['segments']:
+        text = f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}"
+        story.append(Paragraph(text, styles['Normal']))
+        story.append(Spacer(1, 6))
+
+    doc.build(story)
+    return pdf_path
+
+def _write_docx(session: dict) -> str:
+    """Render the DOCX export (blocking, runs in the threadpool)"""
+    from docx import Document
+
+    session_id = session['session_id']
+    doc = Document()
+    doc.add_heading(f"Transcript - {session_id}", 0)
+
+    # Summary
+    if session.get('summary'):
+        doc.add_heading('Summary', level=1)
+        doc.add_paragraph(session['summary'])
+
+    # Action Items
+    if session.get('action_items'):
+        doc.add_heading('Action Items', level=1)
+        for item in session['action_items']:
+            doc.add_paragraph(f"• {item['task']}", style='List Bullet')
+
+    # Transcript
+    doc.add_heading('Transcript', level=1)
+    for seg in session['segments']:
+        text = f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}"
+        doc.add_paragraph(text)
+
+    docx_path = _export_path(session_id, "docx")
+    doc.save(docx_path)
+    return docx_path
+
+def _write_txt(session: dict) -> str:
+    """Render the plain text export (blocking, runs in the threadpool)"""
+    session_id = session['session_id']
+
+    # Build text content
+    lines = [f"Transcript - {session_id}", "=" * 50, ""]
+
+    if session.get('summary'):
+        lines.append("SUMMARY")
+        lines.append(session['summary'])
+        lines.append("")
+
+    if session.get('action_items'):
+        lines.append("ACTION ITEMS")
+        for item in session['action_items']:
+            lines.append(f"• {item['task']}")
+        lines.append("")
+
+    lines.append("TRANSCRIPT")
+    for seg in session['segments']:
+        lines.append(f"{seg['speaker']} ({seg['start_time']:.1f}s): {seg['text']}")
+
+    txt_path = _export_path(session_id, "txt")
+    with open(txt_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    return txt_path
+
+def _export_path(session_id: str, extension: str) -> str:
+    """A file of its own per request, so concurrent exports never overwrite a file being sent"""
+    return os.path.join(EXPORT_DIR, f"{session_id}-{uuid.uuid4().hex}.{extension}")
+
+def _remove_export(path: str):
+    """Delete an export once its response has been sent"""
+    try:
+        os.remove(path)
+    except OSError:
+        logger.warning("Failed to remove export file: %s", path)
+
 async def _get_session(session_id: str):
     """Helper to get session from database"""
     collection = get_collection("transcriptions")
     session = await collection.find_one({"session_id": session_id})
-    
+
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    
+
     return session
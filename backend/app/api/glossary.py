@@ -0,0 +1,44 @@
+"""
+Glossary API endpoints
+Manage per-customer keyword glossaries used during transcription
+"""
+from fastapi import APIRouter, Body, HTTPException
+from typing import Dict
+import logging
+
+from app.services.glossary_service import get_glossary_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.put("/{glossary_id}")
+async def save_glossary(glossary_id: str, terms: Dict[str, str] = Body(..., embed=True)):
+    """
+    Create or replace a glossary
+    Body: {"terms": {"term": "category", ...}}
+    """
+    try:
+        glossary = await get_glossary_service().save_glossary(glossary_id, terms)
+        return {
+            "glossary_id": glossary_id,
+            "term_count": glossary["term_count"],
+            "updated_at": glossary["updated_at"]
+        }
+
+    except Exception as e:
+        logger.error(f"Glossary save error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{glossary_id}")
+async def get_glossary(glossary_id: str):
+    """Get a stored glossary"""
+    glossary = await get_glossary_service().get_glossary(glossary_id)
+
+    if not glossary:
+        raise HTTPException(status_code=404, detail="Glossary not found")
+
+    return {
+        "glossary_id": glossary_id,
+        "terms": glossary.get("terms", {}),
+        "updated_at": glossary.get("updated_at")
+    }
@@ -0,0 +1,48 @@
+"""
+Profiling API endpoints
+List, download and aggregate stored request profiles (admin only)
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+import logging
+
+from app.core.profiling import hot_functions, is_admin_token, list_profiles, profile_path
+
+logger = logging.getLogger(__name__)
+
+def require_admin(x_profile: Optional[str] = Header(None)):
+    """Allow only callers presenting the profiling admin token in the X-Profile header"""
+    if not is_admin_token(x_profile):
+        raise HTTPException(status_code=403, detail="Profiling requires the admin token")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("")
+async def get_profiles(limit: int = Query(50, ge=1, le=500)):
+    """List stored profiles, newest first"""
+    profiles = await run_in_threadpool(list_profiles)
+    return {"profiles": profiles[:limit], "total": len(profiles)}
+
+@router.get("/report")
+async def get_report(
+    path: Optional[str] = Query(None, description="Only include requests whose path starts with this"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime)$"),
+    limit: int = Query(30, ge=1, le=200)
+):
+    """Hot functions aggregated over stored profiles"""
+    try:
+        return await run_in_threadpool(hot_functions, path, sort, limit)
+    except Exception as e:
+        logger.error(f"Profile report error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{profile_id}")
+async def download_profile(profile_id: str):
+    """Download a profile in pstats format (open with snakeviz or pstats)"""
+    path = profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
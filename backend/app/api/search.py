@@ -0,0 +1,38 @@
+"""
+Search API endpoints
+Full-text search across all transcription sessions
+"""
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.services.search_service import get_search_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("")
+async def search_transcripts(
+    q: str = Query(..., min_length=1, description="Search terms"),
+    phrase: bool = Query(False, description="Match the terms as an exact phrase"),
+    speaker: Optional[str] = Query(None, description="Only return segments from this speaker"),
+    session_id: Optional[str] = Query(None, description="Only search within this session"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Search every session for segments mentioning the query
+    Returns ranked hits with timestamps and snippets
+    """
+    try:
+        search_service = get_search_service()
+        return await search_service.search(
+            q,
+            phrase=phrase,
+            speaker=speaker,
+            session_id=session_id,
+            limit=limit
+        )
+
+    except Exception as e:
+        logger.error(f"Search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
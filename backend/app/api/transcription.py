@@ -2,35 +2,69 @@
 Transcription API endpoints
 Handles audio upload, real-time streaming, and transcription processing
 """
-from fastapi import APIRouter, UploadFile, File, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import JSONResponse
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Form, Query, Request, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, List, Optional
 import aiofiles
+import asyncio
 import os
+import time
 import uuid
 from datetime import datetime
 import json
 import logging
 
-from app.services.transcription_service import get_transcription_service
-from app.services.emotion_service import get_emotion_service
-from app.services.summary_service import get_summary_service
-from app.services.diarization_service import get_diarization_service
+from app.services.transcription_service import MIME_EXTENSIONS, LanguageLock, get_transcription_service, is_supported_language
+from app.services.diarization_service import OnlineDiarizer, get_diarization_service
+from app.services.search_service import get_search_service
+from app.services.keyword_service import get_keyword_service
+from app.services.org_analytics_service import get_org_analytics_service
+from app.services.glossary_service import get_glossary_service
+from app.services.live_session_service import LiveSessionWriter
+from app.services.stream_buffer import BufferLimitExceeded, CarriedAudio, StreamBuffer, get_stream_budget
+from app.services.pipeline_service import build_session_document, build_speaker_stats, get_pipeline
+from app.services.artifact_store import StageRun
+from app.services.model_policy import ModelChoice, get_model_policy, probe_duration
+from app.services.event_bus import get_event_bus
+from app.services.audio_storage import AudioNotAvailable, get_audio_storage
+from app.core.concurrency import (
+    PRIORITY_INTERACTIVE,
+    PRIORITY_LIVE,
+    AdmissionRejected,
+    get_admission_controller
+)
+from app.core.config import settings
 from app.core.database import get_collection
+from app.core.metrics import stage_timer
+from app.core.responses import FastJSONResponse, not_modified, parse_fields, validators
+from app.core.sse import sse_response
 from app.models.schemas import TranscriptionResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Temporary storage for uploaded files
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = settings.AUDIO_HOT_DIR
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Progressive uploads running in the background (referenced so they are not collected)
+_background_tasks = set()
+
 @router.post("/upload", response_model=TranscriptionResponse)
-async def upload_audio(file: UploadFile = File(...)):
+async def upload_audio(
+    file: UploadFile = File(...),
+    glossary_id: Optional[str] = Form(None),
+    latency_target: Optional[float] = Form(None),
+    progressive: bool = Query(False, description="Return immediately and stream results from /events/{session_id}")
+):
     """
     Upload audio file and process transcription
     Supports: MP3, WAV, M4A, FLAC
+    Optional glossary_id selects a customer keyword glossary
+    Optional latency_target (seconds) lets the server trade model size for speed
+    With progressive=true the response is 202 with the session id and results
+    are published as Server-Sent Events while each stage completes
     """
     try:
         # Validate file type
@@ -48,84 +82,285 @@ async def upload_audio(file: UploadFile = File(...)):
             await out_file.write(content)
         
         logger.info(f"Processing audio file: {file.filename}")
-        
-        # Step 1: Transcribe audio 
-        transcription_service = get_transcription_service() 
-        transcription_result = transcription_service.transcribe_audio(file_path)
-        
-        # Step 2: Detect emotions for each segment
-        emotion_service = get_emotion_service()
-        segments = []
-
-        for seg in transcription_result['segments']:
-            emotion_data = emotion_service.detect_emotion(
-                file_path,
-                start_time=seg['start'],
-                end_time=seg['end']
-            )
 
-            segments.append({
-                "text": seg['text'],
-                "start_time": seg['start'],
-                "end_time": seg['end'],
-                "speaker": "Speaker 1",
-                "emotion": emotion_data['emotion'],
-                "confidence": seg.get('confidence', 0.9)
+        # Pick the Whisper model for the current load
+        model_stats = get_admission_controller().stats()["model"]
+        model_choice = get_model_policy().choose(
+            await run_in_threadpool(probe_duration, file_path),
+            latency_target,
+            queue_depth=model_stats["active"] + model_stats["queued"],
+            concurrency=model_stats["limit"]
+        )
+        logger.info(f"Using Whisper {model_choice.model_size} (beam {model_choice.beam_size}): {model_choice.reason}")
+
+        if progressive:
+            get_event_bus().open(session_id)
+            now = datetime.utcnow()
+            await get_collection("transcriptions").insert_one({
+                "_id": session_id,
+                "session_id": session_id,
+                "status": "processing",
+                "segments": [],
+                "language": None,
+                "duration": 0,
+                "audio": get_audio_storage().describe(file_path, file.filename),
+                "created_at": now,
+                "updated_at": now
             })
 
-        # Step 3: Identify speakers and assign to segments
-        diarization_service = get_diarization_service()
-        speaker_segments = diarization_service.identify_speakers(file_path)
+            task = asyncio.create_task(_process_progressively(session_id, file_path, model_choice, glossary_id))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
 
-        if speaker_segments:
-            for seg in segments:
-                seg["speaker"] = _match_speaker(seg, speaker_segments)
-        
-        # Step 4: Generate summary and action items
-        summary_service = get_summary_service()
-        full_transcript = transcription_result['text']
-        speakers = _build_speaker_stats(segments)
-        summary_data = summary_service.generate_summary(full_transcript, speakers)
-        keywords = summary_service.extract_keywords(full_transcript, segments)
-
-        # Step 5: Prepare response
-        response_data = {
-            "session_id": session_id,
-            "segments": segments,
-            "speakers": speakers,
-            "keywords": keywords,
-            "summary": summary_data.get('summary'),
-            "action_items": summary_data.get('action_items', []),
-            "language": transcription_result['language'],
-            "duration": segments[-1]['end_time'] if segments else 0,
-            "created_at": datetime.utcnow()
-        }
-        
-        # Step 6: Save to database
-        collection = get_collection("transcriptions")
-        await collection.insert_one({**response_data, "_id": session_id})
-        
-        logger.info(f"Transcription complete: {session_id}")
-        
-        return response_data
+            return JSONResponse(status_code=202, content={
+                "session_id": session_id,
+                "status": "processing",
+                "events": f"/api/transcription/events/{session_id}"
+            })
+
+        return await _process_upload(session_id, file_path, model_choice, glossary_id)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _process_upload(
+    session_id: str,
+    file_path: str,
+    model_choice: ModelChoice,
+    glossary_id: Optional[str],
+    publish: Optional[Callable[[str, dict], None]] = None,
+    artifacts: Optional[StageRun] = None,
+    audio: Optional[dict] = None,
+    created_at: Optional[datetime] = None,
+    ingest_keywords: bool = True
+) -> dict:
+    """
+    Run the pipeline for a saved upload, store the session and index it
+    Reprocessing passes the session's artifacts, stored audio and creation time
+    """
+    pipeline = get_pipeline()
+    admission = get_admission_controller()
+
+    # Stages already computed for this recording and configuration are reused
+    if artifacts is None:
+        artifacts = await run_in_threadpool(StageRun.for_file, file_path)
+
+    # Steps 1-3: Transcribe, detect emotions and identify speakers
+    analysis = await admission.run("upload", pipeline.analyze, file_path, model_choice, publish, artifacts, uses_model=True)
+    segments = analysis['segments']
+    
+    # Step 4: Generate summary, action items and keywords
+    glossary = await get_glossary_service().get_automaton(glossary_id)
+    insights = await admission.run(
+        "llm", pipeline.summarize, analysis['text'], segments, glossary, artifacts,
+        priority=PRIORITY_INTERACTIVE
+    )
+    if publish:
+        publish("summary", insights)
+
+    # Step 5: Prepare response
+    response_data = build_session_document(
+        session_id, analysis, insights,
+        audio=audio or get_audio_storage().describe(file_path, os.path.basename(file_path).split("_", 1)[-1]),
+        artifacts=artifacts,
+        **({"created_at": created_at} if created_at else {})
+    )
+    
+    # Step 6: Save to database (replaces the placeholder of progressive uploads)
+    collection = get_collection("transcriptions")
+    with stage_timer("db_write"):
+        await collection.replace_one({"_id": session_id}, {**response_data, "_id": session_id}, upsert=True)
+
+    # Step 7: Add segments to the cross-session search index
+    try:
+        with stage_timer("search_index"):
+            await get_search_service().index_session(session_id, segments, response_data["created_at"])
+    except Exception as e:
+        logger.error(f"Search indexing error for {session_id}: {str(e)}")
+
+    # Step 8: Fold the session into corpus keyword statistics (counted once per session);
+    # a reprocessed session only refreshes the term counts its analytics are ranked from
+    try:
+        with stage_timer("keyword_stats"):
+            keyword_service = get_keyword_service()
+            if ingest_keywords:
+                await keyword_service.ingest_session(session_id, segments, response_data["created_at"])
+            else:
+                await keyword_service.save_session_terms(session_id, keyword_service.count_terms(segments))
+    except Exception as e:
+        logger.error(f"Keyword statistics error for {session_id}: {str(e)}")
+
+    # Step 9: Summarize the session for org-wide analytics
+    try:
+        with stage_timer("org_stats"):
+            await get_org_analytics_service().ingest_session(
+                session_id, segments, response_data["created_at"],
+                response_data["duration"], response_data["language"]
+            )
+    except Exception as e:
+        logger.error(f"Org analytics error for {session_id}: {str(e)}")
+    
+    logger.info(f"Transcription complete: {session_id}")
+    
+    return response_data
+
+async def _process_progressively(session_id: str, file_path: str, model_choice: ModelChoice, glossary_id: Optional[str]):
+    """Background half of a progressive upload; every outcome ends in a done or error event"""
+    bus = get_event_bus()
+    try:
+        response_data = await _process_upload(
+            session_id, file_path, model_choice, glossary_id, publish=bus.publisher(session_id)
+        )
+        # Publishers run via call_soon_threadsafe; yield once so queued stage events go first
+        await asyncio.sleep(0)
+        bus.publish(session_id, "done", response_data)
+    except Exception as e:
+        logger.error(f"Progressive upload error for {session_id}: {str(e)}")
+        await asyncio.sleep(0)
+        bus.publish(session_id, "error", {
+            "detail": e.detail if isinstance(e, HTTPException) else str(e),
+            "retry_after": getattr(e, "retry_after", None)
+        })
+        try:
+            await get_collection("transcriptions").update_one(
+                {"_id": session_id},
+                {"$set": {"status": "failed", "error": str(e), "updated_at": datetime.utcnow()}}
+            )
+        except Exception as db_error:
+            logger.error(f"Could not mark {session_id} as failed: {str(db_error)}")
+
+@router.post("/session/{session_id}/reprocess", response_model=TranscriptionResponse)
+async def reprocess_session(
+    session_id: str,
+    model: Optional[str] = Query(None, description="Whisper model, defaults to the one the session used"),
+    beam_size: Optional[int] = Query(None, ge=1),
+    glossary_id: Optional[str] = Query(None)
+):
+    """
+    Re-run the pipeline on a session's retained audio
+    Stages whose configuration is unchanged reuse their stored artifacts, so a
+    failed session resumes after its last completed stage and a settings change
+    (VAD, model, summary prompt, ...) re-runs only the affected stages.
+    The returned session lists each stage's artifact and whether it was reused.
+    """
+    try:
+        collection = get_collection("transcriptions")
+        session = await collection.find_one({"session_id": session_id})
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        # Mark the session as processing for the whole run, so retention leaves
+        # its audio alone and a second reprocess of it is refused
+        previous_status = session.get("status", "completed")
+        claimed = await collection.update_one(
+            {"_id": session["_id"], "status": {"$nin": ["processing", "live"]}},
+            {"$set": {"status": "processing", "updated_at": datetime.utcnow()}}
+        )
+        if not claimed.matched_count:
+            raise HTTPException(status_code=409, detail="Session is still being processed")
+
+        try:
+            try:
+                audio = await get_audio_storage().open(session)
+            except AudioNotAvailable as e:
+                raise HTTPException(status_code=410, detail=str(e))
+
+            stored_model = session.get("model") or {}
+            model_choice = ModelChoice(
+                model or stored_model.get("model_size", settings.WHISPER_MODEL),
+                beam_size or stored_model.get("beam_size", 5),
+                reason="reprocess"
+            )
+
+            # Archived audio is re-encoded, so keep the hash of the original recording
+            artifacts = StageRun.from_dict(session.get("artifacts"))
+            if artifacts.audio_hash is None:
+                artifacts = await run_in_threadpool(StageRun.for_file, audio["path"])
+
+            logger.info(f"Reprocessing session {session_id} with Whisper {model_choice.model_size}")
+            return await _process_upload(
+                session_id, audio["path"], model_choice, glossary_id,
+                artifacts=artifacts,
+                audio={**audio, "last_accessed": datetime.utcnow()},
+                created_at=session.get("created_at"),
+                # Completed sessions are already in the corpus keyword statistics
+                ingest_keywords=previous_status != "completed"
+            )
+        except BaseException:
+            # The stored results are untouched until the run succeeds; hand them back as they were
+            await collection.update_one(
+                {"_id": session["_id"], "status": "processing"},
+                {"$set": {"status": previous_status, "updated_at": datetime.utcnow()}}
+            )
+            raise
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Reprocess error for {session_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/events/{session_id}")
+async def stream_events(session_id: str):
+    """
+    Server-Sent Events for a progressive upload
+    Events: segment (as decoded), transcript, emotions, speakers, summary, then done or error
+    Late subscribers replay the events published so far
+    """
+    bus = get_event_bus()
+    if bus.has(session_id):
+        return sse_response(bus.subscribe(session_id))
+
+    session = await get_collection("transcriptions").find_one({"session_id": session_id})
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    async def stored():
+        # History expired (or the job ran on another worker): report the stored state
+        status = session.get("status", "completed")
+        if status == "completed":
+            yield "done", session
+        elif status == "failed":
+            yield "error", {"detail": session.get("error", "Processing failed"), "retry_after": None}
+        else:
+            yield "status", {"status": status}
+
+    return sse_response(stored())
+
 @router.websocket("/stream")
 async def websocket_stream(websocket: WebSocket):
     """
     WebSocket endpoint for real-time audio streaming
     Client sends audio chunks, server responds with transcription
+    Buffered audio is transcribed and persisted every LIVE_COMMIT_SECONDS (or
+    LIVE_COMMIT_BYTES) while the stream runs and each window's speaker-labelled
+    segments are sent as a "partial" event; "final" carries the rest on stop
+    and the session is finalized on stop/disconnect
+    The start event may carry a language hint; otherwise the language is
+    detected once and locked for the session until an unlock event
     """
     await websocket.accept()
     logger.info("WebSocket connection established")
+
+    if get_stream_budget().exhausted:
+        logger.warning("Stream buffer budget exhausted - rejecting WebSocket connection")
+        await websocket.send_json({"event": "error", "detail": "Server is busy, retry later"})
+        await websocket.close(code=1013)
+        return
     
-    transcription_service = get_transcription_service("medium")
+    transcription_service = get_transcription_service(settings.WHISPER_LIVE_MODEL)
     session_id = str(uuid.uuid4())
-    buffer = bytearray()
+    buffer = StreamBuffer(session_id)
+    carry = CarriedAudio()
+    window_started = time.monotonic()
     mime_type = "audio/webm"
+    paused = False
+    writer = LiveSessionWriter(session_id)
+    diarizer = get_diarization_service().create_online_session()
+    language = LanguageLock()
 
     await websocket.send_json({
         "session_id": session_id,
@@ -133,6 +368,8 @@ async def websocket_stream(websocket: WebSocket):
     })
     
     try:
+        await writer.start()
+
         while True:
             message = await websocket.receive()
 
@@ -148,25 +385,223 @@ async def websocket_stream(websocket: WebSocket):
                 event = payload.get("event")
                 if event == "start":
                     mime_type = payload.get("mimeType", mime_type)
+                    if not buffer:
+                        buffer.suffix = MIME_EXTENSIONS.get(mime_type, ".webm")
+                    hint = (payload.get("language") or "").strip().lower()
+                    if hint:
+                        if not is_supported_language(hint):
+                            await websocket.send_json({"event": "error", "detail": f"Unsupported language: {hint}"})
+                            continue
+                        language.set(hint)
+                        writer.language = hint
+                        await websocket.send_json({"session_id": session_id, "event": "language", **language.to_dict()})
+                elif event == "unlock":
+                    language.unlock()
+                    await websocket.send_json({"session_id": session_id, "event": "language", **language.to_dict()})
                 elif event == "stop":
-                    text = transcription_service.transcribe_bytes(bytes(buffer), mime_type)
-                    buffer.clear()
+                    try:
+                        segments = await _commit_live_audio(
+                            writer, transcription_service, buffer, carry, diarizer, language, final=True
+                        )
+                    except AdmissionRejected as e:
+                        await websocket.send_json({
+                            "session_id": session_id,
+                            "event": "busy",
+                            "detail": e.detail,
+                            "retry_after": e.retry_after
+                        })
+                        continue
                     await websocket.send_json({
                         "session_id": session_id,
-                        "text": text,
+                        "text": " ".join(seg["text"] for seg in segments),
+                        "segments": segments,
+                        "language": language.to_dict(),
                         "event": "final",
                         "timestamp": datetime.utcnow().isoformat()
                     })
                 continue
 
             if "bytes" in message and message["bytes"]:
-                buffer.extend(message["bytes"])
+                chunk = message["bytes"]
+                if len(chunk) > settings.STREAM_MAX_CHUNK_BYTES:
+                    await websocket.send_json({"event": "error", "detail": "Audio chunk too large"})
+                    await websocket.close(code=1009)
+                    break
+
+                buffer.append(chunk)
+
+                if time.monotonic() - window_started >= settings.LIVE_COMMIT_SECONDS or len(buffer) >= settings.LIVE_COMMIT_BYTES:
+                    window_started = time.monotonic()
+                    try:
+                        segments = await _commit_live_audio(writer, transcription_service, buffer, carry, diarizer, language)
+                    except AdmissionRejected:
+                        # The audio stays buffered and goes with the next window
+                        logger.info(f"Model busy - deferring live window of {session_id}")
+                        segments = []
+                    if segments:
+                        await websocket.send_json({
+                            "session_id": session_id,
+                            "text": " ".join(seg["text"] for seg in segments),
+                            "segments": segments,
+                            "event": "partial",
+                            "timestamp": datetime.utcnow().isoformat()
+                        })
+
+                await writer.maybe_flush()
+
+                # Flow control: ask the client to hold chunks while we are behind
+                pressure = buffer.pressure
+                if not paused and pressure >= settings.STREAM_PAUSE_THRESHOLD:
+                    paused = True
+                    await websocket.send_json({"event": "flow", "action": "pause", "pressure": round(pressure, 3)})
+                elif paused and pressure <= settings.STREAM_RESUME_THRESHOLD:
+                    paused = False
+                    await websocket.send_json({"event": "flow", "action": "resume", "pressure": round(pressure, 3)})
     
+    except BufferLimitExceeded as e:
+        logger.warning(str(e))
+        await websocket.send_json({"event": "error", "detail": "Too much audio waiting for transcription"})
+        await websocket.close(code=1009)
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
         await websocket.close()
+    finally:
+        error = None
+        try:
+            # Audio received after the last stop still belongs to the session
+            if buffer or carry:
+                try:
+                    await _commit_live_audio(
+                        writer, transcription_service, buffer, carry, diarizer, language, final=True
+                    )
+                except AdmissionRejected as e:
+                    error = f"Audio after {writer.duration:.1f}s was not transcribed: {e.detail}"
+                except Exception as e:
+                    error = f"Audio after {writer.duration:.1f}s was not transcribed: {str(e)}"
+                if error:
+                    logger.error(f"Live session {session_id}: {error}")
+        finally:
+            try:
+                await _finalize_live_session(writer, error)
+            except Exception as e:
+                logger.error(f"Live session finalize error for {session_id}: {str(e)}")
+            finally:
+                buffer.close()
+                carry.close()
+
+async def _commit_live_audio(
+    writer: LiveSessionWriter,
+    transcription_service,
+    buffer: StreamBuffer,
+    carry: CarriedAudio,
+    diarizer: OnlineDiarizer,
+    language: LanguageLock,
+    final: bool = False
+) -> List[dict]:
+    """
+    Transcribe and label a window of live audio and append its segments to the session
+    The buffer is cleared; unless `final`, the window's last segment stays in `carry`
+    """
+    # Live audio outranks uploads on the shared model slots; if even that
+    # is rejected the audio stays buffered for the next commit
+    async with get_admission_controller().admit("live", uses_model=True, priority=PRIORITY_LIVE):
+        audio = buffer.materialize() if buffer else None
+        offset = carry.offset
+        try:
+            result, committed, labels = await run_in_threadpool(
+                _transcribe_live_audio, transcription_service, diarizer, audio, carry, language.language, final
+            )
+        except Exception as e:
+            logger.error(f"Live transcription error for {writer.session_id}: {str(e)}")
+            result, committed, labels = {}, [], []
+            # The window is lost; drop the carried audio with it
+            carry.close()
+        finally:
+            buffer.clear()
+
+    next_id = len(writer.segments)
+
+    segments = [
+        {
+            "id": next_id + idx,
+            "text": seg["text"],
+            "start_time": offset + seg["start"],
+            "end_time": offset + seg["end"],
+            "speaker": speaker,
+            "emotion": "neutral",
+            "confidence": seg.get("confidence", 0.9)
+        }
+        for idx, (seg, speaker) in enumerate(zip(committed, labels))
+        if seg["text"]
+    ]
+
+    # Later commits decode in the locked language and skip detection
+    language.observe(result)
+    if language.locked:
+        writer.language = language.language
+    elif result.get("language") and not writer.language:
+        writer.language = result["language"]
+
+    await writer.append(segments)
+    return segments
+
+def _transcribe_live_audio(
+    transcription_service,
+    diarizer: OnlineDiarizer,
+    audio,
+    carry: CarriedAudio,
+    language: Optional[str] = None,
+    final: bool = False
+):
+    """
+    Decode a window behind the carried audio and share the waveform between
+    Whisper and the speaker embeddings; only committed segments are labelled
+
+    Returns:
+        (transcription result, committed segments, their speaker labels)
+    """
+    with stage_timer("live_decode"):
+        waveform = carry.extend(transcription_service.decode(audio)) if audio else carry.waveform
+    if not len(waveform):
+        return {}, [], []
+    with stage_timer("live_transcribe"):
+        result = transcription_service.transcribe_audio(waveform, language)
+    committed = carry.commit(result["segments"], final)
+    with stage_timer("live_diarize"):
+        labels = diarizer.label_segments(waveform, committed)
+    return result, committed, labels
+
+async def _finalize_live_session(writer: LiveSessionWriter, error: Optional[str] = None):
+    """
+    Compute session-level fields for a finished live session and index it
+    A session whose last audio could not be transcribed (`error`) keeps its
+    committed segments but is marked failed instead of completed
+    """
+    segments = writer.segments
+    full_transcript = " ".join(seg["text"] for seg in segments)
+    try:
+        insights = await get_admission_controller().run(
+            "llm", get_pipeline().summarize, full_transcript, segments,
+            priority=PRIORITY_INTERACTIVE
+        )
+    except AdmissionRejected:
+        # Still close the session out; only the LLM summary is skipped
+        logger.warning(f"LLM busy - finalizing live session {writer.session_id} without summary")
+        insights = {"speakers": build_speaker_stats(segments)}
+
+    await writer.finalize(insights, error)
+
+    if segments:
+        try:
+            await get_search_service().index_session(writer.session_id, segments, writer.created_at)
+            await get_keyword_service().ingest_session(writer.session_id, segments, writer.created_at)
+            await get_org_analytics_service().ingest_session(
+                writer.session_id, segments, writer.created_at, writer.duration, writer.language
+            )
+        except Exception as e:
+            logger.error(f"Live session indexing error for {writer.session_id}: {str(e)}")
 
 @router.get("/sessions")
 async def list_sessions():
@@ -187,58 +622,55 @@ async def list_sessions():
     }
 
 @router.get("/session/{session_id}")
-async def get_session(session_id: str):
-    """Get specific transcription session"""
+async def get_session(
+    session_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma separated top-level fields, e.g. summary,speakers")
+):
+    """
+    Get specific transcription session
+    Supports field selection and conditional GET (ETag / Last-Modified, 304 when unchanged)
+    """
+    projection = parse_fields(fields)
     collection = get_collection("transcriptions")
-    session = await collection.find_one({"session_id": session_id})
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    return session
-
-
-def _match_speaker(segment: dict, speaker_segments: List[dict]) -> str:
-    """Pick the diarized speaker with the largest time overlap."""
-    start_time = segment.get("start_time", 0.0)
-    end_time = segment.get("end_time", 0.0)
-
-    best_speaker = "Speaker 1"
-    best_overlap = 0.0
-
-    for speaker_seg in speaker_segments:
-        overlap = max(
-            0.0,
-            min(end_time, speaker_seg.get("end", 0.0)) - max(start_time, speaker_seg.get("start", 0.0))
-        )
-        if overlap > best_overlap:
-            best_overlap = overlap
-            best_speaker = speaker_seg.get("speaker", best_speaker)
-
-    return best_speaker
 
+    # Check the version first so unchanged sessions are never loaded or serialized
+    version = await collection.find_one(
+        {"session_id": session_id},
+        {"session_id": 1, "updated_at": 1, "created_at": 1}
+    )
+    if not version:
+        raise HTTPException(status_code=404, detail="Session not found")
 
-def _build_speaker_stats(segments: List[dict]) -> List[dict]:
-    """Aggregate speaker stats used by analytics and UI."""
-    speaker_data = {}
+    headers = validators(version, variant=",".join(sorted(projection)) if projection else "")
+    cached = not_modified(request, headers)
+    if cached is not None:
+        return cached
 
-    for seg in segments:
-        speaker = seg.get("speaker", "Unknown")
-        duration = seg.get("end_time", 0.0) - seg.get("start_time", 0.0)
-        emotion = seg.get("emotion", "neutral")
+    session = await collection.find_one({"session_id": session_id}, projection)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return FastJSONResponse(session, headers=headers)
 
-        if speaker not in speaker_data:
-            speaker_data[speaker] = {
-                "speaker_id": speaker,
-                "total_duration": 0.0,
-                "segment_count": 0,
-                "emotion_distribution": {}
-            }
+@router.get("/session/{session_id}/audio")
+async def get_session_audio(session_id: str):
+    """
+    Replay a session's stored audio (the original while hot, Opus once archived)
+    Returns 410 once the audio has been evicted
+    """
+    session = await get_collection("transcriptions").find_one({"session_id": session_id}, {"audio": 1, "session_id": 1})
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
 
-        speaker_data[speaker]["total_duration"] += duration
-        speaker_data[speaker]["segment_count"] += 1
-        speaker_data[speaker]["emotion_distribution"][emotion] = (
-            speaker_data[speaker]["emotion_distribution"].get(emotion, 0) + 1
-        )
+    storage = get_audio_storage()
+    try:
+        audio = await storage.open(session)
+    except AudioNotAvailable as e:
+        raise HTTPException(status_code=410 if session.get("audio") else 404, detail=str(e))
 
-    return list(speaker_data.values())
+    return FileResponse(
+        audio["path"],
+        media_type=storage.media_type(audio["path"]),
+        filename=f"{session_id}{os.path.splitext(audio['path'])[1]}"
+    )
@@ -0,0 +1,163 @@
+"""
+Admission control for CPU-bound work
+Per-class concurrency limits with bounded priority wait queues
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable, Dict
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import record_admission
+from app.core.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first on the shared model slots
+PRIORITY_LIVE = 0
+PRIORITY_INTERACTIVE = 5
+PRIORITY_BATCH = 10
+
+class AdmissionRejected(HTTPException):
+    """Raised when a job cannot be admitted; maps to 429/503 with Retry-After"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+        self.retry_after = retry_after
+
+class PriorityLimiter:
+    """
+    Async semaphore with a bounded, priority-ordered wait queue.
+
+    Callers past ``limit`` wait in a heap ordered by (priority, arrival);
+    when ``max_queue`` callers are already waiting new ones are rejected
+    immediately with 429, and waiters that exceed ``timeout`` get 503.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self._publish()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _publish(self):
+        record_admission(self.name, self.active, self.queued, self.limit)
+
+    async def acquire(self, priority: int = PRIORITY_BATCH):
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            self._publish()
+            return
+
+        if self.queued >= self.max_queue:
+            raise AdmissionRejected(429, f"Too many pending {self.name} jobs", self._retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._publish()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Granted just as we timed out; hand the slot back
+                self.release()
+            future.cancel()
+            self._publish()
+            raise AdmissionRejected(503, f"Timed out waiting for a {self.name} slot", self._retry_after())
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            future.cancel()
+            self._publish()
+            raise
+
+    def release(self):
+        self.active -= 1
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.active += 1
+                future.set_result(True)
+                break
+        self._publish()
+
+    def _retry_after(self) -> int:
+        return max(1, int(self.timeout / 2))
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_BATCH):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+class AdmissionController:
+    """
+    Admission control for the worker.
+
+    Every job class (live, upload, export, llm) has its own limiter, and
+    model inference from any class additionally takes a slot on the shared
+    ``model`` limiter where live streaming outranks batch uploads.
+    """
+
+    def __init__(self):
+        self.limiters: Dict[str, PriorityLimiter] = {
+            job_class: PriorityLimiter(
+                job_class,
+                limit,
+                settings.ADMISSION_QUEUE_SIZES.get(job_class, 16),
+                settings.ADMISSION_TIMEOUT
+            )
+            for job_class, limit in settings.ADMISSION_LIMITS.items()
+        }
+        self.model = PriorityLimiter("model", settings.MODEL_CONCURRENCY, settings.MODEL_QUEUE_SIZE, settings.ADMISSION_TIMEOUT)
+
+    def limiter(self, job_class: str) -> PriorityLimiter:
+        return self.limiters[job_class]
+
+    @asynccontextmanager
+    async def admit(self, job_class: str, uses_model: bool = False, priority: int = PRIORITY_BATCH):
+        """Hold a slot for `job_class` (and a shared model slot) for the duration of the block"""
+        async with self.limiter(job_class).slot(priority):
+            if uses_model:
+                async with self.model.slot(priority):
+                    yield
+            else:
+                yield
+
+    async def run(self, job_class: str, fn: Callable, *args, uses_model: bool = False, priority: int = PRIORITY_BATCH, **kwargs):
+        """Run blocking work in the threadpool once admitted"""
+        async with self.admit(job_class, uses_model, priority):
+            return await run_in_threadpool(profiled(fn), *args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Active and queued jobs per class"""
+        return {
+            name: {"active": limiter.active, "queued": limiter.queued, "limit": limiter.limit}
+            for name, limiter in {**self.limiters, "model": self.model}.items()
+        }
+
+# Singleton instance
+_admission_controller = None
+
+def get_admission_controller() -> AdmissionController:
+    """Get or create the worker's admission controller"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
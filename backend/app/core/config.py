@@ -2,7 +2,7 @@
 Configuration management using Pydantic settings
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     # Database
@@ -17,13 +17,123 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     
+    # Request profiling: admins send an X-Profile: <token> header; unset = disabled
+    PROFILE_ADMIN_TOKEN: Optional[str] = None
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of other requests profiled while enabled
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 200  # oldest profiles are deleted beyond this
+    
     # Environment
     ENVIRONMENT: str = "development"
     
     # Model paths
     WHISPER_MODEL: str = "base"  # tiny, base, small, medium, large
+    WHISPER_LIVE_MODEL: str = "small"  # model used by the /stream WebSocket
+    
+    # Whisper runtime: calibrated per host and model (python -m app.services.whisper_tuning);
+    # these override the calibration when set
+    WHISPER_CALIBRATION_FILE: str = "whisper_calibration.json"
+    WHISPER_COMPUTE_TYPE: Optional[str] = None  # int8, int8_float32, float32, ...
+    WHISPER_CPU_THREADS: Optional[int] = None  # 0 = CTranslate2 default
+    WHISPER_NUM_WORKERS: Optional[int] = None  # concurrent transcriptions per loaded model
+    
+    # Load-adaptive model selection for uploads
+    WHISPER_ADAPTIVE: bool = True
+    WHISPER_MODEL_LADDER: str = "base,small"  # smallest to largest
+    # WHISPER_MODEL, WHISPER_LIVE_MODEL and every rung load on first use (the defaults serve base
+    # and small); serving more sizes than the cap reloads models under mixed traffic.
+    # int8 weights are roughly 40 MB (tiny), 75 MB (base), 250 MB (small), 800 MB (medium) and 1.6 GB (large-v3)
+    WHISPER_MAX_RESIDENT_MODELS: int = 2  # least recently used models beyond this are unloaded, 0 = no cap
+    WHISPER_MODEL_RTF: Dict[str, float] = {  # processing seconds per audio second (beam 5, CPU)
+        "tiny": 0.05, "base": 0.1, "small": 0.3, "medium": 0.8, "large-v3": 1.6
+    }
+    WHISPER_TARGET_RTF: float = 0.5  # default latency budget as a fraction of audio duration
+    WHISPER_MIN_LATENCY_TARGET: float = 30.0  # never aim below this many seconds
     EMOTION_MODEL: str = "ehcalabres/wav2vec2-lg-xlsr-en-speech-emotion-recognition"
     
+    # Voice activity detection before the model stages of uploads
+    VAD_ENABLED: bool = True
+    VAD_THRESHOLD: float = 0.5  # speech probability to open a region
+    VAD_MIN_SILENCE_MS: int = 1000  # shorter pauses stay inside a region
+    VAD_SPEECH_PAD_MS: int = 200  # context kept on both sides of a region
+    
+    # Startup prewarming: comma separated whisper[:size], diarization, embedding;
+    # a bare "whisper" warms every size served (WHISPER_MODEL, WHISPER_LIVE_MODEL, ladder)
+    PREWARM_MODELS: str = "whisper"
+    
+    # Shared model server (python -m app.services.model_server); unset = in-process models
+    # Requests are unpickled, so the socket must sit in a directory only the service user can
+    # access and the authkey must be set to a secret of its own
+    MODEL_SERVER_SOCKET: Optional[str] = None  # e.g. run/model-server.sock
+    MODEL_SERVER_AUTHKEY: Optional[str] = None  # required by the server and its clients
+    MODEL_SERVER_TIMEOUT: float = 600.0
+    
+    # Admission control: concurrent jobs and wait queue length per class
+    ADMISSION_LIMITS: Dict[str, int] = {"live": 8, "upload": 2, "export": 4, "llm": 8}
+    ADMISSION_QUEUE_SIZES: Dict[str, int] = {"live": 32, "upload": 16, "export": 16, "llm": 32}
+    ADMISSION_TIMEOUT: float = 30.0  # seconds a job may wait for a slot before 503
+    MODEL_CONCURRENCY: int = 2  # model inferences running at once, shared by all classes
+    MODEL_QUEUE_SIZE: int = 64
+    
+    # Live streaming
+    LIVE_FLUSH_SEGMENTS: int = 20  # pending segments that trigger a batched write
+    LIVE_FLUSH_SECONDS: float = 10.0  # max age of pending segments before a write
+    LIVE_COMMIT_SECONDS: float = 10.0  # stream time after which buffered audio is transcribed and persisted
+    LIVE_COMMIT_BYTES: int = 512 * 1024  # or once this much audio is buffered
+    LIVE_MAX_CARRY_SECONDS: float = 20.0  # longest unfinished segment carried into the next window
+    STREAM_MAX_CHUNK_BYTES: int = 1024 * 1024  # largest single WebSocket audio message
+    STREAM_MAX_MEMORY_BYTES: int = 4 * 1024 * 1024  # in-memory window per connection
+    STREAM_MAX_PENDING_BYTES: int = 64 * 1024 * 1024  # untranscribed audio per connection incl. disk
+    STREAM_WORKER_MAX_MEMORY_BYTES: int = 256 * 1024 * 1024  # in-memory audio across all connections
+    STREAM_PAUSE_THRESHOLD: float = 0.9  # pressure at which clients are asked to pause
+    STREAM_RESUME_THRESHOLD: float = 0.6  # pressure at which clients may resume
+    STREAM_SPILL_DIR: str = "uploads/live"
+    LIVE_LANGUAGE_MIN_PROBABILITY: float = 0.8  # detection confidence that locks a session's language
+    ONLINE_DIARIZATION_MAX_SPEAKERS: int = 8  # centroids kept per live session
+    ONLINE_DIARIZATION_THRESHOLD: float = 0.5  # cosine similarity to join an existing speaker
+    ONLINE_DIARIZATION_MIN_SECONDS: float = 0.5  # shorter segments keep the previous speaker
+    
+    # Progress events (Server-Sent Events)
+    EVENT_HISTORY_SECONDS: float = 600.0  # replayable history kept after a session finishes
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    
+    # Responses
+    GZIP_MIN_BYTES: int = 1024  # smaller responses are sent uncompressed
+    
+    # Search
+    SEARCH_MAX_CANDIDATES: int = 1000  # highest-impact postings of a query's rarest term that are ranked
+    
+    # Audio retention: hot originals -> Opus archive -> evicted (LRU by last access)
+    AUDIO_RETENTION_ENABLED: bool = True
+    AUDIO_HOT_DIR: str = "uploads"
+    AUDIO_ARCHIVE_DIR: str = "archive"
+    AUDIO_HOT_DAYS: float = 7.0  # originals older than this are archived
+    AUDIO_ARCHIVE_BITRATE: str = "24k"  # mono Opus, speech tuned
+    AUDIO_ARCHIVE_BATCH: int = 50  # files transcoded per retention pass
+    AUDIO_STORAGE_BUDGET_BYTES: int = 50 * 1024 ** 3  # hot + archived audio
+    AUDIO_RETENTION_INTERVAL_SECONDS: float = 3600.0
+    FFMPEG_BINARY: str = "ffmpeg"
+    EXPORT_DIR: str = "exports"
+    EXPORT_MAX_AGE_HOURS: float = 24.0  # exports left behind by interrupted downloads are deleted after this
+    
+    # Pipeline stage artifacts, keyed by audio hash and stage configuration
+    ARTIFACTS_ENABLED: bool = True
+    ARTIFACT_DIR: str = "artifacts"
+    ARTIFACT_RETENTION_DAYS: float = 30.0  # artifacts unused this long are pruned by the retention pass
+    
+    # Analytics
+    ANALYTICS_INTENSITY_WINDOW: int = 30  # seconds per words-per-minute sample
+    ANALYTICS_PIXELS_PER_POINT: int = 2  # ?width= is converted to width / this many points
+    ORG_ANALYTICS_DEFAULT_DAYS: int = 30  # range of org reports without start/end
+    ORG_ANALYTICS_CACHE_SECONDS: float = 60.0
+    ORG_ANALYTICS_CACHE_SIZE: int = 256  # cached reports per worker
+    
+    # Keywords
+    KEYWORD_MAX_NGRAM: int = 2
+    KEYWORD_MAX_CANDIDATES: int = 500  # most frequent session terms considered for TF-IDF
+    KEYWORD_TRENDING_MIN_SESSIONS: int = 2
+    KEYWORD_GLOSSARY: str = "decided,action,deadline,important,critical,must,will"  # default glossary
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,141 @@
+"""
+Prometheus metrics
+Stage timings, real-time factor, model loads, queue depths, caches and LLM latency
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory (wiped before each start) in the environment of every worker:
+samples are then written there and a scrape of any worker reports all of them.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+# prometheus_client switches to file-backed values when this is set at import
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Pipeline stages run from milliseconds (speaker match) to many minutes (transcribe)
+STAGE_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+STAGE_SECONDS = Histogram(
+    "transcripter_stage_seconds",
+    "Time spent in each processing stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS
+)
+
+REAL_TIME_FACTOR = Histogram(
+    "transcripter_real_time_factor",
+    "Model processing seconds per second of audio, per job",
+    ["model"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 4)
+)
+
+MODEL_LOAD_SECONDS = Histogram(
+    "transcripter_model_load_seconds",
+    "Time to load a model into memory",
+    ["model"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+
+LLM_SECONDS = Histogram(
+    "transcripter_llm_request_seconds",
+    "Latency of LLM API calls",
+    ["provider", "operation", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+)
+
+LLM_FIRST_TOKEN_SECONDS = Histogram(
+    "transcripter_llm_first_token_seconds",
+    "Time to the first streamed token of an LLM call",
+    ["provider", "operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15)
+)
+
+CACHE_REQUESTS = Counter(
+    "transcripter_cache_requests_total",
+    "Cache lookups by result",
+    ["cache", "result"]
+)
+
+ADMISSION_JOBS = Gauge(
+    "transcripter_admission_jobs",
+    "Jobs holding or waiting for an admission slot",
+    ["job_class", "state"],
+    multiprocess_mode="livesum"  # summed over running workers
+)
+
+@contextmanager
+def stage_timer(stage: str):
+    """Record the duration of a block under `stage`, including failed runs"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+@contextmanager
+def llm_timer(provider: str, operation: str):
+    """Record the latency of an LLM call and whether it succeeded (or was abandoned)"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    except (GeneratorExit, asyncio.CancelledError):
+        outcome = "cancelled"
+        raise
+    finally:
+        LLM_SECONDS.labels(provider, operation, outcome).observe(time.perf_counter() - start)
+
+@contextmanager
+def model_load_timer(model: str):
+    """Record how long loading `model` took"""
+    start = time.perf_counter()
+    yield
+    MODEL_LOAD_SECONDS.labels(model).observe(time.perf_counter() - start)
+
+def observe_rtf(model: str, processing_seconds: float, audio_seconds: float):
+    """Record the real-time factor of one job"""
+    if audio_seconds and audio_seconds > 0:
+        REAL_TIME_FACTOR.labels(model).observe(processing_seconds / audio_seconds)
+
+def observe_first_token(provider: str, operation: str, seconds: float):
+    LLM_FIRST_TOKEN_SECONDS.labels(provider, operation).observe(seconds)
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+def record_admission(job_class: str, active: int, queued: int, limit: int):
+    """Publish a limiter's state when it changes (a scrape may be served by another worker)"""
+    ADMISSION_JOBS.labels(job_class, "active").set(active)
+    ADMISSION_JOBS.labels(job_class, "queued").set(queued)
+    ADMISSION_JOBS.labels(job_class, "limit").set(limit)
+
+def render_metrics():
+    """
+    Render all metrics in the Prometheus text format, merged across workers in multiprocess mode
+
+    Returns:
+        (body, content type)
+    """
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+def mark_worker_exit():
+    """Drop this worker's live gauges from the shared samples"""
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,269 @@
+"""
+Opt-in request profiling
+Captures cProfile data for selected requests across the handler and its threadpool work
+"""
+import cProfile
+import functools
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+# Held by the one request profiling the event-loop thread. Before 3.12 a second
+# Profile().enable() on the same thread silently replaces the first hook, and
+# the first disable() then switches off the second, so profiles would be empty
+# or mixed; concurrent requests run unprofiled instead.
+_loop_profile_lock = threading.Lock()
+
+class RequestProfile:
+    """
+    CPU profile of one request.
+
+    cProfile hooks a single thread, so the event-loop part of the request and
+    every blocking call it hands to the threadpool are profiled separately
+    and merged when the profile is saved. Coroutines of other requests that
+    run on the loop meanwhile are included in the loop-thread profile. Only
+    one request at a time profiles the loop thread.
+    """
+
+    def __init__(self, method: str, path: str, reason: str):
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.status_code = None
+        self.started_at = time.time()
+        self.duration = None
+        self._main = cProfile.Profile()
+        self._threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Start the loop-thread profile; False if another request is being profiled"""
+        if not _loop_profile_lock.acquire(blocking=False):
+            return False
+        try:
+            self._main.enable()
+            return True
+        except ValueError:
+            # Another profiler owns the interpreter (3.12+ allows only one)
+            _loop_profile_lock.release()
+            return False
+
+    def stop(self):
+        try:
+            self._main.disable()
+        finally:
+            _loop_profile_lock.release()
+        self.duration = time.time() - self.started_at
+
+    def run_in_thread(self, fn: Callable, *args, **kwargs):
+        """Run blocking work under a thread-local profiler attached to this request"""
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return fn(*args, **kwargs)
+
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            with self._lock:
+                self._threads.append(profiler)
+
+    def save(self, directory: str) -> str:
+        """Write merged stats (.prof) and request metadata (.json)"""
+        os.makedirs(directory, exist_ok=True)
+        stats = pstats.Stats(self._main)
+        for profiler in self._threads:
+            stats.add(profiler)
+
+        path = os.path.join(directory, f"{self.profile_id}.prof")
+        stats.dump_stats(path)
+        with open(os.path.join(directory, f"{self.profile_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(self.describe(), f)
+        return path
+
+    def describe(self) -> Dict:
+        return {
+            "profile_id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status_code": self.status_code,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "threads": len(self._threads)
+        }
+
+def profiled(fn: Callable) -> Callable:
+    """
+    Attach blocking work to the current request's profile, if any
+
+    Must be called on the event loop before the work is handed to the
+    threadpool; without an active profile `fn` is returned unchanged.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return fn
+    return functools.partial(profile.run_in_thread, fn)
+
+def is_admin_token(token: Optional[str]) -> bool:
+    expected = settings.PROFILE_ADMIN_TOKEN
+    return bool(expected and token and hmac.compare_digest(token, expected))
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests flagged by an admin or picked by sampling.
+
+    A request is flagged with an ``X-Profile: <admin token>`` header (never a
+    query parameter, which would leak into access logs). ``PROFILE_SAMPLE_RATE`` also
+    profiles that fraction of all other HTTP requests. The profile id is
+    returned in the ``X-Profile-Id`` response header. The middleware is only
+    installed when ``PROFILE_ADMIN_TOKEN`` is set.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _reason(self, scope) -> Optional[str]:
+        if scope.get("path", "").startswith("/api/profiles"):
+            return None
+
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER.encode() and is_admin_token(value.decode("latin-1")):
+                return "requested"
+
+        if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        reason = self._reason(scope) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope.get("method", ""), scope.get("path", ""), reason)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.profile_id.encode())
+                ]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        if not profile.start():
+            _current_profile.reset(token)
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            _current_profile.reset(token)
+            try:
+                await run_in_threadpool(_store_profile, profile)
+            except Exception as e:
+                logger.error(f"Failed to store profile {profile.profile_id}: {str(e)}")
+
+def _store_profile(profile: RequestProfile):
+    path = profile.save(settings.PROFILE_DIR)
+    logger.info(f"Profiled {profile.method} {profile.path} in {profile.duration:.3f}s -> {path}")
+    _prune_profiles(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+def _prune_profiles(directory: str, keep: int):
+    """Delete the oldest profiles beyond `keep`"""
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(".prof")),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in profiles[:max(len(profiles) - keep, 0)]:
+        for suffix in (".prof", ".json"):
+            try:
+                os.remove(entry.path[:-len(".prof")] + suffix)
+            except OSError:
+                pass
+
+def list_profiles() -> List[Dict]:
+    """Stored profiles, newest first"""
+    directory = settings.PROFILE_DIR
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".json"):
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return sorted(profiles, key=lambda p: p.get("started_at", 0), reverse=True)
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a stored profile, or None (ids are validated to stay inside PROFILE_DIR)"""
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(settings.PROFILE_DIR, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
+
+def hot_functions(path_prefix: str = None, sort: str = "cumulative", limit: int = 30) -> Dict:
+    """
+    Aggregate stored profiles into a hot-function report
+
+    Args:
+        path_prefix: Only include requests whose path starts with this
+        sort: 'cumulative' (time including callees) or 'tottime' (own time)
+        limit: Number of functions to return
+    """
+    selected = [
+        p for p in list_profiles()
+        if not path_prefix or p.get("path", "").startswith(path_prefix)
+    ]
+    paths = [profile_path(p["profile_id"]) for p in selected]
+    paths = [path for path in paths if path]
+    if not paths:
+        return {"profiles": 0, "functions": []}
+
+    stats = pstats.Stats(*paths)
+    column = 3 if sort == "cumulative" else 2
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+
+    return {
+        "profiles": len(paths),
+        "total_time": round(stats.total_tt, 6),
+        "functions": [
+            {
+                "function": func,
+                "file": filename,
+                "line": line,
+                "calls": calls,
+                "primitive_calls": primitive,
+                "total_time": round(tottime, 6),
+                "cumulative_time": round(cumtime, 6)
+            }
+            for (filename, line, func), (primitive, calls, tottime, cumtime, _) in rows
+        ]
+    }
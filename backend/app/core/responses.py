@@ -0,0 +1,88 @@
+"""
+Response helpers
+orjson serialization, field projections and conditional GET for session documents
+"""
+import hashlib
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+# Top-level document fields a client may request with ?fields=
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson; datetimes become ISO strings, other unknown types str()"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def parse_fields(fields: Optional[str], always: tuple = ("session_id",)) -> Optional[Dict[str, int]]:
+    """
+    Turn ?fields=summary,speakers into a Mongo projection
+
+    Returns None (whole document) when no fields are requested.
+    """
+    if not fields:
+        return None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    invalid = [name for name in names if not _FIELD_NAME.match(name)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid field names: {', '.join(invalid)}")
+
+    projection = {name: 1 for name in (*always, *names)}
+    projection["_id"] = 0
+    return projection
+
+def _as_utc(value: datetime) -> datetime:
+    # Mongo returns naive UTC datetimes
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def validators(doc: Dict, variant: str = "") -> Optional[Dict[str, str]]:
+    """
+    ETag and Last-Modified headers for a document version
+
+    The version is its `updated_at` (falling back to `created_at`); `variant`
+    distinguishes representations of the same version, e.g. field selections.
+    """
+    modified = doc.get("updated_at") or doc.get("created_at")
+    if not isinstance(modified, datetime):
+        return None
+
+    modified = _as_utc(modified)
+    digest = hashlib.sha1(f"{doc.get('session_id', '')}|{modified.isoformat()}|{variant}".encode()).hexdigest()[:20]
+    return {
+        "ETag": f'W/"{digest}"',
+        "Last-Modified": format_datetime(modified, usegmt=True),
+        "Cache-Control": "no-cache"
+    }
+
+def not_modified(request: Request, headers: Optional[Dict[str, str]]) -> Optional[Response]:
+    """A 304 response if the request's conditional headers match, else None"""
+    if not headers:
+        return None
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        etag = headers["ETag"]
+        if "*" in tags or etag in tags or etag[2:] in tags:
+            return Response(status_code=304, headers=headers)
+        return None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        modified = parsedate_to_datetime(headers["Last-Modified"])
+        if since.tzinfo is not None and modified <= since:
+            return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,59 @@
+"""
+Server-Sent Events helpers
+"""
+import asyncio
+import json
+from contextlib import suppress
+from typing import AsyncIterator, Dict, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+
+def format_event(event: str, data: Dict) -> str:
+    """Encode one SSE message (datetimes and other non-JSON values are stringified)"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def event_stream(events: AsyncIterator[Tuple[str, Dict]], keepalive: float = None) -> AsyncIterator[str]:
+    """
+    Encode (event, data) pairs as SSE, sending comment keep-alives while idle
+
+    The pending read is kept across keep-alives instead of being cancelled, so
+    idle periods never interrupt the source iterator.
+    """
+    keepalive = keepalive or settings.SSE_KEEPALIVE_SECONDS
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=keepalive)
+            if not done:
+                yield ": keepalive\n\n"
+                continue
+
+            try:
+                event, data = pending.result()
+            except StopAsyncIteration:
+                return
+            finally:
+                pending = None
+            yield format_event(event, data)
+    finally:
+        # Client went away: stop the source so upstream work is cancelled.
+        # A pending read is cancelled, which unwinds the source generator;
+        # wait for it so its cleanup (slots, upstream streams) has run.
+        if pending is not None:
+            pending.cancel()
+            with suppress(asyncio.CancelledError):
+                await asyncio.wait({pending})
+        else:
+            await events.aclose()
+
+def sse_response(events: AsyncIterator[Tuple[str, Dict]]) -> StreamingResponse:
+    return StreamingResponse(
+        event_stream(events),
+        media_type="text/event-stream",
+        # identity keeps GZipMiddleware from buffering events inside the compressor
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"}
+    )
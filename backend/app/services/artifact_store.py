@@ -0,0 +1,206 @@
+"""
+Pipeline stage artifacts
+Stage outputs stored per recording and stage configuration so finished stages
+are reused by retries and reprocessing
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import record_cache, stage_timer
+
+logger = logging.getLogger(__name__)
+
+class ArtifactStore:
+    """
+    Versioned stage outputs on disk.
+
+    An artifact lives at ``{root}/{audio_hash[:2]}/{audio_hash}/{stage}-{key}.json``
+    where ``key`` hashes the stage configuration together with the keys of the
+    upstream artifacts it was computed from. Changing a stage's configuration
+    therefore changes its key and the keys of every stage downstream of it,
+    while untouched stages keep matching their stored outputs.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = root or settings.ARTIFACT_DIR
+
+    @staticmethod
+    def hash_audio(path: str, chunk_size: int = 1024 * 1024) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def stage_key(stage: str, config: Dict, upstream: Dict[str, str]) -> str:
+        payload = json.dumps({"stage": stage, "config": config, "upstream": upstream}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def _path(self, audio_hash: str, stage: str, key: str) -> str:
+        return os.path.join(self.root, audio_hash[:2], audio_hash, f"{stage}-{key}.json")
+
+    def load(self, audio_hash: str, stage: str, key: str) -> Optional[Any]:
+        path = self._path(audio_hash, stage, key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                artifact = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable artifact {path}: {str(e)}")
+            return None
+
+        # Reads refresh the mtime, which retention uses as last access
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return artifact["data"]
+
+    def save(self, audio_hash: str, stage: str, key: str, config: Dict, upstream: Dict[str, str], data: Any):
+        path = self._path(audio_hash, stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.{os.getpid()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump({
+                "stage": stage,
+                "key": key,
+                "config": config,
+                "upstream": upstream,
+                "created_at": datetime.utcnow().isoformat(),
+                "data": data
+            }, f, default=str)
+        os.replace(partial, path)
+
+    def prune(self, max_age_days: float = None) -> int:
+        """Delete artifacts not read or written for `max_age_days`"""
+        max_age_days = max_age_days if max_age_days is not None else settings.ARTIFACT_RETENTION_DAYS
+        if not os.path.isdir(self.root):
+            return 0
+
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for directory, _, files in os.walk(self.root, topdown=False):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+            if directory != self.root:
+                try:
+                    os.rmdir(directory)  # only succeeds once empty
+                except OSError:
+                    pass
+        return removed
+
+class StageRun:
+    """
+    Stage bookkeeping for one recording.
+
+    ``run`` returns a stored output when one matches the stage's key and
+    computes (and stores) it otherwise. ``to_dict`` records the audio hash and
+    which artifact each stage used; it is stored on the session so a later
+    reprocess finds the artifacts without rehashing (archived audio is
+    re-encoded and hashes differently).
+    """
+
+    def __init__(self, audio_hash: Optional[str], store: ArtifactStore = None):
+        self.audio_hash = audio_hash
+        self.store = store if audio_hash else None
+        self.stages: Dict[str, Dict] = {}
+
+    @classmethod
+    def for_file(cls, file_path: str, audio_hash: str = None) -> "StageRun":
+        """Start a run; artifacts are disabled (everything computed) when ARTIFACTS_ENABLED is off"""
+        if not settings.ARTIFACTS_ENABLED:
+            return cls(None)
+        if audio_hash is None:
+            with stage_timer("hash"):
+                audio_hash = ArtifactStore.hash_audio(file_path)
+        return cls(audio_hash, get_artifact_store())
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> "StageRun":
+        """A new run over the recording of a stored `to_dict`; stage keys are recomputed"""
+        if not data or not settings.ARTIFACTS_ENABLED:
+            return cls(None)
+        return cls(data["audio_hash"], get_artifact_store())
+
+    def key(self, stage: str) -> Optional[str]:
+        return self.stages.get(stage, {}).get("key")
+
+    def reused(self, stage: str) -> bool:
+        return self.stages.get(stage, {}).get("reused", False)
+
+    def run(
+        self,
+        stage: str,
+        config: Dict,
+        upstream: List[str],
+        compute: Callable[[], Any],
+        encode: Callable[[Any], Any] = None,
+        decode: Callable[[Any], Any] = None
+    ) -> Any:
+        """
+        Reuse or compute a stage output
+
+        Args:
+            stage: Stage name
+            config: Everything that changes the stage's output (model, options, version)
+            upstream: Stages whose outputs this stage consumes
+            compute: Produces the output
+            encode/decode: Convert between the output and its JSON form
+
+        Falsy encoded outputs (a disabled model, an unavailable service) are
+        never stored, so the stage is retried next time. Neither is anything
+        computed from them: a retry keeps the same key but may change the output
+        (real speakers instead of the one-speaker fallback).
+        """
+        upstream_keys = {name: self.key(name) for name in upstream}
+        storable = all(self.stages.get(name, {}).get("stored", True) for name in upstream)
+        key = ArtifactStore.stage_key(stage, config, upstream_keys)
+
+        if self.store is not None:
+            stored = self.store.load(self.audio_hash, stage, key)
+            record_cache("artifacts", stored is not None)
+            if stored is not None:
+                self.stages[stage] = {"key": key, "reused": True, "stored": True}
+                logger.info(f"Reusing {stage} artifact {key} for {self.audio_hash[:12]}")
+                return decode(stored) if decode else stored
+
+        output = compute()
+        encoded = encode(output) if encode else output
+        stored = False
+        if self.store is not None and encoded and storable:
+            try:
+                self.store.save(self.audio_hash, stage, key, config, upstream_keys, encoded)
+                stored = True
+            except OSError as e:
+                logger.warning(f"Could not store {stage} artifact: {str(e)}")
+        self.stages[stage] = {"key": key, "reused": False, "stored": stored}
+        return output
+
+    def to_dict(self) -> Optional[Dict]:
+        if self.audio_hash is None:
+            return None
+        return {"audio_hash": self.audio_hash, "stages": self.stages}
+
+# Singleton instance
+_artifact_store = None
+
+def get_artifact_store() -> ArtifactStore:
+    """Get or create the artifact store"""
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore()
+    return _artifact_store
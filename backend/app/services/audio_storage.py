@@ -0,0 +1,312 @@
+"""
+Audio retention tiers
+Keeps uploads hot for a while, archives them as Opus, evicts to a disk budget
+and cleans up stale exports
+"""
+import asyncio
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import get_collection
+from app.core.metrics import stage_timer
+from app.services.artifact_store import get_artifact_store
+
+logger = logging.getLogger(__name__)
+
+# Storage tiers recorded in a session's `audio.tier`
+TIER_HOT = "hot"
+TIER_ARCHIVE = "archive"
+TIER_EVICTED = "evicted"
+# Files we only reference (e.g. batch backfills); retention never moves or deletes them
+TIER_EXTERNAL = "external"
+
+MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".m4a": "audio/mp4",
+    ".mp4": "audio/mp4",
+    ".flac": "audio/flac",
+    ".opus": "audio/ogg",
+    ".ogg": "audio/ogg",
+    ".webm": "audio/webm"
+}
+
+class AudioNotAvailable(Exception):
+    """Raised when a session's audio was evicted or never stored"""
+
+class AudioStorage:
+    """
+    Retention manager for uploaded audio.
+
+    Every upload records an ``audio`` sub-document on its session (tier, path,
+    size, timestamps). A periodic pass, run by one worker at a time:
+
+    1. adopts files in the hot directory that predate this manager and removes
+       orphans (uploads whose processing never produced a session),
+    2. transcodes hot audio older than ``AUDIO_HOT_DAYS`` to mono Opus,
+    3. evicts the least recently accessed audio until the total recorded size
+       fits ``AUDIO_STORAGE_BUDGET_BYTES``,
+    4. deletes exports older than ``EXPORT_MAX_AGE_HOURS`` and stage artifacts
+       unused for ``ARTIFACT_RETENTION_DAYS``.
+    """
+
+    def __init__(self):
+        self.hot_dir = settings.AUDIO_HOT_DIR
+        self.archive_dir = settings.AUDIO_ARCHIVE_DIR
+        self.ffmpeg = shutil.which(settings.FFMPEG_BINARY)
+        self.last_run: Optional[Dict] = None
+        os.makedirs(self.hot_dir, exist_ok=True)
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+    def describe(self, path: str, filename: str = None, tier: str = TIER_HOT) -> Dict:
+        """The `audio` sub-document for a freshly stored upload"""
+        now = datetime.utcnow()
+        return {
+            "tier": tier,
+            "path": path,
+            "size": os.path.getsize(path),
+            "format": os.path.splitext(path)[1].lstrip(".").lower(),
+            "filename": filename,
+            "stored_at": now,
+            "last_accessed": now
+        }
+
+    async def open(self, session: Dict) -> Dict:
+        """
+        Locate a session's audio for replay or reprocessing and mark it accessed
+
+        Raises:
+            AudioNotAvailable: evicted, never recorded or missing on disk
+        """
+        audio = session.get("audio")
+        if not audio or audio.get("tier") == TIER_EVICTED or not audio.get("path"):
+            raise AudioNotAvailable(f"Audio for session {session['session_id']} is not retained")
+        if not os.path.exists(audio["path"]):
+            raise AudioNotAvailable(f"Audio file for session {session['session_id']} is missing")
+
+        await get_collection("transcriptions").update_one(
+            {"_id": session["_id"]},
+            {"$set": {"audio.last_accessed": datetime.utcnow()}}
+        )
+        return audio
+
+    def media_type(self, path: str) -> str:
+        return MEDIA_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+
+    async def ensure_indexes(self):
+        collection = get_collection("transcriptions")
+        await collection.create_index([("audio.tier", 1), ("audio.stored_at", 1)])
+        await collection.create_index([("audio.tier", 1), ("audio.last_accessed", 1)])
+
+    async def run_forever(self):
+        """Background loop; each pass is skipped unless this worker holds the lease"""
+        while True:
+            try:
+                if await self._acquire_lease():
+                    await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Audio retention error: {str(e)}")
+            await asyncio.sleep(settings.AUDIO_RETENTION_INTERVAL_SECONDS)
+
+    async def run_once(self) -> Dict:
+        """One retention pass; returns counts of what was done"""
+        start = time.perf_counter()
+        stats = {
+            "adopted": await self.adopt_untracked(),
+            "archived": await self.archive_cold(),
+            "evicted": await self.evict_to_budget(),
+            "exports_removed": self.clean_exports(),
+            "artifacts_removed": await run_in_threadpool(get_artifact_store().prune)
+        }
+        stats["seconds"] = round(time.perf_counter() - start, 3)
+        self.last_run = {**stats, "finished_at": datetime.utcnow()}
+        logger.info(f"Audio retention pass: {stats}")
+        return stats
+
+    async def adopt_untracked(self) -> Dict[str, int]:
+        """Record untracked files in the hot directory on their sessions; drop stale orphans"""
+        files = {}
+        with os.scandir(self.hot_dir) as entries:
+            for entry in entries:
+                # Uploads are saved as {session_id}_{filename}; subdirectories hold live spills
+                if entry.is_file() and "_" in entry.name:
+                    files[entry.name.split("_", 1)[0]] = entry
+
+        adopted = removed = 0
+        if not files:
+            return {"adopted": adopted, "orphans_removed": removed}
+
+        collection = get_collection("transcriptions")
+        sessions = {
+            doc["_id"]: doc
+            async for doc in collection.find({"_id": {"$in": list(files)}}, {"audio": 1, "status": 1})
+        }
+        cutoff = time.time() - settings.AUDIO_HOT_DAYS * 86400
+
+        for session_id, entry in files.items():
+            session = sessions.get(session_id)
+            if session is None:
+                # Rejected or crashed uploads never get a session; keep them as long as hot audio
+                if entry.stat().st_mtime < cutoff:
+                    _remove(entry.path)
+                    removed += 1
+                continue
+            if session.get("audio"):
+                continue
+
+            audio = self.describe(entry.path, entry.name.split("_", 1)[1])
+            audio["stored_at"] = audio["last_accessed"] = datetime.utcfromtimestamp(entry.stat().st_mtime)
+            await collection.update_one({"_id": session_id, "audio": {"$exists": False}}, {"$set": {"audio": audio, "updated_at": datetime.utcnow()}})
+            adopted += 1
+
+        return {"adopted": adopted, "orphans_removed": removed}
+
+    async def archive_cold(self) -> int:
+        """Transcode hot audio past its hot period to Opus and drop the original"""
+        if not self.ffmpeg:
+            logger.warning(f"{settings.FFMPEG_BINARY} not found; audio stays in the hot tier")
+            return 0
+
+        collection = get_collection("transcriptions")
+        cutoff = datetime.utcnow() - timedelta(days=settings.AUDIO_HOT_DAYS)
+        sessions = await collection.find(
+            {"audio.tier": TIER_HOT, "audio.stored_at": {"$lt": cutoff}, "status": {"$nin": ["processing", "live"]}},
+            {"audio": 1}
+        ).limit(settings.AUDIO_ARCHIVE_BATCH).to_list(None)
+
+        archived = 0
+        for session in sessions:
+            source = session["audio"]["path"]
+            target = os.path.join(self.archive_dir, f"{session['_id']}.opus")
+            if not os.path.exists(source):
+                await collection.update_one({"_id": session["_id"]}, {"$set": {"audio.tier": TIER_EVICTED, "audio.path": None, "audio.size": 0, "updated_at": datetime.utcnow()}})
+                continue
+
+            with stage_timer("archive_audio"):
+                ok = await self._transcode(source, target)
+            if not ok:
+                continue
+
+            now = datetime.utcnow()
+            await collection.update_one(
+                {"_id": session["_id"]},
+                {"$set": {
+                    "audio.tier": TIER_ARCHIVE,
+                    "audio.path": target,
+                    "audio.size": os.path.getsize(target),
+                    "audio.format": "opus",
+                    "audio.archived_at": now,
+                    "updated_at": now
+                }}
+            )
+            _remove(source)
+            archived += 1
+
+        return archived
+
+    async def evict_to_budget(self) -> int:
+        """Delete least recently accessed audio until the recorded total fits the budget"""
+        collection = get_collection("transcriptions")
+        totals = await collection.aggregate([
+            {"$match": {"audio.tier": {"$in": [TIER_HOT, TIER_ARCHIVE]}}},
+            {"$group": {"_id": None, "bytes": {"$sum": "$audio.size"}}}
+        ]).to_list(None)
+        excess = (totals[0]["bytes"] if totals else 0) - settings.AUDIO_STORAGE_BUDGET_BYTES
+        if excess <= 0:
+            return 0
+
+        evicted = 0
+        cursor = collection.find(
+            {"audio.tier": {"$in": [TIER_HOT, TIER_ARCHIVE]}, "status": {"$nin": ["processing", "live"]}},
+            {"audio": 1}
+        ).sort("audio.last_accessed", 1)
+        async for session in cursor:
+            if excess <= 0:
+                break
+            audio = session["audio"]
+            _remove(audio.get("path"))
+            now = datetime.utcnow()
+            await collection.update_one(
+                {"_id": session["_id"]},
+                {"$set": {"audio.tier": TIER_EVICTED, "audio.path": None, "audio.size": 0, "audio.evicted_at": now, "updated_at": now}}
+            )
+            excess -= audio.get("size", 0)
+            evicted += 1
+
+        return evicted
+
+    def clean_exports(self) -> int:
+        """Exports are regenerated on request, so old files are only disk usage"""
+        if not os.path.isdir(settings.EXPORT_DIR):
+            return 0
+
+        cutoff = time.time() - settings.EXPORT_MAX_AGE_HOURS * 3600
+        removed = 0
+        with os.scandir(settings.EXPORT_DIR) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    _remove(entry.path)
+                    removed += 1
+        return removed
+
+    async def _transcode(self, source: str, target: str) -> bool:
+        partial = f"{target}.part"
+        process = await asyncio.create_subprocess_exec(
+            self.ffmpeg, "-nostdin", "-y", "-loglevel", "error",
+            "-i", source,
+            "-vn", "-ac", "1", "-c:a", "libopus", "-b:a", settings.AUDIO_ARCHIVE_BITRATE,
+            "-application", "voip", "-f", "ogg", partial,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            logger.error(f"Archiving {source} failed: {stderr.decode(errors='replace').strip()}")
+            _remove(partial)
+            return False
+
+        os.replace(partial, target)
+        return True
+
+    async def _acquire_lease(self) -> bool:
+        """Take the retention lease for one interval; False if another worker holds it"""
+        now = datetime.utcnow()
+        try:
+            await get_collection("maintenance_locks").update_one(
+                {"_id": "audio_retention", "until": {"$lt": now}},
+                {"$set": {"until": now + timedelta(seconds=settings.AUDIO_RETENTION_INTERVAL_SECONDS * 0.9), "holder": os.getpid()}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+def _remove(path: Optional[str]):
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to remove {path}: {str(e)}")
+
+# Singleton instance
+_audio_storage = None
+
+def get_audio_storage() -> AudioStorage:
+    """Get or create the audio storage manager"""
+    global _audio_storage
+    if _audio_storage is None:
+        _audio_storage = AudioStorage()
+    return _audio_storage
@@ -0,0 +1,358 @@
+"""
+Offline batch transcription
+Runs the upload pipeline over a directory or manifest of recordings in a process pool
+
+    python -m app.services.batch_transcription /data/recordings --workers 4 --jsonl out.jsonl --mongo
+
+Each worker loads its models once. Finished recordings are appended to a
+checkpoint only after their results are written, so an interrupted run resumes
+where it stopped; recordings that failed part way reuse their finished stages
+from the artifact store.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".flac", ".ogg", ".opus", ".webm")
+
+# Namespace for session ids derived from file paths (stable across re-runs)
+SESSION_NAMESPACE = uuid.UUID("5f0b8a4e-62c1-4b9e-9d0c-3f4a1b7c2e10")
+
+@dataclass
+class BatchJob:
+    path: str
+    session_id: str
+
+    @property
+    def key(self) -> str:
+        return self.session_id
+
+def discover_jobs(inputs: List[str], manifest: Optional[str] = None) -> Iterator[BatchJob]:
+    """
+    Yield jobs from directories (searched recursively), single files and a manifest
+
+    Manifest lines are either a path or a JSON object with ``path`` and an
+    optional ``session_id``. Other session ids are derived from the absolute path.
+    """
+    def job(path: str, session_id: str = None) -> BatchJob:
+        path = os.path.abspath(path)
+        return BatchJob(path, session_id or str(uuid.uuid5(SESSION_NAMESPACE, path)))
+
+    for source in inputs:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        yield job(os.path.join(root, name))
+        else:
+            yield job(source)
+
+    if manifest:
+        with open(manifest, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("{"):
+                    entry = json.loads(line)
+                    yield job(entry["path"], entry.get("session_id"))
+                else:
+                    yield job(line)
+
+class Checkpoint:
+    """Append-only JSONL record of finished jobs"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        self.failed: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by an interruption
+                        continue
+                    if entry["status"] == "done":
+                        self.done.add(entry["key"])
+                        self.failed.pop(entry["key"], None)
+                    else:
+                        self.failed[entry["key"]] = entry.get("error", "")
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, key: str, status: str, **fields):
+        self._file.write(json.dumps({"key": key, "status": status, **fields}) + "\n")
+        self._file.flush()
+        if status == "done":
+            self.done.add(key)
+        else:
+            self.failed[key] = fields.get("error", "")
+
+    def close(self):
+        self._file.close()
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+_worker_options: Dict = {}
+
+def _init_worker(options: Dict):
+    """Pool initializer: pin threads and load the models once per process"""
+    threads = options.get("threads")
+    if threads:
+        # Whisper takes its thread count from settings; the env covers other native libraries
+        settings.WHISPER_CPU_THREADS = threads
+        os.environ["OMP_NUM_THREADS"] = str(threads)
+        os.environ["MKL_NUM_THREADS"] = str(threads)
+
+    logging.basicConfig(level=options.get("log_level", logging.WARNING))
+    # Workers own their models; a shared model server would serialize the pool
+    settings.MODEL_SERVER_SOCKET = None
+    if not options.get("vad", True):
+        settings.VAD_ENABLED = False
+
+    from app.services.diarization_service import get_diarization_service
+    from app.services.emotion_service import get_emotion_service
+    from app.services.transcription_service import get_transcription_service
+
+    if threads:
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+
+    get_transcription_service(options["model_size"])._load_model()
+    get_diarization_service()
+    get_emotion_service()
+    _worker_options.update(options)
+
+def _process_job(job: BatchJob) -> Dict:
+    """Run one recording through the pipeline; never raises"""
+    from app.services.artifact_store import StageRun
+    from app.services.audio_storage import TIER_EXTERNAL, get_audio_storage
+    from app.services.model_policy import ModelChoice
+    from app.services.pipeline_service import build_session_document, build_speaker_stats, get_pipeline
+    from app.services.summary_service import get_summary_service
+
+    started = time.perf_counter()
+    try:
+        pipeline = get_pipeline()
+        model = ModelChoice(_worker_options["model_size"], _worker_options["beam_size"])
+        # A job that failed part way resumes after its last stored stage
+        artifacts = StageRun.for_file(job.path)
+        analysis = pipeline.analyze(job.path, model, artifacts=artifacts)
+
+        if _worker_options.get("summary", True):
+            insights = pipeline.summarize(analysis["text"], analysis["segments"], artifacts=artifacts)
+        else:
+            insights = {
+                "speakers": build_speaker_stats(analysis["segments"]),
+                "summary": None,
+                "action_items": [],
+                "keywords": get_summary_service().extract_keywords(analysis["text"], analysis["segments"])
+            }
+
+        document = build_session_document(
+            job.session_id, analysis, insights,
+            audio=get_audio_storage().describe(job.path, os.path.basename(job.path), tier=TIER_EXTERNAL),
+            artifacts=artifacts,
+            source="batch"
+        )
+        return {"job": asdict(job), "document": document, "seconds": time.perf_counter() - started}
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+        logger.error(f"Batch job failed for {job.path}: {error}")
+        return {"job": asdict(job), "error": error, "seconds": time.perf_counter() - started}
+
+# ---------------------------------------------------------------------------
+# Parent process
+# ---------------------------------------------------------------------------
+
+class BatchWriter:
+    """Buffers finished sessions and writes them as JSONL and/or bulk Mongo upserts"""
+
+    def __init__(self, jsonl_path: Optional[str], to_mongo: bool, index: bool, batch_size: int, checkpoint: Checkpoint):
+        self.jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        self.to_mongo = to_mongo
+        self.index = index
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.pending: List[Dict] = []
+        self.written = 0
+
+    async def add(self, document: Dict):
+        self.pending.append(document)
+        if len(self.pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        if not self.pending:
+            return
+
+        batch, self.pending = self.pending, []
+        # Mongo first: if it fails the batch is retried on resume without duplicating JSONL lines
+        if self.to_mongo:
+            await self._write_mongo(batch)
+
+        if self.jsonl:
+            for document in batch:
+                self.jsonl.write(json.dumps(document, default=str) + "\n")
+            self.jsonl.flush()
+
+        # Only now are the sessions durable; record them for resume
+        for document in batch:
+            self.checkpoint.record(document["session_id"], "done", path=document["audio"]["path"])
+        self.written += len(batch)
+
+    async def _write_mongo(self, batch: List[Dict]):
+        from pymongo import ReplaceOne
+
+        from app.core.database import get_collection
+        from app.services.keyword_service import get_keyword_service
+        from app.services.org_analytics_service import get_org_analytics_service
+        from app.services.search_service import get_search_service
+
+        # Upserts keep re-runs of a half-written batch idempotent
+        result = await get_collection("transcriptions").bulk_write(
+            [ReplaceOne({"_id": doc["session_id"]}, {**doc, "_id": doc["session_id"]}, upsert=True) for doc in batch],
+            ordered=False
+        )
+        if not self.index:
+            return
+
+        # Keyword statistics are $inc counters, so only sessions this write
+        # created are counted; search and org analytics replace their data
+        inserted = set(result.upserted_ids.values())
+        for doc in batch:
+            try:
+                await get_search_service().index_session(doc["session_id"], doc["segments"], doc["created_at"])
+                if doc["session_id"] in inserted:
+                    await get_keyword_service().ingest_session(doc["session_id"], doc["segments"], doc["created_at"])
+                await get_org_analytics_service().ingest_session(
+                    doc["session_id"], doc["segments"], doc["created_at"], doc["duration"], doc["language"]
+                )
+            except Exception as e:
+                logger.error(f"Indexing error for {doc['session_id']}: {str(e)}")
+
+    def close(self):
+        if self.jsonl:
+            self.jsonl.close()
+
+async def run_batch(args) -> Dict[str, int]:
+    checkpoint = Checkpoint(args.checkpoint)
+    jobs = [
+        job for job in discover_jobs(args.inputs, args.manifest)
+        if job.key not in checkpoint.done and not (args.skip_failed and job.key in checkpoint.failed)
+    ]
+    if args.limit:
+        jobs = jobs[:args.limit]
+    print(f"{len(jobs)} recordings to process ({len(checkpoint.done)} already done)")
+
+    if args.mongo:
+        from app.core.database import connect_to_mongo
+        await connect_to_mongo()
+
+    writer = BatchWriter(args.jsonl, args.mongo, not args.no_index, args.batch_size, checkpoint)
+    options = {
+        "model_size": args.model,
+        "beam_size": args.beam_size,
+        "threads": args.threads_per_worker,
+        "summary": not args.no_summary,
+        "vad": not args.no_vad,
+        "log_level": logging.INFO if args.verbose else logging.WARNING
+    }
+
+    loop = asyncio.get_running_loop()
+    failed = 0
+    started = time.perf_counter()
+    # Spawned workers start clean (no inherited threads or CUDA/torch state)
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(options,)
+    ) as pool:
+        # Keep the pool busy without materializing every future up front
+        queue = iter(jobs)
+        running = set()
+        for job in queue:
+            running.add(loop.run_in_executor(pool, _process_job, job))
+            if len(running) >= args.workers * 2:
+                break
+
+        try:
+            while running:
+                finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    if "error" in result:
+                        failed += 1
+                        checkpoint.record(result["job"]["session_id"], "failed", path=result["job"]["path"], error=result["error"])
+                    else:
+                        await writer.add(result["document"])
+                    done = writer.written + len(writer.pending) + failed
+                    print(f"[{done}/{len(jobs)}] {result['job']['path']} ({result['seconds']:.1f}s){' FAILED' if 'error' in result else ''}")
+
+                    next_job = next(queue, None)
+                    if next_job is not None:
+                        running.add(loop.run_in_executor(pool, _process_job, next_job))
+        finally:
+            await writer.flush()
+            writer.close()
+            checkpoint.close()
+
+    if args.mongo:
+        from app.core.database import close_mongo_connection
+        await close_mongo_connection()
+
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {writer.written} sessions, {failed} failed in {elapsed:.0f}s")
+    return {"written": writer.written, "failed": failed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a directory or manifest of recordings offline")
+    parser.add_argument("inputs", nargs="*", help="Audio files or directories (searched recursively)")
+    parser.add_argument("--manifest", help="File with one path or {\"path\", \"session_id\"} JSON object per line")
+    parser.add_argument("--jsonl", help="Append finished sessions to this JSONL file")
+    parser.add_argument("--mongo", action="store_true", help="Upsert finished sessions into the transcriptions collection")
+    parser.add_argument("--no-index", action="store_true", help="With --mongo, skip search, keyword and org analytics indexing")
+    parser.add_argument("--checkpoint", default="batch_checkpoint.jsonl", help="Progress file used to resume")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry recordings that failed in earlier runs")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads-per-worker", type=int, default=2, help="CPU threads per worker's models")
+    parser.add_argument("--model", default=settings.WHISPER_MODEL, help="Whisper model size")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--no-summary", action="store_true", help="Skip the LLM summary (keywords and speaker stats are kept)")
+    parser.add_argument("--no-vad", action="store_true", help="Run the models over silence too")
+    parser.add_argument("--batch-size", type=int, default=50, help="Sessions per bulk write")
+    parser.add_argument("--limit", type=int, help="Process at most this many recordings")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if not args.inputs and not args.manifest:
+        parser.error("give input files/directories or --manifest")
+    if not args.jsonl and not args.mongo:
+        parser.error("choose an output: --jsonl and/or --mongo")
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    result = asyncio.run(run_batch(args))
+    raise SystemExit(1 if result["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
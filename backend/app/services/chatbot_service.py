@@ -2,19 +2,26 @@
 AI chatbot for transcript Q&A
 Allows users to ask questions about the conversation
 """
-from groq import Groq
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Tuple
 import logging
+import time
 from app.core.config import settings
+from app.core.metrics import llm_timer, observe_first_token
 
 logger = logging.getLogger(__name__)
 
+CHAT_MODEL = "llama-3.3-70b-versatile"
+SYSTEM_PROMPT = "You are an AI assistant that answers questions about meeting transcripts. Be concise and accurate."
+
 class ChatbotService:
     def __init__(self):
-        """Initialize Groq API client for chatbot"""
+        """Initialize Groq API clients for chatbot (blocking and streaming)"""
+        self.async_client = None
         if settings.GROQ_API_KEY:
             try:
+                from groq import AsyncGroq, Groq
                 self.client = Groq(api_key=settings.GROQ_API_KEY)
+                self.async_client = AsyncGroq(api_key=settings.GROQ_API_KEY)
                 logger.info("✅ Groq API client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Groq client: {str(e)}")
@@ -22,6 +29,13 @@ class ChatbotService:
         else:
             logger.warning("⚠️ GROQ_API_KEY not found in environment variables")
             self.client = None
+
+    def _messages(self, question: str, transcript: str) -> List[Dict]:
+        context = f"Transcript:\n{transcript}\n\nQuestion: {question}"
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": context}
+        ]
     
     def answer_question(self, question: str, transcript: str, segments: List[Dict]) -> Dict:
         """
@@ -37,20 +51,15 @@ class ChatbotService:
             }
         
         try:
-            # Build context from transcript
-            context = f"Transcript:\n{transcript}\n\nQuestion: {question}"
-            
-            logger.info(f"🤖 Calling Groq API with model: llama-3.3-70b-versatile")
+            logger.info(f"🤖 Calling Groq API with model: {CHAT_MODEL}")
             
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "You are an AI assistant that answers questions about meeting transcripts. Be concise and accurate."},
-                    {"role": "user", "content": context}
-                ],
-                temperature=0.5,
-                max_tokens=300
-            )
+            with llm_timer("groq", "chat"):
+                response = self.client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=self._messages(question, transcript),
+                    temperature=0.5,
+                    max_tokens=300
+                )
             
             answer = response.choices[0].message.content
             logger.info(f"✅ Groq API response received successfully")
@@ -70,6 +79,53 @@ class ChatbotService:
                 "relevant_segments": []
             }
     
+    async def stream_answer(self, question: str, transcript: str, segments: List[Dict]) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Answer a question token by token
+
+        Yields (event, data) pairs: "segments" with the relevant segments first,
+        then one "token" per streamed delta, then "done" with the full answer
+        (or "error"). Closing the generator closes the Groq stream, so abandoned
+        generations stop being billed.
+        """
+        yield "segments", {"relevant_segments": self._find_relevant_segments(question, segments)}
+
+        if not self.async_client:
+            yield "error", {"detail": "Chatbot requires Groq API key. Please configure GROQ_API_KEY in your .env file."}
+            return
+
+        parts = []
+        stream = None
+        try:
+            with llm_timer("groq", "chat_stream"):
+                start = time.perf_counter()
+                stream = await self.async_client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=self._messages(question, transcript),
+                    temperature=0.5,
+                    max_tokens=300,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    token = chunk.choices[0].delta.content
+                    if not token:
+                        continue
+                    if not parts:
+                        observe_first_token("groq", "chat_stream", time.perf_counter() - start)
+                    parts.append(token)
+                    yield "token", {"text": token}
+        except Exception as e:
+            logger.error(f"Chatbot stream error: {str(e)}")
+            yield "error", {"detail": f"Error processing question: {str(e)}"}
+            return
+        finally:
+            if stream is not None:
+                await stream.close()
+
+        yield "done", {"answer": "".join(parts)}
+    
     def _find_relevant_segments(self, question: str, segments: List[Dict], limit: int = 3) -> List[Dict]:
         """Find segments most relevant to the question"""
         question_words = set(question.lower().split())
@@ -4,7 +4,12 @@ Identifies and separates different speakers in audio
 """
 import logging
 import os
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Union
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import model_load_timer
 
 # Ensure huggingface_hub exposes is_offline_mode for older pyannote imports.
 try:
@@ -18,6 +23,15 @@ except Exception:
 
 logger = logging.getLogger(__name__)
 
+DIARIZATION_PIPELINE = "pyannote/speaker-diarization-3.1"
+
+# Single speaker covering everything; returned when diarization is unavailable
+FALLBACK_TURN = {"speaker": "Speaker 1", "start": 0.0, "end": 999999.0}
+
+def is_fallback(turns: List[Dict]) -> bool:
+    """True for the placeholder result rather than real speaker turns"""
+    return turns == [FALLBACK_TURN]
+
 class DiarizationService:
     def __init__(self, hf_token: str = None):
         """
@@ -25,6 +39,7 @@ class DiarizationService:
         Requires HuggingFace token for model access
         """
         self.pipeline = None
+        self.embedding_model = None
         self.hf_token = hf_token
         logger.info("Diarization service initialized")
     
@@ -55,9 +70,8 @@ class DiarizationService:
                 os.environ.setdefault("HF_TOKEN", self.hf_token)
                 os.environ.setdefault("HUGGINGFACE_HUB_TOKEN", self.hf_token)
 
-            self.pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1"
-            )
+            with model_load_timer("pyannote:diarization"):
+                self.pipeline = Pipeline.from_pretrained(DIARIZATION_PIPELINE)
             logger.info("✅ Diarization pipeline loaded successfully")
             return self.pipeline
         except Exception as e:
@@ -65,15 +79,24 @@ class DiarizationService:
             logger.warning("Make sure you've accepted the terms at: https://huggingface.co/pyannote/speaker-diarization-3.1")
             return None
     
-    def identify_speakers(self, audio_path: str, num_speakers: int = None, min_speakers: int = 1, max_speakers: int = 10) -> List[Dict]:
+    def identify_speakers(
+        self,
+        audio_path: Union[str, np.ndarray],
+        num_speakers: int = None,
+        min_speakers: int = 1,
+        max_speakers: int = 10,
+        speech=None
+    ) -> List[Dict]:
         """
         Identify speakers in audio file using Pyannote
         
         Args:
-            audio_path: Path to audio file
+            audio_path: Path to audio file or a 16 kHz mono waveform
             num_speakers: Exact number of speakers (optional)
             min_speakers: Minimum number of speakers
             max_speakers: Maximum number of speakers
+            speech: Optional SpeechMap; only its speech audio is diarized and
+                turns are mapped back to the original recording
         
         Returns:
             List of speaker segments with timestamps
@@ -83,15 +106,27 @@ class DiarizationService:
             
             if not pipeline:
                 logger.warning("Diarization pipeline not available - returning single speaker")
-                return [{"speaker": "Speaker 1", "start": 0.0, "end": 999999.0}]
+                return [dict(FALLBACK_TURN)]
             
-            logger.info(f"Identifying speakers in: {audio_path}")
+            if speech is not None:
+                audio_path = speech.audio
+
+            logger.info(f"Identifying speakers in: {audio_path if isinstance(audio_path, str) else 'waveform'}")
+
+            audio_input = audio_path
+            if isinstance(audio_path, np.ndarray):
+                import torch
+
+                audio_input = {
+                    "waveform": torch.from_numpy(np.ascontiguousarray(audio_path, dtype=np.float32))[None],
+                    "sample_rate": 16000
+                }
             
             # Run diarization
             if num_speakers:
-                diarization = pipeline(audio_path, num_speakers=num_speakers)
+                diarization = pipeline(audio_input, num_speakers=num_speakers)
             else:
-                diarization = pipeline(audio_path, min_speakers=min_speakers, max_speakers=max_speakers)
+                diarization = pipeline(audio_input, min_speakers=min_speakers, max_speakers=max_speakers)
             
             # Convert to list of segments
             speaker_segments = []
@@ -110,6 +145,9 @@ class DiarizationService:
                     "end": turn.end
                 })
             
+            if speech is not None:
+                speaker_segments = speech.remap_turns(speaker_segments)
+
             unique_speakers = len(speaker_mapping)
             logger.info(f"✅ Found {unique_speakers} unique speaker(s) in {len(speaker_segments)} segments")
             return speaker_segments
@@ -117,7 +155,148 @@ class DiarizationService:
         except Exception as e:
             logger.error(f"Diarization error: {str(e)}")
             # Fallback to single speaker
-            return [{"speaker": "Speaker 1", "start": 0.0, "end": 999999.0}]
+            return [dict(FALLBACK_TURN)]
+
+    def _load_embedding_model(self):
+        """Lazy load the speaker embedding model used for online diarization"""
+        if self.embedding_model is not None:
+            return self.embedding_model
+
+        if not self.hf_token:
+            return None
+
+        try:
+            from pyannote.audio import Inference, Model
+
+            logger.info("Loading Pyannote speaker embedding model...")
+            with model_load_timer("pyannote:embedding"):
+                model = Model.from_pretrained("pyannote/embedding", use_auth_token=self.hf_token)
+                self.embedding_model = Inference(model, window="whole")
+            logger.info("✅ Speaker embedding model loaded successfully")
+            return self.embedding_model
+        except Exception as e:
+            logger.error(f"Failed to load speaker embedding model: {str(e)}")
+            return None
+
+    def embed(self, waveform: np.ndarray, sample_rate: int = 16000) -> Optional[np.ndarray]:
+        """
+        Compute a speaker embedding for a mono waveform
+
+        Uses the Pyannote embedding model when available and falls back to a
+        coarse spectral-shape embedding so live sessions still get labels.
+        """
+        if waveform is None or len(waveform) < sample_rate * settings.ONLINE_DIARIZATION_MIN_SECONDS:
+            return None
+
+        model = self._load_embedding_model()
+        if model is not None:
+            try:
+                import torch
+
+                embedding = model({
+                    "waveform": torch.from_numpy(np.ascontiguousarray(waveform, dtype=np.float32))[None],
+                    "sample_rate": sample_rate
+                })
+                return np.asarray(embedding, dtype=np.float32).reshape(-1)
+            except Exception as e:
+                logger.error(f"Speaker embedding error: {str(e)}")
+
+        return _spectral_embedding(waveform, sample_rate)
+
+    def create_online_session(self) -> "OnlineDiarizer":
+        """Start incremental diarization state for one live session"""
+        return OnlineDiarizer(self.embed)
+
+class OnlineDiarizer:
+    """
+    Incremental speaker assignment for live streams.
+
+    Each committed segment is embedded and matched against a bounded set of
+    speaker centroids by cosine similarity. A segment either joins the closest
+    centroid (updating it with a capped running mean) or opens a new speaker
+    until ``max_speakers`` is reached, so per-segment cost stays constant.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[np.ndarray, int], Optional[np.ndarray]],
+        max_speakers: int = None,
+        threshold: float = None,
+        max_weight: int = 50
+    ):
+        self.embed_fn = embed_fn
+        self.max_speakers = max_speakers or settings.ONLINE_DIARIZATION_MAX_SPEAKERS
+        self.threshold = threshold if threshold is not None else settings.ONLINE_DIARIZATION_THRESHOLD
+        self.max_weight = max_weight
+        self.centroids: List[np.ndarray] = []
+        self.weights: List[int] = []
+        self.last_label = "Speaker 1"
+
+    def assign(self, embedding: np.ndarray) -> str:
+        """Assign an embedding to a speaker, updating that speaker's centroid"""
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return self.last_label
+        embedding = embedding / norm
+
+        if self.centroids:
+            similarities = np.stack(self.centroids) @ embedding
+            best = int(np.argmax(similarities))
+
+            if similarities[best] >= self.threshold or len(self.centroids) >= self.max_speakers:
+                # Capped weight keeps the centroid adapting to drift in long sessions
+                weight = min(self.weights[best], self.max_weight)
+                centroid = self.centroids[best] * weight + embedding
+                self.centroids[best] = centroid / np.linalg.norm(centroid)
+                self.weights[best] += 1
+                self.last_label = f"Speaker {best + 1}"
+                return self.last_label
+
+        self.centroids.append(embedding)
+        self.weights.append(1)
+        self.last_label = f"Speaker {len(self.centroids)}"
+        return self.last_label
+
+    def label_segments(self, waveform: np.ndarray, segments: List[Dict], sample_rate: int = 16000) -> List[str]:
+        """
+        Label transcript segments of a decoded chunk
+
+        Args:
+            waveform: Mono waveform the segment times refer to
+            segments: Segments with chunk-relative 'start' and 'end' seconds
+
+        Returns:
+            One speaker label per segment; segments too short to embed keep
+            the previous speaker
+        """
+        labels = []
+        for seg in segments:
+            start = int(seg["start"] * sample_rate)
+            end = int(seg["end"] * sample_rate)
+            embedding = self.embed_fn(waveform[start:end], sample_rate)
+            labels.append(self.assign(embedding) if embedding is not None else self.last_label)
+        return labels
+
+def _spectral_embedding(waveform: np.ndarray, sample_rate: int, bands: int = 32) -> np.ndarray:
+    """Average log band-energy shape of a waveform (loudness removed per frame)"""
+    frame = int(0.025 * sample_rate)
+    hop = int(0.010 * sample_rate)
+    if len(waveform) < frame:
+        return np.zeros(bands, dtype=np.float32)
+
+    count = 1 + (len(waveform) - frame) // hop
+    indices = np.arange(frame)[None, :] + hop * np.arange(count)[:, None]
+    frames = waveform[indices] * np.hanning(frame)
+    spectrum = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+
+    # Log-spaced bands between ~60 Hz and Nyquist
+    edges = np.unique(np.geomspace(4, spectrum.shape[1] - 1, bands + 1).astype(int))
+    energies = np.log(np.add.reduceat(spectrum, edges[:-1], axis=1) + 1e-10)
+    energies -= energies.mean(axis=1, keepdims=True)
+
+    embedding = np.zeros(bands, dtype=np.float32)
+    embedding[:energies.shape[1]] = energies.mean(axis=0)
+    return embedding
 
 # Singleton instance
 _diarization_service = None
@@ -126,7 +305,10 @@ def get_diarization_service(hf_token: str = None) -> DiarizationService:
     """Get or create diarization service instance"""
     global _diarization_service
     if _diarization_service is None:
-        from app.core.config import settings
-        token = hf_token or settings.HF_TOKEN
-        _diarization_service = DiarizationService(token)
+        if settings.MODEL_SERVER_SOCKET:
+            from app.services.model_server import RemoteDiarizationService
+            _diarization_service = RemoteDiarizationService()
+        else:
+            token = hf_token or settings.HF_TOKEN
+            _diarization_service = DiarizationService(token)
     return _diarization_service
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Downsampling helpers for analytics series
+Reduce long-session timelines to a target resolution while keeping their visual shape
+"""
+from collections import Counter
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+def lttb(x: Sequence[float], y: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Returns the indices of the points to keep: always the first and last, plus
+    one point per bucket chosen to maximise the triangle it forms with the
+    previously kept point and the next bucket's average, so peaks and dips survive.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        # Nothing to drop (or too few points requested to keep both ends)
+        return list(range(n))
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Interior points split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+
+        areas = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = int(start) + int(np.argmax(areas))
+        kept.append(a)
+
+    kept.append(n - 1)
+    return kept
+
+def dominant_buckets(segments: List[Dict], buckets: int, duration: float = None) -> List[Dict]:
+    """
+    Dominant emotion and speaker per equal-length time bucket
+
+    Each segment contributes its overlap (in seconds) with every bucket it
+    spans, so a bucket reports what was on screen longest. Buckets without
+    speech are omitted.
+    """
+    if not segments or buckets < 1:
+        return []
+
+    duration = duration or max(seg['end_time'] for seg in segments)
+    width = duration / buckets if duration > 0 else 1.0
+    emotions: Dict[int, Counter] = {}
+    speakers: Dict[int, Counter] = {}
+
+    for seg in segments:
+        start, end = seg['start_time'], max(seg['end_time'], seg['start_time'])
+        emotion = seg.get('emotion', 'neutral')
+        speaker = seg.get('speaker', 'Unknown')
+
+        first = min(int(start // width), buckets - 1)
+        last = min(int(end // width), buckets - 1)
+        for index in range(first, last + 1):
+            bucket_start = index * width
+            overlap = min(end, bucket_start + width) - max(start, bucket_start)
+            # Zero-length segments still count once in their bucket
+            weight = overlap if overlap > 0 else (1e-6 if first == last else 0)
+            if weight:
+                emotions.setdefault(index, Counter())[emotion] += weight
+                speakers.setdefault(index, Counter())[speaker] += weight
+
+    return [
+        {
+            "timestamp": index * width,
+            "end_time": min((index + 1) * width, duration),
+            "emotion": emotions[index].most_common(1)[0][0],
+            "speaker": speakers[index].most_common(1)[0][0]
+        }
+        for index in sorted(emotions)
+    ]
@@ -13,14 +13,23 @@ class EmotionService:
         logger.info("Emotion service initialized (demo mode)")
         self.classifier = None
     
-    def detect_emotion(self, audio_path: str, start_time: float = None, end_time: float = None) -> Dict:
+    def detect_emotion(self, audio_path: str, start_time: float = None, end_time: float = None, speech=None) -> Dict:
         """
         Detect emotion from audio segment
         
+        Args:
+            speech: Optional SpeechMap; segments that overlap none of its
+                speech regions skip the model
+        
         Returns:
             Dict with emotion label and confidence score
         """
         try:
+            if speech is not None and start_time is not None and end_time is not None:
+                # Checked on the regions alone so restored maps are not decoded
+                if not speech.remap_span(speech.to_compact(start_time), speech.to_compact(end_time)):
+                    return {"emotion": "neutral", "confidence": 0.0}
+
             # Mock emotion detection
             return {"emotion": "neutral", "confidence": 0.85}
             
@@ -0,0 +1,102 @@
+"""
+Per-session progress events
+In-process publish/subscribe used to stream upload progress over Server-Sent Events
+"""
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Events after which no more events are published for a session
+TERMINAL_EVENTS = ("done", "error")
+
+class _Channel:
+    def __init__(self):
+        self.history: List[Tuple[str, Dict]] = []
+        self.subscribers: List[asyncio.Queue] = []
+        self.closed_at: Optional[float] = None
+
+class SessionEventBus:
+    """
+    Fan-out of progress events per session.
+
+    Every event is kept in the session's history so subscribers that connect
+    late (or reconnect) replay it before receiving live events. Channels are
+    dropped ``EVENT_HISTORY_SECONDS`` after their terminal event. All methods
+    must be called on the event loop; worker threads use ``publisher``.
+    """
+
+    def __init__(self, history_seconds: float = None):
+        self.history_seconds = history_seconds if history_seconds is not None else settings.EVENT_HISTORY_SECONDS
+        self._channels: Dict[str, _Channel] = {}
+
+    def open(self, session_id: str):
+        self._expire()
+        self._channels.setdefault(session_id, _Channel())
+
+    def has(self, session_id: str) -> bool:
+        return session_id in self._channels
+
+    def publish(self, session_id: str, event: str, data: Dict):
+        channel = self._channels.get(session_id)
+        if channel is None or channel.closed_at is not None:
+            return
+
+        channel.history.append((event, data))
+        for queue in channel.subscribers:
+            queue.put_nowait((event, data))
+        if event in TERMINAL_EVENTS:
+            channel.closed_at = time.monotonic()
+
+    def publisher(self, session_id: str):
+        """Callback publishing from any thread onto the current event loop"""
+        loop = asyncio.get_running_loop()
+
+        def publish(event: str, data: Dict):
+            loop.call_soon_threadsafe(self.publish, session_id, event, data)
+        return publish
+
+    async def subscribe(self, session_id: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """Yield the session's past events, then live ones until a terminal event"""
+        channel = self._channels.get(session_id)
+        if channel is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in channel.history:
+            queue.put_nowait(item)
+        if channel.closed_at is None:
+            channel.subscribers.append(queue)
+
+        try:
+            while True:
+                event, data = await queue.get()
+                yield event, data
+                if event in TERMINAL_EVENTS:
+                    return
+        finally:
+            if queue in channel.subscribers:
+                channel.subscribers.remove(queue)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.history_seconds
+        expired = [
+            session_id for session_id, channel in self._channels.items()
+            if channel.closed_at is not None and channel.closed_at < cutoff and not channel.subscribers
+        ]
+        for session_id in expired:
+            del self._channels[session_id]
+
+# Singleton instance
+_event_bus = None
+
+def get_event_bus() -> SessionEventBus:
+    """Get or create the worker's event bus"""
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = SessionEventBus()
+    return _event_bus
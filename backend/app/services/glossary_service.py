@@ -0,0 +1,183 @@
+"""
+Keyword glossaries compiled into a multi-pattern matcher
+Finds every glossary term in a transcript with a single scan over the segments
+"""
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_collection
+from app.core.metrics import record_cache
+from app.services.text_utils import tokenize
+
+logger = logging.getLogger(__name__)
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    Patterns are matched on token boundaries, so "action" never fires inside
+    "transaction" and multi-word terms like "go live" are supported. Building
+    is linear in the total glossary size and scanning is linear in the number
+    of tokens, independent of how many terms the glossary holds.
+    """
+
+    def __init__(self, terms: Dict[str, str]):
+        # Node 0 is the root; each node maps token -> child node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[tuple]] = [[]]
+        self.size = 0
+
+        for term, category in terms.items():
+            tokens = tokenize(term)
+            if tokens:
+                self._add(tokens, " ".join(tokens), category)
+
+        self._build_failure_links()
+
+    def _add(self, tokens: List[str], term: str, category: str):
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][token] = child
+            node = child
+
+        if not any(existing == term for existing, _, _ in self._output[node]):
+            self._output[node].append((term, category, len(tokens)))
+            self.size += 1
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+
+                # Inherit shorter matches ending at the same position
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def scan(self, tokens: List[str]) -> List[tuple]:
+        """
+        Find every pattern occurrence in a token sequence
+
+        Returns:
+            List of (term, category, start_token_index) tuples
+        """
+        matches = []
+        node = 0
+        for idx, token in enumerate(tokens):
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+
+            for term, category, length in self._output[node]:
+                matches.append((term, category, idx - length + 1))
+        return matches
+
+    def find_in_segments(self, segments: List[Dict]) -> List[Dict]:
+        """
+        Scan all segments once and report every term occurrence
+
+        Returns:
+            List of occurrences with term, category, segment id and timestamps
+        """
+        occurrences = []
+        for idx, seg in enumerate(segments):
+            tokens = tokenize(seg.get("text", ""))
+            if not tokens:
+                continue
+
+            for term, category, _ in self.scan(tokens):
+                occurrences.append({
+                    "word": term,
+                    "category": category,
+                    "segment_id": seg.get("id", idx),
+                    "timestamp": float(seg.get("start_time", 0.0)),
+                    "end_time": float(seg.get("end_time", 0.0)),
+                    "speaker": seg.get("speaker")
+                })
+        return occurrences
+
+class GlossaryService:
+    """Stores per-customer glossaries and caches their compiled automata"""
+
+    def __init__(self, cache_size: int = 64):
+        self.collection = "glossaries"
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.default_automaton = KeywordAutomaton({
+            term.strip(): "important"
+            for term in settings.KEYWORD_GLOSSARY.split(",")
+            if term.strip()
+        })
+
+    async def save_glossary(self, glossary_id: str, terms: Dict[str, str]) -> Dict:
+        """Create or replace a glossary of term -> category"""
+        document = {
+            "_id": glossary_id,
+            "terms": terms,
+            "term_count": len(terms),
+            "updated_at": datetime.utcnow()
+        }
+        await get_collection(self.collection).replace_one({"_id": glossary_id}, document, upsert=True)
+        self._cache.pop(glossary_id, None)
+        return document
+
+    async def get_glossary(self, glossary_id: str) -> Optional[Dict]:
+        """Load a stored glossary document"""
+        return await get_collection(self.collection).find_one({"_id": glossary_id})
+
+    async def get_automaton(self, glossary_id: Optional[str] = None) -> KeywordAutomaton:
+        """
+        Get the compiled automaton for a glossary
+
+        Falls back to the default glossary when no id is given or it is unknown.
+        Compiled automata are cached and rebuilt only when the glossary changes.
+        """
+        if not glossary_id:
+            return self.default_automaton
+
+        meta = await get_collection(self.collection).find_one({"_id": glossary_id}, {"updated_at": 1})
+        if not meta:
+            logger.warning(f"Unknown glossary '{glossary_id}' - using default keywords")
+            return self.default_automaton
+
+        cached = self._cache.get(glossary_id)
+        if cached and cached[0] == meta["updated_at"]:
+            self._cache.move_to_end(glossary_id)
+            record_cache("glossary", True)
+            return cached[1]
+
+        record_cache("glossary", False)
+
+        glossary = await self.get_glossary(glossary_id)
+        automaton = KeywordAutomaton(glossary.get("terms", {}))
+        logger.info(f"Compiled glossary '{glossary_id}' ({automaton.size} terms)")
+
+        self._cache[glossary_id] = (glossary["updated_at"], automaton)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return automaton
+
+# Singleton instance
+_glossary_service = None
+
+def get_glossary_service() -> GlossaryService:
+    """Get or create glossary service instance"""
+    global _glossary_service
+    if _glossary_service is None:
+        _glossary_service = GlossaryService()
+    return _glossary_service
@@ -0,0 +1,198 @@
+"""
+Corpus-wide keyword statistics
+Keeps document frequencies up to date so session keywords can be TF-IDF ranked
+"""
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.database import get_collection
+from app.services.text_utils import clauses, ngrams
+
+logger = logging.getLogger(__name__)
+
+class KeywordService:
+    """
+    Incremental TF-IDF statistics over every ingested session.
+
+    ``keyword_df`` holds the number of sessions containing each n-gram,
+    ``keyword_daily`` holds per-day term counts for trend detection and
+    ``keyword_meta`` holds the corpus size and ``keyword_sessions`` each
+    session's most frequent n-grams, which its analytics are ranked from.
+    Ingesting a session only touches the n-grams that session contains.
+    """
+
+    def __init__(self, max_ngram: int = 2):
+        self.max_ngram = max_ngram
+        self.df_collection = "keyword_df"
+        self.daily_collection = "keyword_daily"
+        self.meta_collection = "keyword_meta"
+        self.session_collection = "keyword_sessions"
+
+    async def ensure_indexes(self):
+        """Create the indexes backing trend queries"""
+        await get_collection(self.daily_collection).create_index([("day", 1), ("term", 1)])
+
+    def count_terms(self, segments: List[Dict]) -> Counter:
+        """Tokenize every segment once and count candidate n-grams"""
+        counts = Counter()
+        for seg in segments:
+            for tokens in clauses(seg.get("text", "")):
+                counts.update(ngrams(tokens, self.max_ngram))
+        return counts
+
+    async def ingest_session(self, session_id: str, segments: List[Dict], created_at: datetime = None) -> Counter:
+        """
+        Fold one session into the corpus statistics
+
+        Returns:
+            The session's n-gram counts, so callers can rank without re-tokenizing
+        """
+        counts = self.count_terms(segments)
+        await self.save_session_terms(session_id, counts)
+        if not counts:
+            return counts
+
+        day = (created_at or datetime.utcnow()).strftime("%Y-%m-%d")
+
+        await get_collection(self.df_collection).bulk_write(
+            [UpdateOne({"_id": term}, {"$inc": {"df": 1}}, upsert=True) for term in counts],
+            ordered=False
+        )
+        await get_collection(self.daily_collection).bulk_write(
+            [
+                UpdateOne(
+                    {"_id": f"{day}:{term}"},
+                    {"$set": {"day": day, "term": term}, "$inc": {"count": count, "sessions": 1}},
+                    upsert=True
+                )
+                for term, count in counts.items()
+            ],
+            ordered=False
+        )
+        await get_collection(self.meta_collection).update_one(
+            {"_id": "corpus"},
+            {"$inc": {"documents": 1}},
+            upsert=True
+        )
+
+        logger.info(f"Ingested {len(counts)} keyword terms for session {session_id}")
+        return counts
+
+    async def rank_keywords(self, counts: Counter, limit: int = 10) -> List[str]:
+        """Rank a session's n-gram counts by TF-IDF against the corpus"""
+        if not counts:
+            return []
+
+        # Only the session's own terms are looked up, never the whole table
+        candidates = [term for term, _ in counts.most_common(settings.KEYWORD_MAX_CANDIDATES)]
+        df_docs = await get_collection(self.df_collection).find(
+            {"_id": {"$in": candidates}}
+        ).to_list(None)
+        df = {doc["_id"]: doc.get("df", 0) for doc in df_docs}
+
+        meta = await get_collection(self.meta_collection).find_one({"_id": "corpus"}) or {}
+        documents = meta.get("documents", 0)
+
+        scored = []
+        for term in candidates:
+            idf = math.log((documents + 1) / (df.get(term, 0) + 1)) + 1
+            scored.append((counts[term] * idf, term))
+
+        scored.sort(reverse=True)
+        return _drop_overlapping([term for _, term in scored], limit)
+
+    async def save_session_terms(self, session_id: str, counts: Counter):
+        """Store the n-gram counts ranking considers, replacing those of an earlier transcript"""
+        await get_collection(self.session_collection).replace_one(
+            {"_id": session_id},
+            {"_id": session_id, "terms": counts.most_common(settings.KEYWORD_MAX_CANDIDATES)},
+            upsert=True
+        )
+
+    async def session_keywords(self, session: Dict, limit: int = 10) -> List[str]:
+        """
+        TF-IDF ranked keywords for a session, from the counts stored at ingest
+
+        Sessions without stored counts (live, or ingested before counts were
+        kept) are tokenized; finished ones keep the result.
+        """
+        stored = await get_collection(self.session_collection).find_one({"_id": session["session_id"]})
+        if stored is not None:
+            counts = Counter(dict(stored["terms"]))
+        else:
+            counts = self.count_terms(session.get("segments", []))
+            if session.get("status", "completed") == "completed":
+                await self.save_session_terms(session["session_id"], counts)
+        return await self.rank_keywords(counts, limit)
+
+    async def trending_terms(self, days: int = 7, limit: int = 20) -> List[Dict]:
+        """
+        Terms whose usage rose in the last `days` compared with the window before
+
+        Returns:
+            List of terms with recent and previous counts and a growth ratio
+        """
+        today = datetime.utcnow()
+        recent_start = (today - timedelta(days=days)).strftime("%Y-%m-%d")
+        previous_start = (today - timedelta(days=2 * days)).strftime("%Y-%m-%d")
+
+        pipeline = [
+            {"$match": {"day": {"$gte": previous_start}}},
+            {"$group": {
+                "_id": "$term",
+                "recent": {"$sum": {"$cond": [{"$gte": ["$day", recent_start]}, "$count", 0]}},
+                "previous": {"$sum": {"$cond": [{"$lt": ["$day", recent_start]}, "$count", 0]}},
+                "sessions": {"$sum": {"$cond": [{"$gte": ["$day", recent_start]}, "$sessions", 0]}}
+            }},
+            {"$match": {"sessions": {"$gte": settings.KEYWORD_TRENDING_MIN_SESSIONS}}}
+        ]
+        rows = await get_collection(self.daily_collection).aggregate(pipeline).to_list(None)
+
+        trending = []
+        for row in rows:
+            growth = (row["recent"] + 1) / (row["previous"] + 1)
+            if growth <= 1:
+                continue
+            trending.append({
+                "term": row["_id"],
+                "recent_count": row["recent"],
+                "previous_count": row["previous"],
+                "sessions": row["sessions"],
+                "growth": round(growth, 3),
+                "score": growth * math.log(1 + row["recent"])
+            })
+
+        trending.sort(key=lambda item: item["score"], reverse=True)
+        return trending[:limit]
+
+def _drop_overlapping(terms: List[str], limit: int) -> List[str]:
+    """Skip unigrams already covered by a higher ranked n-gram (and vice versa)"""
+    selected = []
+    covered = set()
+    for term in terms:
+        words = term.split()
+        if len(words) == 1 and term in covered:
+            continue
+        if len(words) > 1 and any(s == term or s in words for s in selected):
+            continue
+        selected.append(term)
+        covered.update(words)
+        if len(selected) >= limit:
+            break
+    return selected
+
+# Singleton instance
+_keyword_service = None
+
+def get_keyword_service() -> KeywordService:
+    """Get or create keyword service instance"""
+    global _keyword_service
+    if _keyword_service is None:
+        _keyword_service = KeywordService(settings.KEYWORD_MAX_NGRAM)
+    return _keyword_service
@@ -0,0 +1,132 @@
+"""
+Persistence for live WebSocket sessions
+Appends streamed segments to the transcriptions collection in batches
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_collection
+
+logger = logging.getLogger(__name__)
+
+class LiveSessionWriter:
+    """
+    Incrementally persists one live session.
+
+    Segments are buffered and written with a single ``$push``/``$each`` once
+    ``batch_size`` segments are pending or ``flush_interval`` seconds have
+    passed, so hundreds of concurrent streams cost a few writes per minute
+    each instead of one write per chunk.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        batch_size: int = None,
+        flush_interval: float = None
+    ):
+        self.session_id = session_id
+        self.batch_size = batch_size or settings.LIVE_FLUSH_SEGMENTS
+        self.flush_interval = flush_interval or settings.LIVE_FLUSH_SECONDS
+        self.segments: List[Dict] = []
+        self.language: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self._pending: List[Dict] = []
+        self._last_flush = time.monotonic()
+        self._started = False
+        self._finalized = False
+
+    @property
+    def duration(self) -> float:
+        """End time of the last committed segment"""
+        return self.segments[-1]["end_time"] if self.segments else 0.0
+
+    async def start(self, language: Optional[str] = None):
+        """Create the session document in its live state"""
+        self.language = language
+        await get_collection("transcriptions").insert_one({
+            "_id": self.session_id,
+            "session_id": self.session_id,
+            "source": "live",
+            "status": "live",
+            "segments": [],
+            "speakers": [],
+            "keywords": [],
+            "summary": None,
+            "action_items": [],
+            "language": language,
+            "duration": 0,
+            "created_at": self.created_at,
+            "updated_at": self.created_at
+        })
+        self._started = True
+
+    async def append(self, segments: List[Dict]):
+        """Queue committed segments and flush if the batch is due"""
+        if not segments:
+            return
+
+        self.segments.extend(segments)
+        self._pending.extend(segments)
+        await self.maybe_flush()
+
+    async def maybe_flush(self):
+        """Flush when enough segments are pending or the interval has elapsed"""
+        if not self._pending:
+            return
+
+        if (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            await self.flush()
+
+    async def flush(self):
+        """Write all pending segments in one update"""
+        if not self._started or not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+        try:
+            await get_collection("transcriptions").update_one(
+                {"_id": self.session_id},
+                {
+                    "$push": {"segments": {"$each": batch}},
+                    "$set": {
+                        "duration": self.duration,
+                        "language": self.language,
+                        "updated_at": datetime.utcnow()
+                    }
+                }
+            )
+        except Exception:
+            # Keep the batch so the next flush (or finalize) retries it
+            self._pending = batch + self._pending
+            raise
+
+    async def finalize(self, fields: Dict, error: Optional[str] = None):
+        """Flush remaining segments and mark the session completed, or failed with `error`"""
+        if not self._started or self._finalized:
+            return
+
+        await self.flush()
+        if error:
+            fields = {**fields, "error": error}
+        await get_collection("transcriptions").update_one(
+            {"_id": self.session_id},
+            {"$set": {
+                **fields,
+                "status": "failed" if error else "completed",
+                "duration": self.duration,
+                "language": self.language,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+        self._finalized = True
+        logger.info(f"Live session finalized: {self.session_id} ({len(self.segments)} segments)")
@@ -0,0 +1,116 @@
+"""
+Load-adaptive Whisper model selection
+Picks the model size and beam width per job from queue depth, audio duration
+and an optional latency target
+"""
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.services.whisper_tuning import calibrated_rtf
+
+logger = logging.getLogger(__name__)
+
+# Greedy decoding costs roughly this fraction of beam-5 decoding
+GREEDY_COST = 0.6
+
+@dataclass
+class ModelChoice:
+    model_size: str
+    beam_size: int
+    expected_latency: Optional[float] = None
+    reason: str = "static"
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class ModelPolicy:
+    """
+    Chooses the largest (model, beam) pair whose predicted latency fits.
+
+    Predicted latency is ``duration * rtf * (jobs_ahead + 1)`` where ``rtf`` is
+    the real-time factor of the model on this hardware (measured by
+    calibration when available, else configured) and
+    ``jobs_ahead`` is the model queue depth spread over the model slots.
+    Idle workers therefore get the biggest model, busy ones degrade.
+    """
+
+    def __init__(self, ladder: List[str] = None, rtf: Dict[str, float] = None):
+        self.ladder = ladder or [m.strip() for m in settings.WHISPER_MODEL_LADDER.split(",") if m.strip()]
+        self.rtf = rtf or {**settings.WHISPER_MODEL_RTF, **calibrated_rtf()}
+
+    def _candidates(self):
+        """(model, beam) pairs from most to least expensive"""
+        for model_size in reversed(self.ladder):
+            for beam_size in (5, 1):
+                cost = self.rtf.get(model_size, 1.0) * (1.0 if beam_size == 5 else GREEDY_COST)
+                yield model_size, beam_size, cost
+
+    def choose(
+        self,
+        audio_duration: Optional[float],
+        latency_target: Optional[float] = None,
+        queue_depth: int = 0,
+        concurrency: int = 1
+    ) -> ModelChoice:
+        """
+        Pick a model for one job
+
+        Args:
+            audio_duration: Length of the recording in seconds (None if unknown)
+            latency_target: Requested end-to-end budget in seconds
+            queue_depth: Jobs active or waiting on the model slots
+            concurrency: Number of model slots
+        """
+        if not settings.WHISPER_ADAPTIVE:
+            return ModelChoice(settings.WHISPER_MODEL, 5)
+
+        if not audio_duration:
+            return ModelChoice(settings.WHISPER_MODEL, 5, reason="unknown duration")
+
+        target = latency_target or max(
+            audio_duration * settings.WHISPER_TARGET_RTF,
+            settings.WHISPER_MIN_LATENCY_TARGET
+        )
+        load = 1 + queue_depth / max(concurrency, 1)
+
+        fallback = None
+        for model_size, beam_size, cost in self._candidates():
+            expected = audio_duration * cost * load
+            fallback = ModelChoice(model_size, beam_size, round(expected, 2), "over budget")
+            if expected <= target:
+                return ModelChoice(
+                    model_size,
+                    beam_size,
+                    round(expected, 2),
+                    f"fits {target:.0f}s target at load {load:.1f}"
+                )
+
+        # Nothing fits: the cheapest option still gives the best latency
+        return fallback
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """Read the duration of an audio file from its container without decoding it"""
+    try:
+        import av
+
+        with av.open(audio_path) as container:
+            if container.duration:
+                return container.duration / av.time_base
+            stream = container.streams.audio[0]
+            if stream.duration and stream.time_base:
+                return float(stream.duration * stream.time_base)
+    except Exception as e:
+        logger.warning(f"Could not probe duration of {audio_path}: {str(e)}")
+    return None
+
+# Singleton instance
+_model_policy = None
+
+def get_model_policy() -> ModelPolicy:
+    """Get or create model policy instance"""
+    global _model_policy
+    if _model_policy is None:
+        _model_policy = ModelPolicy()
+    return _model_policy
@@ -0,0 +1,315 @@
+"""
+Local model server
+Owns the Whisper and Pyannote models in one process and serves inference to
+web workers over a Unix socket, so each uvicorn worker stays light.
+
+Run with: python -m app.services.model_server
+"""
+import argparse
+import logging
+import os
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.diarization_service import FALLBACK_TURN, DiarizationService
+from app.services.transcription_service import TranscriptionService, serving_model_sizes
+
+logger = logging.getLogger(__name__)
+
+class ModelServerError(RuntimeError):
+    """Raised on the client when the model server reports a failure"""
+
+# Used when neither --socket nor MODEL_SERVER_SOCKET is given
+DEFAULT_SOCKET = "run/model-server.sock"
+
+def _authkey() -> bytes:
+    """The connection secret; a missing or placeholder key would let any local user run code in the server"""
+    key = settings.MODEL_SERVER_AUTHKEY
+    if not key or key == type(settings).model_fields["SECRET_KEY"].default:
+        raise ModelServerError("MODEL_SERVER_AUTHKEY must be set to a secret of its own")
+    return key.encode()
+
+def _private_socket_dir(socket_path: str) -> str:
+    """Create the socket's directory owner-only, refusing one other users can reach"""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise ModelServerError(
+            f"Model server socket directory {directory} must be owned by this user with mode 0700"
+        )
+    return directory
+
+def _audio_path(path: str) -> str:
+    """Resolve a client-sent path, allowing only recordings in the audio storage directories"""
+    resolved = os.path.realpath(path)
+    for root in (settings.AUDIO_HOT_DIR, settings.AUDIO_ARCHIVE_DIR):
+        root = os.path.realpath(root)
+        if os.path.commonpath([resolved, root]) == root:
+            return resolved
+    raise PermissionError(f"Model server only reads audio from the storage directories, not {path}")
+
+def _share_waveform(waveform: np.ndarray):
+    """Copy a waveform into a shared memory block instead of pickling it over the socket"""
+    waveform = np.ascontiguousarray(waveform, dtype=np.float32)
+    shm = shared_memory.SharedMemory(create=True, size=max(waveform.nbytes, 1))
+    np.ndarray(waveform.shape, dtype=np.float32, buffer=shm.buf)[:] = waveform
+    return shm, {"shm": shm.name, "shape": waveform.shape}
+
+def _attach_waveform(ref: Dict) -> np.ndarray:
+    """Read a waveform the client placed in shared memory"""
+    shm = shared_memory.SharedMemory(name=ref["shm"])
+    try:
+        # The client owns the block; stop this process's tracker from unlinking it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return np.ndarray(tuple(ref["shape"]), dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+
+class ModelServer:
+    """
+    Serves model inference requests over a local socket.
+
+    Each client connection is handled on its own thread. Whisper models are
+    created per size on first use; the Pyannote pipeline and embedding model
+    are not thread safe so their calls are serialized.
+    """
+
+    def __init__(self, socket_path: str = None):
+        self.socket_path = socket_path or settings.MODEL_SERVER_SOCKET
+        self.transcription_services: Dict[str, TranscriptionService] = {}
+        self.diarization_service = DiarizationService(settings.HF_TOKEN)
+        self._services_lock = threading.Lock()
+        self._diarization_lock = threading.Lock()
+        self._embedding_lock = threading.Lock()
+
+    def get_transcription_service(self, model_size: str) -> TranscriptionService:
+        with self._services_lock:
+            if model_size not in self.transcription_services:
+                self.transcription_services[model_size] = TranscriptionService(model_size)
+            return self.transcription_services[model_size]
+
+    def preload(self, model_sizes: List[str], diarization: bool = True):
+        """Load models before accepting connections"""
+        for size in model_sizes:
+            self.get_transcription_service(size)._load_model()
+        if diarization:
+            self.diarization_service._load_pipeline()
+
+    def handle(self, request: Dict):
+        """Dispatch one request to the owning model"""
+        op = request["op"]
+        kwargs = request.get("kwargs", {})
+
+        if op == "transcribe":
+            audio = request["audio"]
+            audio = _attach_waveform(audio) if isinstance(audio, dict) else _audio_path(audio)
+            service = self.get_transcription_service(request["model_size"])
+            return service.transcribe_audio(audio, **kwargs)
+
+        if op == "diarize":
+            audio = request["audio"]
+            audio = _attach_waveform(audio) if isinstance(audio, dict) else _audio_path(audio)
+            with self._diarization_lock:
+                return self.diarization_service.identify_speakers(audio, **kwargs)
+
+        if op == "embed":
+            waveform = _attach_waveform(request["audio"])
+            with self._embedding_lock:
+                return self.diarization_service.embed(waveform, **kwargs)
+
+        if op == "ping":
+            return {"models": sorted(self.transcription_services)}
+
+        raise ValueError(f"Unknown model server operation: {op}")
+
+    def _serve_connection(self, conn):
+        try:
+            while True:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    break
+
+                try:
+                    conn.send({"ok": True, "result": self.handle(request)})
+                except Exception as e:
+                    logger.error(f"Model server error ({request.get('op')}): {str(e)}")
+                    conn.send({"ok": False, "error": str(e)})
+        finally:
+            conn.close()
+
+    def serve_forever(self):
+        """Accept connections until the process is stopped"""
+        authkey = _authkey()
+        _private_socket_dir(self.socket_path)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        # The socket is created owner read/write only
+        umask = os.umask(0o177)
+        try:
+            listener = Listener(self.socket_path, family="AF_UNIX", authkey=authkey)
+        finally:
+            os.umask(umask)
+
+        with listener:
+            logger.info(f"✅ Model server listening on {self.socket_path}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.warning(f"Model server rejected connection: {str(e)}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+class ModelServerClient:
+    """Thread-safe client keeping one socket connection per calling thread"""
+
+    def __init__(self, socket_path: str = None, timeout: float = None):
+        self.socket_path = socket_path or settings.MODEL_SERVER_SOCKET
+        self.timeout = timeout or settings.MODEL_SERVER_TIMEOUT
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.socket_path, family="AF_UNIX", authkey=_authkey())
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def call(self, request: Dict):
+        """Send a request and wait for its result, reconnecting once on a broken socket"""
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send(request)
+                if not conn.poll(self.timeout):
+                    # A late reply would desynchronize this connection, so drop it
+                    self._drop_connection()
+                    raise ModelServerError(f"Model server timed out after {self.timeout}s")
+                response = conn.recv()
+                break
+            except (EOFError, OSError):
+                self._drop_connection()
+                if attempt:
+                    raise
+
+        if not response["ok"]:
+            raise ModelServerError(response["error"])
+        return response["result"]
+
+    def call_with_waveform(self, request: Dict, waveform: np.ndarray):
+        """Send a request whose audio travels through shared memory"""
+        shm, ref = _share_waveform(waveform)
+        try:
+            return self.call({**request, "audio": ref})
+        finally:
+            shm.close()
+            shm.unlink()
+
+class RemoteTranscriptionService(TranscriptionService):
+    """TranscriptionService that runs Whisper in the model server"""
+
+    def __init__(self, model_size: str = "base", client: ModelServerClient = None):
+        super().__init__(model_size)
+        self.client = client or get_model_server_client()
+
+    def _load_model(self):
+        raise RuntimeError("Models are owned by the model server in this process")
+
+    def stream_segments(self, audio_path, language: str = None, task: str = "transcribe", beam_size: int = 5, speech=None):
+        # Results come back from the server in one message, so segments arrive together
+        result = self.transcribe_audio(audio_path, language, task, beam_size, speech)
+        return iter(result["segments"]), result["language"]
+
+    def transcribe_audio(self, audio_path, language: str = None, task: str = "transcribe", beam_size: int = 5, speech=None) -> Dict:
+        request = {
+            "op": "transcribe",
+            "model_size": self.model_size,
+            "kwargs": {"language": language, "task": task, "beam_size": beam_size}
+        }
+        if speech is not None:
+            # Speech regions are remapped here; the server only sees the compact audio
+            result = self.client.call_with_waveform(request, speech.audio)
+            speech.remap_segments(result["segments"])
+            return result
+        if isinstance(audio_path, np.ndarray):
+            return self.client.call_with_waveform(request, audio_path)
+        # Files are on the same host, so only the path crosses the socket
+        return self.client.call({**request, "audio": os.path.abspath(audio_path)})
+
+class RemoteDiarizationService(DiarizationService):
+    """DiarizationService that runs Pyannote in the model server"""
+
+    def __init__(self, client: ModelServerClient = None):
+        super().__init__(None)
+        self.client = client or get_model_server_client()
+
+    def identify_speakers(self, audio_path, num_speakers: int = None, min_speakers: int = 1, max_speakers: int = 10, speech=None) -> List[Dict]:
+        request = {
+            "op": "diarize",
+            "kwargs": {"num_speakers": num_speakers, "min_speakers": min_speakers, "max_speakers": max_speakers}
+        }
+        try:
+            if speech is not None:
+                return speech.remap_turns(self.client.call_with_waveform(request, speech.audio))
+            if isinstance(audio_path, np.ndarray):
+                return self.client.call_with_waveform(request, audio_path)
+            return self.client.call({**request, "audio": os.path.abspath(audio_path)})
+        except Exception as e:
+            logger.error(f"Remote diarization error: {str(e)}")
+            return [dict(FALLBACK_TURN)]
+
+    def embed(self, waveform: np.ndarray, sample_rate: int = 16000) -> Optional[np.ndarray]:
+        try:
+            return self.client.call_with_waveform({"op": "embed", "kwargs": {"sample_rate": sample_rate}}, waveform)
+        except Exception as e:
+            logger.error(f"Remote speaker embedding error: {str(e)}")
+            return None
+
+# Singleton client
+_model_server_client = None
+
+def get_model_server_client() -> ModelServerClient:
+    """Get or create the model server client for this worker"""
+    global _model_server_client
+    if _model_server_client is None:
+        _model_server_client = ModelServerClient()
+    return _model_server_client
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve transcription models to local web workers")
+    parser.add_argument("--socket", default=settings.MODEL_SERVER_SOCKET or DEFAULT_SOCKET)
+    parser.add_argument("--preload", default=",".join(serving_model_sizes()), help="Comma separated Whisper sizes to load at startup")
+    parser.add_argument("--no-diarization", action="store_true", help="Skip preloading the Pyannote pipeline")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Refuse to start (before loading any model) without a usable key and socket directory
+    try:
+        _authkey()
+        _private_socket_dir(args.socket)
+    except ModelServerError as e:
+        parser.error(str(e))
+
+    server = ModelServer(args.socket)
+    server.preload([size for size in args.preload.split(",") if size], diarization=not args.no_diarization)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
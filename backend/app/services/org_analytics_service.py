@@ -0,0 +1,288 @@
+"""
+Organization-wide analytics
+Per-session summaries written at ingest and aggregated inside MongoDB across sessions
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_collection
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# $dateToString formats for each reporting interval
+INTERVAL_FORMATS = {
+    "day": "%Y-%m-%d",
+    "week": "%G-W%V",
+    "month": "%Y-%m"
+}
+
+class OrgAnalyticsService:
+    """
+    Cross-session analytics without loading transcripts.
+
+    Every ingested session leaves a small summary in ``session_stats`` and one
+    document per speaker in ``speaker_stats`` (speaking time, words, seconds per
+    emotion). Reports are aggregation pipelines over those collections, filtered
+    on indexed ``created_at`` and speaker fields, so their cost follows the number
+    of matching summaries rather than the size of the transcripts. Results are
+    cached per worker for ``ORG_ANALYTICS_CACHE_SECONDS``.
+    """
+
+    def __init__(self, cache_seconds: float = None, cache_size: int = None):
+        self.sessions_collection = "session_stats"
+        self.speakers_collection = "speaker_stats"
+        self.cache_seconds = cache_seconds if cache_seconds is not None else settings.ORG_ANALYTICS_CACHE_SECONDS
+        self.cache_size = cache_size or settings.ORG_ANALYTICS_CACHE_SIZE
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    async def ensure_indexes(self):
+        """Create the indexes backing date-range and speaker filters"""
+        await get_collection("transcriptions").create_index([("created_at", -1)])
+        sessions = get_collection(self.sessions_collection)
+        await sessions.create_index([("created_at", 1)])
+        await sessions.create_index([("speakers", 1), ("created_at", 1)])
+        speakers = get_collection(self.speakers_collection)
+        await speakers.create_index([("created_at", 1)])
+        await speakers.create_index([("speaker", 1), ("created_at", 1)])
+        await speakers.create_index("session_id")
+
+    def summarize_session(self, session_id: str, segments: List[Dict], created_at: datetime, duration: float = None, language: str = None):
+        """Build the session summary and per-speaker documents for one session"""
+        per_speaker: Dict[str, Dict] = {}
+        for seg in segments:
+            speaker = seg.get("speaker", "Unknown")
+            length = max(0.0, seg.get("end_time", 0.0) - seg.get("start_time", 0.0))
+            emotion = seg.get("emotion", "neutral")
+
+            stats = per_speaker.setdefault(speaker, {"duration": 0.0, "segments": 0, "words": 0, "emotions": {}})
+            stats["duration"] += length
+            stats["segments"] += 1
+            stats["words"] += len(seg.get("text", "").split())
+            emotion_stats = stats["emotions"].setdefault(emotion, {"seconds": 0.0, "segments": 0})
+            emotion_stats["seconds"] += length
+            emotion_stats["segments"] += 1
+
+        speaker_docs = [
+            {
+                "_id": f"{session_id}:{speaker}",
+                "session_id": session_id,
+                "speaker": speaker,
+                "created_at": created_at,
+                "duration": stats["duration"],
+                "segments": stats["segments"],
+                "words": stats["words"],
+                # Array form so pipelines can $unwind emotions
+                "emotions": [
+                    {"emotion": emotion, **values}
+                    for emotion, values in stats["emotions"].items()
+                ]
+            }
+            for speaker, stats in per_speaker.items()
+        ]
+        session_doc = {
+            "_id": session_id,
+            "session_id": session_id,
+            "created_at": created_at,
+            "duration": duration if duration is not None else (segments[-1]["end_time"] if segments else 0.0),
+            "speech_duration": sum(stats["duration"] for stats in per_speaker.values()),
+            "segments": len(segments),
+            "words": sum(stats["words"] for stats in per_speaker.values()),
+            "language": language,
+            "speakers": sorted(per_speaker)
+        }
+        return session_doc, speaker_docs
+
+    async def ingest_session(self, session_id: str, segments: List[Dict], created_at: datetime = None, duration: float = None, language: str = None):
+        """Write (or replace) the summaries of one session"""
+        session_doc, speaker_docs = self.summarize_session(
+            session_id, segments, created_at or datetime.utcnow(), duration, language
+        )
+
+        await get_collection(self.sessions_collection).replace_one({"_id": session_id}, session_doc, upsert=True)
+        speakers = get_collection(self.speakers_collection)
+        await speakers.delete_many({"session_id": session_id})
+        if speaker_docs:
+            await speakers.insert_many(speaker_docs, ordered=False)
+
+        # New data: this worker's cached reports may be stale
+        self._cache.clear()
+        logger.info(f"Ingested org analytics for session {session_id} ({len(speaker_docs)} speakers)")
+
+    async def speaker_report(self, start: datetime, end: datetime, speakers: Optional[List[str]] = None, limit: int = 50) -> List[Dict]:
+        """Speaking time, words and sessions per speaker"""
+        pipeline = [
+            {"$match": _match(start, end, "speaker", speakers)},
+            {"$group": {
+                "_id": "$speaker",
+                "speaking_time": {"$sum": "$duration"},
+                "segments": {"$sum": "$segments"},
+                "words": {"$sum": "$words"},
+                "sessions": {"$sum": 1},
+                "first_seen": {"$min": "$created_at"},
+                "last_seen": {"$max": "$created_at"}
+            }},
+            {"$sort": {"speaking_time": -1}},
+            {"$limit": limit}
+        ]
+
+        async def run():
+            rows = await get_collection(self.speakers_collection).aggregate(pipeline).to_list(None)
+            total = sum(row["speaking_time"] for row in rows) or 1.0
+            return [
+                {
+                    "speaker": row["_id"],
+                    "speaking_time": row["speaking_time"],
+                    "share": row["speaking_time"] / total,
+                    "segments": row["segments"],
+                    "words": row["words"],
+                    "words_per_minute": row["words"] / row["speaking_time"] * 60 if row["speaking_time"] else 0.0,
+                    "sessions": row["sessions"],
+                    "first_seen": row["first_seen"],
+                    "last_seen": row["last_seen"]
+                }
+                for row in rows
+            ]
+
+        return await self._cached(("speakers", start, end, _key(speakers), limit), run)
+
+    async def emotion_trend(self, start: datetime, end: datetime, interval: str = "day", speakers: Optional[List[str]] = None) -> List[Dict]:
+        """Seconds spoken in each emotion per interval"""
+        pipeline = [
+            {"$match": _match(start, end, "speaker", speakers)},
+            {"$unwind": "$emotions"},
+            {"$group": {
+                "_id": {"period": _period(interval), "emotion": "$emotions.emotion"},
+                "seconds": {"$sum": "$emotions.seconds"},
+                "segments": {"$sum": "$emotions.segments"}
+            }},
+            {"$sort": {"_id.period": 1}}
+        ]
+
+        async def run():
+            rows = await get_collection(self.speakers_collection).aggregate(pipeline).to_list(None)
+            periods: "OrderedDict[str, Dict]" = OrderedDict()
+            for row in rows:
+                period = periods.setdefault(row["_id"]["period"], {"period": row["_id"]["period"], "emotions": {}, "segments": {}})
+                period["emotions"][row["_id"]["emotion"]] = row["seconds"]
+                period["segments"][row["_id"]["emotion"]] = row["segments"]
+            return list(periods.values())
+
+        return await self._cached(("emotions", start, end, interval, _key(speakers)), run)
+
+    async def meeting_volume(self, start: datetime, end: datetime, interval: str = "day", speakers: Optional[List[str]] = None) -> List[Dict]:
+        """Sessions, recorded time and speech time per interval"""
+        pipeline = [
+            {"$match": _match(start, end, "speakers", speakers)},
+            {"$group": {
+                "_id": _period(interval),
+                "sessions": {"$sum": 1},
+                "duration": {"$sum": "$duration"},
+                "speech_duration": {"$sum": "$speech_duration"},
+                "words": {"$sum": "$words"}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+
+        async def run():
+            rows = await get_collection(self.sessions_collection).aggregate(pipeline).to_list(None)
+            return [
+                {
+                    "period": row["_id"],
+                    "sessions": row["sessions"],
+                    "duration": row["duration"],
+                    "speech_duration": row["speech_duration"],
+                    "words": row["words"]
+                }
+                for row in rows
+            ]
+
+        return await self._cached(("volume", start, end, interval, _key(speakers)), run)
+
+    async def backfill(self, batch_size: int = 100) -> int:
+        """Summarize completed sessions that have no summary yet (e.g. created before this feature)"""
+        summarized = set()
+        async for doc in get_collection(self.sessions_collection).find({}, {"_id": 1}):
+            summarized.add(doc["_id"])
+
+        count = 0
+        cursor = get_collection("transcriptions").find(
+            {"status": {"$nin": ["processing", "live", "failed"]}},
+            {"session_id": 1, "segments": 1, "created_at": 1, "duration": 1, "language": 1}
+        ).batch_size(batch_size)
+        async for session in cursor:
+            if session["session_id"] in summarized:
+                continue
+            await self.ingest_session(
+                session["session_id"], session.get("segments", []),
+                session.get("created_at"), session.get("duration"), session.get("language")
+            )
+            count += 1
+        return count
+
+    async def _cached(self, key: tuple, compute):
+        entry = self._cache.get(key)
+        now = time.monotonic()
+        if entry and entry[0] > now:
+            record_cache("org_analytics", True)
+            self._cache.move_to_end(key)
+            return entry[1]
+
+        record_cache("org_analytics", False)
+        result = await compute()
+        self._cache[key] = (now + self.cache_seconds, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+def _match(start: datetime, end: datetime, speaker_field: str, speakers: Optional[List[str]]) -> Dict:
+    query = {"created_at": {"$gte": start, "$lt": end}}
+    if speakers:
+        query[speaker_field] = {"$in": speakers}
+    return query
+
+def _period(interval: str) -> Dict:
+    return {"$dateToString": {"format": INTERVAL_FORMATS[interval], "date": "$created_at"}}
+
+def _key(speakers: Optional[List[str]]) -> tuple:
+    return tuple(sorted(speakers)) if speakers else ()
+
+# Singleton instance
+_org_analytics_service = None
+
+def get_org_analytics_service() -> OrgAnalyticsService:
+    """Get or create org analytics service instance"""
+    global _org_analytics_service
+    if _org_analytics_service is None:
+        _org_analytics_service = OrgAnalyticsService()
+    return _org_analytics_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Build org analytics summaries for existing sessions")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    from app.core.database import close_mongo_connection, connect_to_mongo
+
+    async def run():
+        await connect_to_mongo()
+        try:
+            service = get_org_analytics_service()
+            await service.ensure_indexes()
+            count = await service.backfill(args.batch_size)
+            print(f"Summarized {count} sessions")
+        finally:
+            await close_mongo_connection()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
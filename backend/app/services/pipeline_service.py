@@ -0,0 +1,348 @@
+"""
+Upload processing pipeline
+Blocking model stages shared by the upload endpoint and other entry points
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import observe_rtf, stage_timer
+from app.services.artifact_store import StageRun
+from app.services.diarization_service import DIARIZATION_PIPELINE, get_diarization_service, is_fallback
+from app.services.emotion_service import get_emotion_service
+from app.services.glossary_service import KeywordAutomaton
+from app.services.model_policy import ModelChoice
+from app.services.summary_service import SUMMARY_MODEL, SUMMARY_PROMPT_VERSION, get_summary_service
+from app.services.transcription_service import get_transcription_service
+from app.services.vad_service import get_vad_service
+from app.services.whisper_tuning import resolve_runtime
+
+logger = logging.getLogger(__name__)
+
+# Bump a stage's version when its code changes its output, so stored artifacts
+# of that stage (and everything downstream) are recomputed
+STAGE_VERSIONS = {"vad": 1, "transcribe": 1, "emotion": 1, "diarize": 1, "summary": 1}
+
+class TranscriptionPipeline:
+    """
+    Runs the model stages for one recording.
+
+    The methods are synchronous and CPU or network bound, so async callers
+    run them in the threadpool. ``analyze`` covers the local models and
+    ``summarize`` the LLM call, letting callers admit them separately.
+    """
+
+    def analyze(
+        self,
+        file_path: str,
+        model: ModelChoice = None,
+        on_event: Optional[Callable[[str, Dict], None]] = None,
+        artifacts: StageRun = None
+    ) -> Dict:
+        """
+        Transcribe, detect emotions and diarize a recording
+
+        Speech regions are found once up front; every model stage then runs on
+        the speech-only audio and reports times on the original timeline.
+
+        Args:
+            file_path: Path to the recording
+            model: Whisper model and beam size to use, defaults to the configured model
+            on_event: Optional progress callback; receives each transcript segment
+                as it is decoded ("segment"), then "transcript", "emotions" and
+                "speakers" as those stages complete
+            artifacts: Stage artifacts of this recording; stages whose stored
+                output matches their configuration are reused instead of run
+
+        Returns:
+            Dict with segments (speaker and emotion assigned), text, language,
+            model used and the speech map (None when VAD is off or unavailable)
+        """
+        model = model or ModelChoice(settings.WHISPER_MODEL, 5)
+        artifacts = artifacts or StageRun(None)
+        started = time.perf_counter()
+
+        # Step 0: Find speech regions
+        speech = None
+        if settings.VAD_ENABLED:
+            vad_service = get_vad_service()
+            speech = artifacts.run(
+                "vad", _vad_config(), [],
+                lambda: vad_service.compute(file_path),
+                encode=lambda speech_map: speech_map.to_artifact() if speech_map is not None else None,
+                decode=lambda stored: vad_service.restore(file_path, stored)
+            )
+        if speech is not None and not speech:
+            logger.info(f"No speech detected in {file_path}, skipping model stages")
+            return {
+                "segments": [],
+                "text": "",
+                "language": "en",
+                "model": model.to_dict(),
+                "speech_map": speech.to_dict()
+            }
+
+        # Step 1: Transcribe audio
+        transcription_service = get_transcription_service(model.model_size)
+
+        def transcribe():
+            with stage_timer("transcribe"):
+                if on_event is None:
+                    return transcription_service.transcribe_audio(
+                        file_path, beam_size=model.beam_size, speech=speech
+                    )
+                return _transcribe_progressively(
+                    transcription_service, file_path, model, speech, on_event
+                )
+
+        transcription_result = artifacts.run(
+            "transcribe", _transcribe_config(model), ["vad"], transcribe,
+            encode=lambda result: result if result["segments"] else None
+        )
+        if on_event is not None and artifacts.reused("transcribe"):
+            _replay_transcript(transcription_result, on_event)
+
+        # Step 2: Detect emotions for each segment
+        emotion_service = get_emotion_service()
+
+        def detect_emotions():
+            with stage_timer("emotion"):
+                return [
+                    emotion_service.detect_emotion(
+                        file_path,
+                        start_time=seg['start'],
+                        end_time=seg['end'],
+                        speech=speech
+                    )
+                    for seg in transcription_result['segments']
+                ]
+
+        emotions = artifacts.run(
+            "emotion", {"model": settings.EMOTION_MODEL, "version": STAGE_VERSIONS["emotion"]},
+            ["transcribe"], detect_emotions
+        )
+
+        segments = []
+        for seg, emotion_data in zip(transcription_result['segments'], emotions):
+            segments.append({
+                "id": seg['id'],
+                "text": seg['text'],
+                "start_time": seg['start'],
+                "end_time": seg['end'],
+                "speaker": "Speaker 1",
+                "emotion": emotion_data['emotion'],
+                "confidence": seg.get('confidence', 0.9)
+            })
+
+        # Step 3: Identify speakers and assign to segments
+        diarization_service = get_diarization_service()
+
+        def diarize():
+            with stage_timer("diarize"):
+                return diarization_service.identify_speakers(file_path, speech=speech)
+
+        speaker_segments = artifacts.run(
+            "diarize", {"pipeline": DIARIZATION_PIPELINE, "version": STAGE_VERSIONS["diarize"]},
+            ["vad"], diarize,
+            # The one-speaker fallback is not stored (nor the summary built on it), so it is retried
+            encode=lambda turns: None if is_fallback(turns) else turns
+        )
+
+        if speaker_segments:
+            with stage_timer("speaker_match"):
+                for seg in segments:
+                    seg["speaker"] = match_speaker(seg, speaker_segments)
+
+        if on_event is not None:
+            on_event("emotions", {"segments": [{"id": seg["id"], "emotion": seg["emotion"]} for seg in segments]})
+            on_event("speakers", {"segments": [{"id": seg["id"], "speaker": seg["speaker"]} for seg in segments]})
+
+        audio_duration = speech.total_duration if speech is not None else (
+            segments[-1]["end_time"] if segments else 0.0
+        )
+        if not artifacts.reused("transcribe"):
+            observe_rtf(model.model_size, time.perf_counter() - started, audio_duration)
+
+        return {
+            "segments": segments,
+            "text": transcription_result['text'],
+            "language": transcription_result['language'],
+            "model": model.to_dict(),
+            "speech_map": speech.to_dict() if speech is not None else None
+        }
+
+    def summarize(
+        self,
+        transcript: str,
+        segments: List[Dict],
+        glossary: KeywordAutomaton = None,
+        artifacts: StageRun = None
+    ) -> Dict:
+        """
+        Generate speaker stats, summary, action items and keywords
+
+        The LLM summary is reused from `artifacts` when the transcript, emotions
+        and speakers it was generated from are unchanged; keywords always
+        follow the current glossary.
+
+        Returns:
+            Dict with speakers, summary, action_items and keywords
+        """
+        summary_service = get_summary_service()
+        artifacts = artifacts or StageRun(None)
+        speakers = build_speaker_stats(segments)
+
+        def generate():
+            with stage_timer("summary"):
+                return summary_service.generate_summary(transcript, speakers) if segments else {}
+
+        summary_data = artifacts.run(
+            "summary",
+            {"model": SUMMARY_MODEL, "prompt": SUMMARY_PROMPT_VERSION, "version": STAGE_VERSIONS["summary"]},
+            ["transcribe", "emotion", "diarize"], generate,
+            # Fallback summaries are retried once the LLM is back
+            encode=lambda data: None if data.get("fallback") else data
+        )
+        with stage_timer("keywords"):
+            keywords = summary_service.extract_keywords(transcript, segments, glossary)
+
+        return {
+            "speakers": speakers,
+            "summary": summary_data.get('summary'),
+            "action_items": summary_data.get('action_items', []),
+            "keywords": keywords
+        }
+
+def _vad_config() -> Dict:
+    return {
+        "threshold": settings.VAD_THRESHOLD,
+        "min_silence_ms": settings.VAD_MIN_SILENCE_MS,
+        "speech_pad_ms": settings.VAD_SPEECH_PAD_MS,
+        "version": STAGE_VERSIONS["vad"]
+    }
+
+def _transcribe_config(model: ModelChoice) -> Dict:
+    return {
+        "model_size": model.model_size,
+        "beam_size": model.beam_size,
+        # Quantization changes the decoded text; threads and workers only change speed
+        "compute_type": resolve_runtime(model.model_size).compute_type,
+        "version": STAGE_VERSIONS["transcribe"]
+    }
+
+def _replay_transcript(result: Dict, on_event: Callable):
+    """Publish a reused transcript the way a progressive transcription would"""
+    for seg in result["segments"]:
+        on_event("segment", {
+            "id": seg["id"],
+            "text": seg["text"],
+            "start_time": seg["start"],
+            "end_time": seg["end"]
+        })
+    on_event("transcript", {"language": result["language"], "text": result["text"], "segment_count": len(result["segments"])})
+
+def _transcribe_progressively(transcription_service, file_path: str, model: ModelChoice, speech, on_event: Callable) -> Dict:
+    """Transcribe while publishing each segment as soon as Whisper decodes it"""
+    segments_iter, language = transcription_service.stream_segments(
+        file_path, beam_size=model.beam_size, speech=speech
+    )
+
+    segments = []
+    for seg in segments_iter:
+        segments.append(seg)
+        on_event("segment", {
+            "id": seg["id"],
+            "text": seg["text"],
+            "start_time": seg["start"],
+            "end_time": seg["end"]
+        })
+
+    text = " ".join(seg["text"] for seg in segments if seg["text"])
+    on_event("transcript", {"language": language, "text": text, "segment_count": len(segments)})
+    return {"text": text, "segments": segments, "language": language}
+
+def match_speaker(segment: dict, speaker_segments: List[dict]) -> str:
+    """Pick the diarized speaker with the largest time overlap."""
+    start_time = segment.get("start_time", 0.0)
+    end_time = segment.get("end_time", 0.0)
+
+    best_speaker = "Speaker 1"
+    best_overlap = 0.0
+
+    for speaker_seg in speaker_segments:
+        overlap = max(
+            0.0,
+            min(end_time, speaker_seg.get("end", 0.0)) - max(start_time, speaker_seg.get("start", 0.0))
+        )
+        if overlap > best_overlap:
+            best_overlap = overlap
+            best_speaker = speaker_seg.get("speaker", best_speaker)
+
+    return best_speaker
+
+def build_session_document(
+    session_id: str,
+    analysis: Dict,
+    insights: Dict,
+    audio: Dict = None,
+    artifacts: StageRun = None,
+    **extra
+) -> Dict:
+    """Assemble the stored session from `analyze` and `summarize` results; `extra` fields win"""
+    segments = analysis['segments']
+    now = datetime.utcnow()
+    return {
+        "session_id": session_id,
+        "status": "completed",
+        "segments": segments,
+        "speakers": insights['speakers'],
+        "keywords": insights['keywords'],
+        "summary": insights['summary'],
+        "action_items": insights['action_items'],
+        "language": analysis['language'],
+        "model": analysis['model'],
+        "speech_map": analysis['speech_map'],
+        "duration": segments[-1]['end_time'] if segments else 0,
+        "audio": audio,
+        "artifacts": artifacts.to_dict() if artifacts is not None else None,
+        "created_at": now,
+        "updated_at": now,
+        **extra
+    }
+
+def build_speaker_stats(segments: List[dict]) -> List[dict]:
+    """Aggregate speaker stats used by analytics and UI."""
+    speaker_data = {}
+
+    for seg in segments:
+        speaker = seg.get("speaker", "Unknown")
+        duration = seg.get("end_time", 0.0) - seg.get("start_time", 0.0)
+        emotion = seg.get("emotion", "neutral")
+
+        if speaker not in speaker_data:
+            speaker_data[speaker] = {
+                "speaker_id": speaker,
+                "total_duration": 0.0,
+                "segment_count": 0,
+                "emotion_distribution": {}
+            }
+
+        speaker_data[speaker]["total_duration"] += duration
+        speaker_data[speaker]["segment_count"] += 1
+        speaker_data[speaker]["emotion_distribution"][emotion] = (
+            speaker_data[speaker]["emotion_distribution"].get(emotion, 0) + 1
+        )
+
+    return list(speaker_data.values())
+
+# Singleton instance
+_pipeline = None
+
+def get_pipeline() -> TranscriptionPipeline:
+    """Get or create pipeline instance"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = TranscriptionPipeline()
+    return _pipeline
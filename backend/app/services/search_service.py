@@ -0,0 +1,361 @@
+"""
+Cross-session full-text search
+Maintains an inverted index of transcript segments in MongoDB
+"""
+import argparse
+import asyncio
+import logging
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+from app.core.config import settings
+from app.core.database import get_collection
+from app.services.text_utils import STOP_WORDS, normalize, tokenize
+
+logger = logging.getLogger(__name__)
+
+# BM25 tuning constants
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SNIPPET_RADIUS = 60
+
+class SearchService:
+    """
+    Inverted index over transcript segments.
+
+    Each segment is stored once in ``search_segments`` with its unique terms in a
+    multikey-indexed ``terms`` array, which gives MongoDB a term -> segment
+    posting list. Document frequencies live in ``search_terms`` and corpus totals
+    in ``search_meta`` so BM25 ranking never has to scan the corpus.
+
+    Content terms (not stop words) also get one ``search_postings`` entry per
+    segment holding the term's BM25 impact (its tf and length component), so
+    a query reads the best postings of its rarest term first and ranks a
+    bounded candidate set instead of every match.
+    """
+
+    def __init__(self):
+        self.segments_collection = "search_segments"
+        self.postings_collection = "search_postings"
+        self.terms_collection = "search_terms"
+        self.meta_collection = "search_meta"
+
+    async def ensure_indexes(self):
+        """Create the indexes backing term and session lookups"""
+        segments = get_collection(self.segments_collection)
+        await segments.create_index("terms")
+        await segments.create_index([("terms", 1), ("speaker", 1)])
+        await segments.create_index("session_id")
+
+        postings = get_collection(self.postings_collection)
+        await postings.create_index([("term", 1), ("impact", -1)])
+        await postings.create_index([("term", 1), ("speaker", 1), ("impact", -1)])
+        await postings.create_index([("term", 1), ("session_id", 1), ("impact", -1)])
+        await postings.create_index("session_id")
+
+    async def index_session(self, session_id: str, segments: List[Dict], created_at: datetime = None):
+        """
+        Add a session's segments to the index
+
+        Work is proportional to the session size: one bulk insert of segment
+        postings plus one bulk $inc of the touched document frequencies.
+        """
+        if await get_collection(self.segments_collection).find_one({"session_id": session_id}, {"_id": 1}):
+            await self.remove_session(session_id)
+
+        postings = []
+        df = Counter()
+        total_length = 0
+
+        for idx, seg in enumerate(segments):
+            tokens = tokenize(seg.get("text", ""))
+            if not tokens:
+                continue
+
+            tf = Counter(tokens)
+            df.update(tf.keys())
+            total_length += len(tokens)
+
+            segment_id = seg.get("id", idx)
+            postings.append({
+                "_id": f"{session_id}:{segment_id}",
+                "session_id": session_id,
+                "segment_id": segment_id,
+                "start_time": float(seg.get("start_time", 0.0)),
+                "end_time": float(seg.get("end_time", 0.0)),
+                "speaker": seg.get("speaker", "Unknown"),
+                "text": seg.get("text", ""),
+                "terms": list(tf.keys()),
+                "tf": dict(tf),
+                "length": len(tokens),
+                "created_at": created_at or datetime.utcnow()
+            })
+
+        if not postings:
+            return 0
+
+        # Impacts use the corpus average length at indexing time; it drifts
+        # slowly and only orders candidates, final scores use current statistics
+        meta = await get_collection(self.meta_collection).find_one({"_id": "corpus"}) or {}
+        avg_length = (meta.get("total_length", 0) or total_length) / max(meta.get("segments", 0) or len(postings), 1)
+
+        await get_collection(self.segments_collection).insert_many(postings, ordered=False)
+        impacts = [entry for posting in postings for entry in _impact_postings(posting, avg_length)]
+        if impacts:
+            await get_collection(self.postings_collection).insert_many(impacts, ordered=False)
+        await self._apply_stats(df, len(postings), total_length, sign=1)
+
+        logger.info(f"Indexed {len(postings)} segments for session {session_id}")
+        return len(postings)
+
+    async def remove_session(self, session_id: str):
+        """Drop a session's postings and roll back its term statistics"""
+        collection = get_collection(self.segments_collection)
+        postings = await collection.find(
+            {"session_id": session_id},
+            {"terms": 1, "length": 1}
+        ).to_list(None)
+
+        if not postings:
+            return 0
+
+        df = Counter()
+        total_length = 0
+        for posting in postings:
+            df.update(posting.get("terms", []))
+            total_length += posting.get("length", 0)
+
+        await collection.delete_many({"session_id": session_id})
+        await get_collection(self.postings_collection).delete_many({"session_id": session_id})
+        await self._apply_stats(df, len(postings), total_length, sign=-1)
+        return len(postings)
+
+    async def rebuild_postings(self, batch_size: int = 1000) -> int:
+        """Write impact postings for every indexed segment (e.g. indexed before they existed)"""
+        meta = await get_collection(self.meta_collection).find_one({"_id": "corpus"}) or {}
+        avg_length = max(meta.get("total_length", 0), 1) / max(meta.get("segments", 0), 1)
+        postings = get_collection(self.postings_collection)
+
+        count = 0
+        batch = []
+        cursor = get_collection(self.segments_collection).find(
+            {}, {"session_id": 1, "speaker": 1, "tf": 1, "length": 1}
+        ).batch_size(batch_size)
+        async for posting in cursor:
+            batch.extend(
+                ReplaceOne({"_id": entry["_id"]}, entry, upsert=True)
+                for entry in _impact_postings(posting, avg_length)
+            )
+            count += 1
+            if len(batch) >= batch_size:
+                await postings.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            await postings.bulk_write(batch, ordered=False)
+        return count
+
+    async def _apply_stats(self, df: Counter, segment_count: int, total_length: int, sign: int):
+        """Increment (or decrement) document frequencies and corpus totals"""
+        if df:
+            await get_collection(self.terms_collection).bulk_write(
+                [UpdateOne({"_id": term}, {"$inc": {"df": sign * count}}, upsert=True) for term, count in df.items()],
+                ordered=False
+            )
+
+        await get_collection(self.meta_collection).update_one(
+            {"_id": "corpus"},
+            {"$inc": {"segments": sign * segment_count, "total_length": sign * total_length}},
+            upsert=True
+        )
+
+    async def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        speaker: Optional[str] = None,
+        session_id: Optional[str] = None,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Search segments across all sessions
+
+        Only the SEARCH_MAX_CANDIDATES highest-impact postings of the rarest
+        query term are ranked, so a query costs the same however common its
+        terms are. ``exhaustive`` is False when that cut may have dropped matches.
+
+        Args:
+            query: Free text query, all content terms must match (stop words
+                are ignored unless the query has nothing else)
+            phrase: Require the terms to appear consecutively
+            speaker: Restrict hits to one speaker label
+            session_id: Restrict hits to one session
+            limit: Maximum number of hits to return
+
+        Returns:
+            Dict with ranked hits (timestamps and snippets) and the number of
+            matching candidates
+        """
+        terms = tokenize(query)
+        if not terms:
+            return {"query": query, "total": 0, "hits": []}
+
+        unique_terms = list(dict.fromkeys(terms))
+        content_terms = [term for term in unique_terms if term not in STOP_WORDS]
+        unique_terms = content_terms or unique_terms
+        term_docs = await get_collection(self.terms_collection).find(
+            {"_id": {"$in": unique_terms}}
+        ).to_list(None)
+        df = {doc["_id"]: doc.get("df", 0) for doc in term_docs}
+
+        # Every term is required, so a single unseen term means no hits
+        if any(df.get(term, 0) <= 0 for term in unique_terms):
+            return {"query": query, "total": 0, "hits": []}
+
+        meta = await get_collection(self.meta_collection).find_one({"_id": "corpus"}) or {}
+        corpus_size = max(meta.get("segments", 0), 1)
+        avg_length = max(meta.get("total_length", 0), 1) / corpus_size
+
+        # The rarest term selects the candidates (and leads $all)
+        unique_terms.sort(key=lambda term: df[term])
+        filters = {}
+        if speaker:
+            filters["speaker"] = speaker
+        if session_id:
+            filters["session_id"] = session_id
+
+        max_candidates = settings.SEARCH_MAX_CANDIDATES
+        if content_terms:
+            # Best postings of the rarest term first; the other terms filter those
+            candidates = [
+                entry["segment"]
+                async for entry in get_collection(self.postings_collection).find(
+                    {"term": unique_terms[0], **filters}, {"segment": 1}
+                ).sort("impact", -1).limit(max_candidates)
+            ]
+            mongo_query = {"_id": {"$in": candidates}, "terms": {"$all": unique_terms}}
+            exhaustive = len(candidates) < max_candidates
+        else:
+            # Stop words have no impact postings; take a bounded slice of the term index
+            mongo_query = {"terms": {"$all": unique_terms}, **filters}
+            exhaustive = None
+
+        projection = {
+            "session_id": 1, "segment_id": 1, "start_time": 1, "end_time": 1,
+            "speaker": 1, "text": 1, "length": 1,
+            **{f"tf.{term}": 1 for term in unique_terms}
+        }
+        matches = await get_collection(self.segments_collection).find(
+            mongo_query, projection
+        ).limit(max_candidates).to_list(None)
+        if exhaustive is None:
+            exhaustive = len(matches) < max_candidates
+
+        hits = []
+        phrase_text = f" {' '.join(terms)} "
+        for posting in matches:
+            if phrase and phrase_text not in f" {normalize(posting.get('text', ''))} ":
+                continue
+            hits.append((self._score(posting, unique_terms, df, corpus_size, avg_length), posting))
+        hits.sort(key=lambda hit: (-hit[0], hit[1]["_id"]))
+
+        return {
+            "query": query,
+            "total": len(hits),
+            "exhaustive": exhaustive,
+            "hits": [
+                {
+                    "session_id": posting["session_id"],
+                    "segment_id": posting["segment_id"],
+                    "start_time": posting["start_time"],
+                    "end_time": posting["end_time"],
+                    "speaker": posting.get("speaker", "Unknown"),
+                    "score": round(score, 4),
+                    "snippet": _build_snippet(posting.get("text", ""), terms)
+                }
+                for score, posting in hits[:limit]
+            ]
+        }
+
+    def _score(self, posting: Dict, terms: List[str], df: Dict[str, int], corpus_size: int, avg_length: float) -> float:
+        """BM25 relevance of one segment for the query terms"""
+        tf = posting.get("tf", {})
+        length_norm = 1 - BM25_B + BM25_B * posting.get("length", 0) / avg_length
+
+        score = 0.0
+        for term in terms:
+            freq = tf.get(term, 0)
+            idf = math.log(1 + (corpus_size - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * freq * (BM25_K1 + 1) / (freq + BM25_K1 * length_norm)
+        return score
+
+def _impact_postings(posting: Dict, avg_length: float) -> List[Dict]:
+    """Per content term entries of one segment, ordered within a term by BM25 impact"""
+    length_norm = 1 - BM25_B + BM25_B * posting.get("length", 0) / max(avg_length, 1e-9)
+    return [
+        {
+            "_id": f"{term}|{posting['_id']}",
+            "term": term,
+            "segment": posting["_id"],
+            "session_id": posting["session_id"],
+            "speaker": posting.get("speaker", "Unknown"),
+            "impact": freq * (BM25_K1 + 1) / (freq + BM25_K1 * length_norm)
+        }
+        for term, freq in posting.get("tf", {}).items()
+        if term not in STOP_WORDS
+    ]
+
+def _build_snippet(text: str, terms: List[str]) -> str:
+    """Cut a window of text around the first query term"""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")\b", re.IGNORECASE)
+    match = pattern.search(text)
+    if not match:
+        return text[:2 * SNIPPET_RADIUS]
+
+    start = max(0, match.start() - SNIPPET_RADIUS)
+    end = min(len(text), match.end() + SNIPPET_RADIUS)
+    snippet = text[start:end].strip()
+
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet = snippet + "…"
+    return snippet
+
+# Singleton instance
+_search_service = None
+
+def get_search_service() -> SearchService:
+    """Get or create search service instance"""
+    global _search_service
+    if _search_service is None:
+        _search_service = SearchService()
+    return _search_service
+
+def main():
+    parser = argparse.ArgumentParser(description="Build impact postings for segments already in the search index")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from app.core.database import close_mongo_connection, connect_to_mongo
+
+    async def run():
+        await connect_to_mongo()
+        try:
+            service = get_search_service()
+            await service.ensure_indexes()
+            count = await service.rebuild_postings(args.batch_size)
+            print(f"Wrote postings for {count} segments")
+        finally:
+            await close_mongo_connection()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Bounded audio buffers for live WebSocket streams
+Keeps a fixed in-memory window per connection and spills older audio to disk
+"""
+import logging
+import os
+import struct
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.transcription_service import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Header bytes examined before giving up on finding a container header
+MAX_HEADER_BYTES = 256 * 1024
+
+WEBM_EBML_ID = b"\x1a\x45\xdf\xa3"
+WEBM_CLUSTER_ID = b"\x1f\x43\xb6\x75"
+
+class BufferLimitExceeded(Exception):
+    """Raised when a stream's untranscribed audio exceeds its size limit"""
+
+class StreamBufferBudget:
+    """Worker-wide accounting of audio bytes held in memory by all streams"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, size: int):
+        with self._lock:
+            self.used_bytes += size
+
+    def release(self, size: int):
+        with self._lock:
+            self.used_bytes = max(0, self.used_bytes - size)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.used_bytes > self.max_bytes
+
+    @property
+    def usage(self) -> float:
+        return self.used_bytes / self.max_bytes if self.max_bytes else 0.0
+
+class StreamBuffer:
+    """
+    Per-connection buffer of audio not yet transcribed.
+
+    Recent chunks stay in an in-memory ring; once the window (or the worker
+    budget) is full the oldest chunks are appended to a session file on disk.
+    Containerized audio (webm/ogg) only decodes from the start of the
+    stream, so the spill file always holds a prefix and the ring the tail.
+
+    ``clear`` evicts audio once it is committed. The container header from
+    the start of the stream is kept and placed in front of later audio, whose
+    chunks are continuation clusters (or pages) that do not decode alone.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        budget: "StreamBufferBudget" = None,
+        max_memory_bytes: int = None,
+        max_pending_bytes: int = None,
+        spill_dir: str = None,
+        suffix: str = ".webm"
+    ):
+        self.session_id = session_id
+        self.budget = budget or get_stream_budget()
+        self.max_memory_bytes = max_memory_bytes or settings.STREAM_MAX_MEMORY_BYTES
+        self.max_pending_bytes = max_pending_bytes or settings.STREAM_MAX_PENDING_BYTES
+        self.spill_dir = spill_dir or settings.STREAM_SPILL_DIR
+        self.suffix = suffix
+
+        self._chunks = deque()
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+        self.spill_path: Optional[str] = None
+        self._spill_file = None
+
+        # Container header of the stream, once found in its first bytes
+        self.header: Optional[bytes] = None
+        self._head = b""
+        self._cleared = False
+
+    def __len__(self) -> int:
+        return self.memory_bytes + self.spilled_bytes
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    @property
+    def pressure(self) -> float:
+        """
+        How far behind the server is, from 0 (idle) upwards
+
+        The higher of the worker memory budget usage and this stream's share
+        of its untranscribed audio limit. Spilling alone is normal when
+        commits fall behind and does not count as pressure.
+        """
+        return max(self.budget.usage, len(self) / self.max_pending_bytes)
+
+    def append(self, chunk: bytes):
+        """Add a chunk, spilling the oldest audio to disk when over the limits"""
+        if len(self) + len(chunk) > self.max_pending_bytes:
+            raise BufferLimitExceeded(
+                f"Stream {self.session_id} exceeded {self.max_pending_bytes} untranscribed bytes"
+            )
+
+        if self.header is None:
+            self._find_header(chunk)
+
+        self._chunks.append(chunk)
+        self.memory_bytes += len(chunk)
+        self.budget.reserve(len(chunk))
+
+        while self._chunks and (self.memory_bytes > self.max_memory_bytes or self.budget.exhausted):
+            self._spill(self._chunks.popleft())
+
+    def _find_header(self, chunk: bytes):
+        self._head += chunk
+        header = container_header(self._head, self.suffix)
+        if header is None and len(self._head) < MAX_HEADER_BYTES:
+            return
+        if header is None:
+            logger.warning(f"No {self.suffix} header found in stream {self.session_id}")
+        self.header = header or b""
+        self._head = b""
+
+    def _prefix(self) -> bytes:
+        """Header to put in front of the buffered audio once the stream's start was evicted"""
+        return (self.header or b"") if self._cleared else b""
+
+    def _spill(self, chunk: bytes):
+        if self._spill_file is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = os.path.join(self.spill_dir, f"{self.session_id}{self.suffix}")
+            self._spill_file = open(self.spill_path, "wb")
+            self._spill_file.write(self._prefix())
+            logger.info(f"Spilling stream {self.session_id} to {self.spill_path}")
+
+        self._spill_file.write(chunk)
+        self.memory_bytes -= len(chunk)
+        self.spilled_bytes += len(chunk)
+        self.budget.release(len(chunk))
+
+    def materialize(self) -> Union[bytes, str]:
+        """
+        Get the buffered audio for decoding
+
+        Returns:
+            The bytes when everything is still in memory, otherwise the path of
+            the spill file with the in-memory tail appended to it
+        """
+        if self._spill_file is None:
+            return self._prefix() + b"".join(self._chunks)
+
+        while self._chunks:
+            self._spill(self._chunks.popleft())
+        self._spill_file.flush()
+        return self.spill_path
+
+    def clear(self):
+        """Evict all buffered audio (keeping the container header) and release its memory and disk"""
+        self.budget.release(self.memory_bytes)
+        self._chunks.clear()
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+        self._cleared = True
+
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                logger.warning("Failed to remove spill file: %s", self.spill_path)
+            self.spill_path = None
+
+    close = clear
+
+class CarriedAudio:
+    """
+    Decoded live audio whose transcript is not committed yet.
+
+    Each window is transcribed together with the audio carried over from the
+    previous one. While the stream runs, the last segment of a window may end
+    mid-word, so it is held back and its audio carried into the next window
+    (at most ``max_seconds`` of it). ``offset`` places the audio on the
+    session timeline; its memory counts against the worker budget.
+    """
+
+    def __init__(self, budget: StreamBufferBudget = None, max_seconds: float = None):
+        self.budget = budget or get_stream_budget()
+        self.max_seconds = max_seconds or settings.LIVE_MAX_CARRY_SECONDS
+        self.waveform = np.zeros(0, dtype=np.float32)
+        self.offset = 0.0
+
+    def __bool__(self) -> bool:
+        return len(self.waveform) > 0
+
+    @property
+    def duration(self) -> float:
+        return len(self.waveform) / SAMPLE_RATE
+
+    def extend(self, waveform: np.ndarray) -> np.ndarray:
+        """Append a decoded window; returns all audio to transcribe"""
+        waveform = np.asarray(waveform, dtype=np.float32)
+        self.budget.reserve(waveform.nbytes)
+        self.waveform = np.concatenate([self.waveform, waveform]) if len(self.waveform) else waveform
+        return self.waveform
+
+    def commit(self, segments: List[Dict], final: bool) -> List[Dict]:
+        """
+        Pick the segments to commit and evict their audio
+
+        Args:
+            segments: Transcript of the carried audio ('start'/'end' relative to it)
+            final: The stream stopped, so nothing is held back
+
+        Returns:
+            The committed segments, still relative to the audio before eviction
+        """
+        held = None
+        if not final and segments and self.duration - segments[-1]["start"] <= self.max_seconds:
+            held = segments[-1]
+            segments = segments[:-1]
+
+        self.advance(held["start"] if held else self.duration)
+        return segments
+
+    def advance(self, seconds: float):
+        """Evict the first `seconds` of audio"""
+        cut = min(int(round(seconds * SAMPLE_RATE)), len(self.waveform))
+        self.budget.release(self.waveform[:cut].nbytes)
+        self.waveform = self.waveform[cut:].copy()
+        self.offset += cut / SAMPLE_RATE
+
+    def close(self):
+        self.advance(self.duration)
+
+def container_header(data: bytes, suffix: str) -> Optional[bytes]:
+    """
+    The leading bytes of a stream needed to decode any later part of it
+
+    WebM: everything before the first Cluster. Ogg: the pages before the first
+    audio page (granule position 0, e.g. OpusHead and OpusTags).
+
+    Returns:
+        The header, b"" for formats decoded without one, or None when `data`
+        does not contain the complete header yet
+    """
+    if suffix == ".webm":
+        if not data.startswith(WEBM_EBML_ID):
+            return b""
+        end = data.find(WEBM_CLUSTER_ID)
+        return data[:end] if end > 0 else None
+
+    if suffix == ".ogg":
+        offset = 0
+        while True:
+            if len(data) < offset + 27:
+                return None
+            if data[offset:offset + 4] != b"OggS":
+                return b""
+            granule = struct.unpack_from("<q", data, offset + 6)[0]
+            if granule != 0:
+                return data[:offset] if offset else b""
+            segments = data[offset + 26]
+            if len(data) < offset + 27 + segments:
+                return None
+            offset += 27 + segments + sum(data[offset + 27:offset + 27 + segments])
+
+    return b""
+
+# Worker-wide budget instance
+_stream_budget = None
+
+def get_stream_budget() -> StreamBufferBudget:
+    """Get or create the worker-wide stream buffer budget"""
+    global _stream_budget
+    if _stream_budget is None:
+        _stream_budget = StreamBufferBudget(settings.STREAM_WORKER_MAX_MEMORY_BYTES)
+    return _stream_budget
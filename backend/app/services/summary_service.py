@@ -2,17 +2,24 @@
 AI-powered summary and action item generation
 Uses LLM to analyze transcripts and generate insights
 """
-from openai import OpenAI
 from typing import List, Dict
 import logging
 from app.core.config import settings
+from app.core.metrics import llm_timer
+from app.services.glossary_service import KeywordAutomaton, get_glossary_service
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_MODEL = "gpt-3.5-turbo"
+SUMMARY_PROMPT_VERSION = 1  # bump when the prompt changes so stored summaries are regenerated
+
 class SummaryService:
     def __init__(self):
-        """Initialize OpenAI client"""
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        """Initialize OpenAI client (the SDK is only imported when a key is configured)"""
+        self.client = None
+        if settings.OPENAI_API_KEY:
+            from openai import OpenAI
+            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
     
     def generate_summary(self, transcript: str, speakers: List[Dict]) -> Dict:
         """
@@ -45,15 +52,16 @@ Format your response as JSON:
   ]
 }}"""
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an AI assistant that analyzes meeting transcripts."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
+            with llm_timer("openai", "summary"):
+                response = self.client.chat.completions.create(
+                    model=SUMMARY_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are an AI assistant that analyzes meeting transcripts."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=500
+                )
             
             import json
             result = json.loads(response.choices[0].message.content)
@@ -69,34 +77,26 @@ Format your response as JSON:
         return {
             "summary": '. '.join(sentences) + '.',
             "key_points": ["Transcript available for review"],
-            "action_items": []
+            "action_items": [],
+            "fallback": True
         }
     
-    def extract_keywords(self, transcript: str, segments: List[Dict]) -> List[Dict]:
-        """Extract important keywords with a rough timestamp from segments."""
-        keywords = []
-
-        # Simple keyword extraction (can be enhanced with NER)
-        important_words = ['decided', 'action', 'deadline', 'important', 'critical', 'must', 'will']
-        transcript_lower = transcript.lower()
-
-        for word in important_words:
-            if word not in transcript_lower:
-                continue
+    def extract_keywords(self, transcript: str, segments: List[Dict], automaton: KeywordAutomaton = None) -> List[Dict]:
+        """
+        Find every glossary keyword occurrence in the segments
 
-            timestamp = 0.0
-            for seg in segments:
-                if word in seg.get("text", "").lower():
-                    timestamp = float(seg.get("start_time", 0.0))
-                    break
+        Args:
+            transcript: Full transcript text (unused, kept for API compatibility)
+            segments: Transcript segments to scan
+            automaton: Compiled glossary, defaults to the configured keyword list
 
-            keywords.append({
-                "word": word,
-                "timestamp": timestamp,
-                "category": "important"
-            })
+        Returns:
+            List of occurrences with word, category, segment id and timestamp
+        """
+        if automaton is None:
+            automaton = get_glossary_service().default_automaton
 
-        return keywords
+        return automaton.find_in_segments(segments)
 
 # Singleton instance
 _summary_service = None
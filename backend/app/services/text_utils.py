@@ -0,0 +1,60 @@
+"""
+Shared text normalization helpers
+Used by search indexing and keyword statistics so both see the same terms
+"""
+import re
+from typing import List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+_CLAUSE_RE = re.compile(r"[.!?,;:]+")
+
+def normalize(text: str) -> str:
+    """Lowercase text and collapse it to space separated tokens"""
+    return " ".join(tokenize(text))
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, keeping inner apostrophes"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+# English function words plus conversational fillers that dominate raw counts
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before being
+below between both but by can can't cannot could couldn't did didn't do does doesn't doing don't down during
+each few for from further get gets getting got had hadn't has hasn't have haven't having he he'd he'll he's
+her here here's hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it it's its
+itself let's me more most mustn't my myself no nor not of off on once only or other ought our ours ourselves
+out over own same shan't she she'd she'll she's should shouldn't so some such than that that's the their
+theirs them themselves then there there's these they they'd they'll they're they've this those through to
+too under until up very was wasn't we we'd we'll we're we've were weren't what what's when when's where
+where's which while who who's whom why why's with won't would wouldn't you you'd you'll you're you've your
+yours yourself yourselves
+actually basically like just really think thing things know yeah yes okay ok oh uh um hmm right well
+gonna wanna kind sort mean going go say said see lot maybe probably something anything everything stuff
+want need one two also still even much many now way make made good great sure
+""".split())
+
+def clauses(text: str) -> List[List[str]]:
+    """Tokenize text per clause so n-grams never span punctuation"""
+    if not text:
+        return []
+    return [tokens for tokens in (tokenize(part) for part in _CLAUSE_RE.split(text)) if tokens]
+
+def ngrams(tokens: List[str], max_n: int = 2) -> List[str]:
+    """
+    Build candidate keyword n-grams from a token sequence
+
+    Unigrams must be content words; longer n-grams may contain stop words
+    in the middle but not at either edge.
+    """
+    grams = []
+    for n in range(1, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            window = tokens[i:i + n]
+            if window[0] in STOP_WORDS or window[-1] in STOP_WORDS:
+                continue
+            if n == 1 and (len(window[0]) < 3 or window[0].isdigit()):
+                continue
+            grams.append(" ".join(window))
+    return grams
@@ -2,15 +2,85 @@
 Core transcription service using Whisper
 Handles audio processing and speech-to-text conversion
 """
+import io
 import logging
 import os
 import tempfile
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
 
 from app.core.config import settings
+from app.core.metrics import model_load_timer
+from app.services.whisper_tuning import resolve_runtime
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+
+# Container extensions for MediaRecorder mime types
+MIME_EXTENSIONS = {
+    "audio/webm": ".webm",
+    "audio/webm;codecs=opus": ".webm",
+    "audio/ogg": ".ogg",
+    "audio/ogg;codecs=opus": ".ogg"
+}
+
+def is_supported_language(code: str) -> bool:
+    """Whether Whisper accepts `code` as a language (unknown without faster-whisper)"""
+    try:
+        from faster_whisper.tokenizer import _LANGUAGE_CODES
+    except ImportError:
+        return True
+    return code in _LANGUAGE_CODES
+
+class LanguageLock:
+    """
+    Language of one live session.
+
+    Whisper detects the language on every decode unless it is given one,
+    which costs an extra encoder pass per commit and can flip languages on
+    short clips. The lock starts from the client's hint or, without one,
+    takes the first detection at least ``min_probability`` confident; every
+    later decode then passes it to Whisper. ``unlock`` goes back to detecting.
+    """
+
+    def __init__(self, hint: Optional[str] = None, min_probability: float = None):
+        self.min_probability = min_probability if min_probability is not None else settings.LIVE_LANGUAGE_MIN_PROBABILITY
+        self.language: Optional[str] = None
+        self.source: Optional[str] = None
+        if hint:
+            self.set(hint)
+
+    @property
+    def locked(self) -> bool:
+        return self.language is not None
+
+    def set(self, language: str):
+        """Lock to a language chosen by the client"""
+        self.language = language
+        self.source = "hint"
+
+    def observe(self, result: Dict) -> bool:
+        """Lock to a decode's detected language if confident enough; True when this locked it"""
+        if self.locked or not result.get("language") or not result.get("text"):
+            return False
+        if result.get("language_probability", 0.0) < self.min_probability:
+            return False
+        self.language = result["language"]
+        self.source = "detected"
+        logger.info(f"Live language locked to {self.language} (p={result['language_probability']:.2f})")
+        return True
+
+    def unlock(self):
+        self.language = None
+        self.source = None
+
+    def to_dict(self) -> Dict:
+        return {"language": self.language, "locked": self.locked, "source": self.source}
+
 class TranscriptionService:
     def __init__(self, model_size: str = "base"):
         """
@@ -23,10 +93,14 @@ class TranscriptionService:
         logger.info(f"Transcription service initialized (model: {model_size})")
         self.model_size = model_size
         self.model = None
+        self.runtime = None
 
     def _load_model(self):
-        if self.model is not None:
-            return self.model
+        # Read once: another thread may unload the model between a check and a return
+        model = self.model
+        if model is not None:
+            _mark_resident(self)
+            return model
 
         try:
             from faster_whisper import WhisperModel
@@ -35,41 +109,70 @@ class TranscriptionService:
                 "faster-whisper is not installed. Run: pip install faster-whisper"
             ) from exc
 
-        logger.info(f"Loading Whisper model: {self.model_size}")
-        self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
-        return self.model
+        runtime = resolve_runtime(self.model_size)
+        logger.info(f"Loading Whisper model: {self.model_size} ({runtime.to_dict()})")
+        with model_load_timer(f"whisper:{self.model_size}"):
+            model = WhisperModel(
+                self.model_size,
+                device="cpu",
+                compute_type=runtime.compute_type,
+                cpu_threads=runtime.cpu_threads,
+                num_workers=runtime.num_workers
+            )
+        self.model = model
+        self.runtime = runtime
+        _mark_resident(self)
+        return model
     
-    def transcribe_audio(
+    @staticmethod
+    def decode(source) -> np.ndarray:
+        """
+        Decode audio to a 16 kHz mono float32 waveform
+
+        Args:
+            source: Path, file-like object or raw container bytes
+        """
+        from faster_whisper.audio import decode_audio
+
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        return decode_audio(source, sampling_rate=SAMPLE_RATE)
+
+    def stream_segments(
         self,
-        audio_path: str,
+        audio_path: Union[str, np.ndarray],
         language: str = None,
-        task: str = "transcribe"
-    ) -> Dict:
+        task: str = "transcribe",
+        beam_size: int = 5,
+        speech=None
+    ) -> Tuple[Iterator[Dict], str]:
         """
-        Transcribe audio file to text with timestamps
-        
-        Args:
-            audio_path: Path to audio file
-            language: Language code (auto-detect if None)
-            task: 'transcribe' or 'translate' (to English)
-        
+        Start transcribing and return segments lazily as Whisper decodes them
+
+        Language detection runs before this returns; each segment is only
+        decoded when the iterator is advanced.
+
         Returns:
-            Dict with segments, text, and language
+            (segment iterator, detected language)
         """
-        try:
-            logger.info(f"Transcribing audio: {audio_path}")
-            model = self._load_model()
+        segments, info = self._start(audio_path, language, task, beam_size, speech)
+        return segments, info.language or language or "en"
 
-            segments_iter, info = model.transcribe(
-                audio_path,
-                language=language,
-                task=task
-            )
+    def _start(self, audio_path, language: str, task: str, beam_size: int, speech):
+        """Run language detection and return (lazy segments, faster-whisper TranscriptionInfo)"""
+        logger.info(f"Transcribing audio: {audio_path if isinstance(audio_path, str) else 'waveform'}")
+        model = self._load_model()
 
-            segments = []
-            full_text = []
+        segments_iter, info = model.transcribe(
+            speech.audio if speech is not None else audio_path,
+            language=language,
+            task=task,
+            beam_size=beam_size
+        )
+
+        def segments():
             for idx, seg in enumerate(segments_iter):
-                segments.append({
+                segment = {
                     "id": idx,
                     "seek": 0,
                     "start": float(seg.start),
@@ -80,13 +183,45 @@ class TranscriptionService:
                     "avg_logprob": 0.0,
                     "compression_ratio": 0.0,
                     "no_speech_prob": 0.0
-                })
-                full_text.append(seg.text.strip())
+                }
+                if speech is not None:
+                    speech.remap_segments([segment])
+                yield segment
+
+        return segments(), info
+
+    def transcribe_audio(
+        self,
+        audio_path: Union[str, np.ndarray],
+        language: str = None,
+        task: str = "transcribe",
+        beam_size: int = 5,
+        speech=None
+    ) -> Dict:
+        """
+        Transcribe audio file to text with timestamps
+        
+        Args:
+            audio_path: Path to audio file or a 16 kHz mono waveform
+            language: Language code (auto-detect if None)
+            task: 'transcribe' or 'translate' (to English)
+            beam_size: Decoding beam width (1 = greedy, fastest)
+            speech: Optional SpeechMap; only its speech audio is decoded and
+                timestamps are mapped back to the original recording
+        
+        Returns:
+            Dict with segments, text, language and language_probability
+            (1.0 when the language was given)
+        """
+        try:
+            segments_iter, info = self._start(audio_path, language, task, beam_size, speech)
+            segments = list(segments_iter)
 
             return {
-                "text": " ".join([t for t in full_text if t]),
+                "text": " ".join([seg["text"] for seg in segments if seg["text"]]),
                 "segments": segments,
-                "language": info.language or language or "en"
+                "language": info.language or language or "en",
+                "language_probability": 1.0 if language else float(info.language_probability)
             }
             
         except Exception as e:
@@ -106,18 +241,22 @@ class TranscriptionService:
             logger.error(f"Stream transcription error: {str(e)}")
             return ""
 
-    def transcribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/webm") -> str:
+    def transcribe_bytes(self, audio_bytes: bytes, mime_type: str = "audio/webm", language: str = None) -> str:
         """Transcribe buffered audio bytes by saving to a temp file."""
+        return self.transcribe_buffer(audio_bytes, mime_type, language).get("text", "")
+
+    def transcribe_buffer(self, audio_bytes: bytes, mime_type: str = "audio/webm", language: str = None) -> Dict:
+        """
+        Transcribe buffered audio bytes and keep segment timestamps
+
+        Returns:
+            Same shape as transcribe_audio, or an empty result on failure
+        """
+        empty = {"text": "", "segments": [], "language": None}
         if not audio_bytes:
-            return ""
+            return empty
 
-        extension_map = {
-            "audio/webm": ".webm",
-            "audio/webm;codecs=opus": ".webm",
-            "audio/ogg": ".ogg",
-            "audio/ogg;codecs=opus": ".ogg"
-        }
-        suffix = extension_map.get(mime_type, ".webm")
+        suffix = MIME_EXTENSIONS.get(mime_type, ".webm")
 
         temp_path = None
         try:
@@ -125,11 +264,10 @@ class TranscriptionService:
                 temp_file.write(audio_bytes)
                 temp_path = temp_file.name
 
-            result = self.transcribe_audio(temp_path)
-            return result.get("text", "")
+            return self.transcribe_audio(temp_path, language)
         except Exception as exc:
             logger.error(f"Stream bytes transcription error: {str(exc)}")
-            return ""
+            return empty
         finally:
             if temp_path and os.path.exists(temp_path):
                 try:
@@ -137,12 +275,41 @@ class TranscriptionService:
                 except OSError:
                     logger.warning("Failed to remove temp audio file: %s", temp_path)
 
-# Singleton instance
-_transcription_service = None
+# Services with a loaded model, least recently used first
+_resident_services: "OrderedDict[TranscriptionService, None]" = OrderedDict()
+_resident_lock = threading.Lock()
+
+def _mark_resident(service: TranscriptionService):
+    """Record a use of `service`'s model and unload the least recently used models over the cap"""
+    with _resident_lock:
+        if service.model is None:
+            # Unloaded by another thread since it was read; the next call reloads it
+            return
+        _resident_services[service] = None
+        _resident_services.move_to_end(service)
+        while settings.WHISPER_MAX_RESIDENT_MODELS and len(_resident_services) > settings.WHISPER_MAX_RESIDENT_MODELS:
+            evicted, _ = _resident_services.popitem(last=False)
+            logger.info(f"Unloading Whisper model: {evicted.model_size}")
+            # Running transcriptions keep their reference; the next call reloads
+            evicted.model = None
+
+def serving_model_sizes() -> List[str]:
+    """Whisper sizes this deployment can load: the default, the live model and the adaptive ladder"""
+    sizes = [settings.WHISPER_MODEL, settings.WHISPER_LIVE_MODEL]
+    if settings.WHISPER_ADAPTIVE:
+        sizes += [size.strip() for size in settings.WHISPER_MODEL_LADDER.split(",")]
+    return [size for size in dict.fromkeys(sizes) if size]
+
+# One instance per model size
+_transcription_services: Dict[str, TranscriptionService] = {}
 
-def get_transcription_service(model_size: str = "base") -> TranscriptionService:
-    """Get or create transcription service instance"""
-    global _transcription_service
-    if _transcription_service is None:
-        _transcription_service = TranscriptionService(model_size or settings.WHISPER_MODEL)
-    return _transcription_service
+def get_transcription_service(model_size: str = None) -> TranscriptionService:
+    """Get or create the transcription service for a model size"""
+    model_size = model_size or settings.WHISPER_MODEL
+    if model_size not in _transcription_services:
+        if settings.MODEL_SERVER_SOCKET:
+            from app.services.model_server import RemoteTranscriptionService
+            _transcription_services[model_size] = RemoteTranscriptionService(model_size)
+        else:
+            _transcription_services[model_size] = TranscriptionService(model_size)
+    return _transcription_services[model_size]
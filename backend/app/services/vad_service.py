@@ -0,0 +1,182 @@
+"""
+Voice activity detection preprocessing
+Finds speech regions once per recording so every model stage skips silence
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import stage_timer
+from app.services.transcription_service import SAMPLE_RATE, TranscriptionService
+
+logger = logging.getLogger(__name__)
+
+class SpeechMap:
+    """
+    Speech regions of a recording plus the speech-only waveform.
+
+    ``audio`` is the concatenation of all speech regions (the "compact"
+    timeline). Models run on it and their timestamps are mapped back to the
+    original recording with ``to_original`` / ``remap_span``. A map restored
+    from a stored artifact decodes its audio on first use, so runs whose model
+    stages are all reused never decode the recording.
+    """
+
+    def __init__(
+        self,
+        regions: List[Tuple[float, float]],
+        audio: Optional[np.ndarray],
+        total_duration: float,
+        loader: Callable[[], np.ndarray] = None
+    ):
+        self.regions = regions
+        self._audio = audio
+        self._loader = loader
+        self.total_duration = total_duration
+        self.original_starts = [start for start, _ in regions]
+        self.compact_starts = []
+
+        offset = 0.0
+        for start, end in regions:
+            self.compact_starts.append(offset)
+            offset += end - start
+        self.speech_duration = offset
+
+    def __bool__(self) -> bool:
+        return bool(self.regions)
+
+    @property
+    def audio(self) -> np.ndarray:
+        if self._audio is None:
+            self._audio = self._loader()
+        return self._audio
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        """Map a compact-timeline time to the original recording"""
+        if not self.regions:
+            return t
+
+        # An end time sitting on a region boundary belongs to the earlier region
+        idx = (bisect_left if is_end else bisect_right)(self.compact_starts, t) - 1
+        idx = min(max(idx, 0), len(self.regions) - 1)
+        start, end = self.regions[idx]
+        return min(start + max(t - self.compact_starts[idx], 0.0), end)
+
+    def to_compact(self, t: float) -> float:
+        """Map an original-timeline time to the compact timeline (silence collapses)"""
+        idx = bisect_right(self.original_starts, t) - 1
+        if idx < 0:
+            return 0.0
+        start, end = self.regions[idx]
+        return self.compact_starts[idx] + min(t, end) - start
+
+    def remap_span(self, start: float, end: float) -> List[Tuple[float, float]]:
+        """Map a compact-timeline span to original spans, split at removed silences"""
+        spans = []
+        idx = max(bisect_right(self.compact_starts, start) - 1, 0)
+        while idx < len(self.regions) and self.compact_starts[idx] < end:
+            region_start, region_end = self.regions[idx]
+            offset = self.compact_starts[idx]
+            span_start = region_start + max(start - offset, 0.0)
+            span_end = region_start + min(region_end - region_start, end - offset)
+            if span_end > span_start:
+                spans.append((span_start, span_end))
+            idx += 1
+        return spans
+
+    def remap_segments(self, segments: List[Dict]) -> List[Dict]:
+        """Move transcript segments ('start'/'end' keys) onto the original timeline in place"""
+        for seg in segments:
+            seg["start"] = self.to_original(seg["start"])
+            seg["end"] = self.to_original(seg["end"], is_end=True)
+        return segments
+
+    def remap_turns(self, turns: List[Dict]) -> List[Dict]:
+        """Map speaker turns to the original timeline, splitting turns that span removed silence"""
+        remapped = []
+        for turn in turns:
+            for start, end in self.remap_span(turn["start"], turn["end"]):
+                remapped.append({**turn, "start": start, "end": end})
+        return remapped
+
+    def slice(self, start: float, end: float) -> np.ndarray:
+        """Speech samples between two original-timeline times"""
+        return self.audio[int(self.to_compact(start) * SAMPLE_RATE):int(self.to_compact(end) * SAMPLE_RATE)]
+
+    def to_dict(self) -> Dict:
+        """Summary stored on the session"""
+        return {
+            "regions": [[round(start, 3), round(end, 3)] for start, end in self.regions],
+            "speech_duration": round(self.speech_duration, 3),
+            "total_duration": round(self.total_duration, 3),
+            "speech_ratio": round(self.speech_duration / self.total_duration, 4) if self.total_duration else 0.0
+        }
+
+    def to_artifact(self) -> Dict:
+        """Exact regions for the stage artifact store (to_dict rounds them)"""
+        return {"regions": [list(region) for region in self.regions], "total_duration": self.total_duration}
+
+class VADService:
+    """Computes speech maps with the Silero VAD bundled in faster-whisper"""
+
+    def compute(self, audio_path: str) -> Optional[SpeechMap]:
+        """
+        Decode a recording once and find its speech regions
+
+        Returns:
+            SpeechMap, or None when VAD is unavailable (callers then use the full file)
+        """
+        try:
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+            with stage_timer("decode"):
+                audio = TranscriptionService.decode(audio_path)
+            with stage_timer("vad"):
+                timestamps = get_speech_timestamps(audio, VadOptions(
+                    threshold=settings.VAD_THRESHOLD,
+                    min_silence_duration_ms=settings.VAD_MIN_SILENCE_MS,
+                    speech_pad_ms=settings.VAD_SPEECH_PAD_MS
+                ))
+        except Exception as e:
+            logger.warning(f"VAD unavailable, processing full audio: {str(e)}")
+            return None
+
+        regions = [(ts["start"] / SAMPLE_RATE, ts["end"] / SAMPLE_RATE) for ts in timestamps]
+        speech_map = SpeechMap(regions, _speech_audio(audio, regions), len(audio) / SAMPLE_RATE)
+        logger.info(
+            f"VAD kept {speech_map.speech_duration:.1f}s of {speech_map.total_duration:.1f}s "
+            f"in {len(regions)} region(s)"
+        )
+        return speech_map
+
+    def restore(self, audio_path: str, artifact: Dict) -> SpeechMap:
+        """Rebuild a speech map from `SpeechMap.to_artifact`; the audio is decoded only if a stage needs it"""
+        regions = [tuple(region) for region in artifact["regions"]]
+
+        def load() -> np.ndarray:
+            with stage_timer("decode"):
+                return _speech_audio(TranscriptionService.decode(audio_path), regions)
+
+        return SpeechMap(regions, None, artifact["total_duration"], loader=load)
+
+def _speech_audio(audio: np.ndarray, regions: List[Tuple[float, float]]) -> np.ndarray:
+    """Concatenate the samples of each speech region"""
+    if not regions:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate([
+        audio[int(round(start * SAMPLE_RATE)):int(round(end * SAMPLE_RATE))]
+        for start, end in regions
+    ])
+
+# Singleton instance
+_vad_service = None
+
+def get_vad_service() -> VADService:
+    """Get or create VAD service instance"""
+    global _vad_service
+    if _vad_service is None:
+        _vad_service = VADService()
+    return _vad_service
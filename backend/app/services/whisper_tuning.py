@@ -0,0 +1,277 @@
+"""
+Whisper runtime tuning
+Calibrates compute type, CPU threads and workers per model on this host and
+applies the best configuration when models load
+
+    python -m app.services.whisper_tuning --clip reference.wav --models base,medium
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class RuntimeConfig:
+    """Constructor options for faster_whisper.WhisperModel on CPU"""
+    compute_type: str = "int8"
+    cpu_threads: int = 0  # 0 = CTranslate2 default
+    num_workers: int = 1  # concurrent transcribe() calls the model can serve
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+def available_cores() -> int:
+    """Cores this process may run on (respects container CPU sets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+@lru_cache(maxsize=1)
+def host_key() -> str:
+    """
+    Identify the host shape calibrations are valid for
+
+    CPU model and core count only: container and pod hostnames change on
+    every deploy, and identical hardware should share a calibration.
+    """
+    cpu = platform.processor() or platform.machine()
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return f"{cpu}|{available_cores()} cores"
+
+def _load_calibrations(path: str = None) -> Dict:
+    path = path or settings.WHISPER_CALIBRATION_FILE
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable Whisper calibration file {path}: {str(e)}")
+        return {}
+
+def _host_calibrations(calibrations: Dict) -> Dict:
+    """Entries for this host shape, including ones saved under older hostname-prefixed keys"""
+    key = host_key()
+    if key in calibrations:
+        return calibrations[key]
+    for stored_key, entries in calibrations.items():
+        if stored_key.endswith(f"|{key}"):
+            return entries
+    return {}
+
+def calibration_for(model_size: str, path: str = None) -> Optional[Dict]:
+    """This host's stored calibration for `model_size`, if any"""
+    return _host_calibrations(_load_calibrations(path)).get(model_size)
+
+@lru_cache(maxsize=None)
+def resolve_runtime(model_size: str) -> RuntimeConfig:
+    """
+    Runtime options for loading `model_size`
+
+    Calibrated values for this host are used when present; explicit
+    WHISPER_COMPUTE_TYPE / WHISPER_CPU_THREADS / WHISPER_NUM_WORKERS settings
+    override them field by field. Resolved once per model size and process;
+    a new calibration clears the cache.
+    """
+    calibrated = calibration_for(model_size) or {}
+    base = RuntimeConfig(**{
+        field: calibrated[field]
+        for field in ("compute_type", "cpu_threads", "num_workers")
+        if field in calibrated
+    })
+    return RuntimeConfig(
+        compute_type=settings.WHISPER_COMPUTE_TYPE or base.compute_type,
+        cpu_threads=settings.WHISPER_CPU_THREADS if settings.WHISPER_CPU_THREADS is not None else base.cpu_threads,
+        num_workers=settings.WHISPER_NUM_WORKERS or base.num_workers
+    )
+
+def calibrated_rtf() -> Dict[str, float]:
+    """Measured single-stream real-time factors of calibrated models on this host"""
+    return {
+        model_size: entry["rtf"]
+        for model_size, entry in _host_calibrations(_load_calibrations()).items()
+        if entry.get("rtf")
+    }
+
+# ---------------------------------------------------------------------------
+# Calibration
+# ---------------------------------------------------------------------------
+
+def candidate_grid(compute_types: List[str] = None, threads: List[int] = None, workers: List[int] = None) -> List[RuntimeConfig]:
+    """Combinations to try; thread x worker products never exceed the available cores"""
+    cores = available_cores()
+    if compute_types is None:
+        compute_types = ["int8", "int8_float32", "float32"]
+        try:
+            import ctranslate2
+            supported = ctranslate2.get_supported_compute_types("cpu")
+            compute_types = [ct for ct in compute_types if ct in supported]
+        except Exception:
+            pass
+    if threads is None:
+        threads = sorted({t for t in (1, 2, 4, 8, 16, 32, 64) if t <= cores} | {cores})
+    if workers is None:
+        workers = [w for w in (1, 2, 4) if w <= cores]
+
+    return [
+        RuntimeConfig(compute_type, cpu_threads, num_workers)
+        for compute_type, cpu_threads, num_workers in itertools.product(compute_types, threads, workers)
+        if cpu_threads * num_workers <= cores
+    ]
+
+def measure(model_size: str, config: RuntimeConfig, audio, beam_size: int = 5, repeats: int = 2) -> Dict:
+    """
+    Time one configuration on a decoded clip
+
+    Latency is a single transcription; throughput runs `num_workers`
+    transcriptions at once, which is how the server and batch pool use them.
+    """
+    from faster_whisper import WhisperModel
+
+    duration = len(audio) / 16000
+    load_start = time.perf_counter()
+    model = WhisperModel(
+        model_size, device="cpu",
+        compute_type=config.compute_type,
+        cpu_threads=config.cpu_threads,
+        num_workers=config.num_workers
+    )
+    load_seconds = time.perf_counter() - load_start
+
+    def transcribe():
+        segments, _ = model.transcribe(audio, beam_size=beam_size, language="en")
+        for _ in segments:
+            pass
+
+    transcribe()  # warm-up
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        transcribe()
+        latencies.append(time.perf_counter() - start)
+    latency = min(latencies)
+
+    throughput = duration / latency
+    if config.num_workers > 1:
+        threads = [threading.Thread(target=transcribe) for _ in range(config.num_workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        throughput = duration * config.num_workers / (time.perf_counter() - start)
+
+    return {
+        **config.to_dict(),
+        "load_seconds": round(load_seconds, 3),
+        "latency_seconds": round(latency, 3),
+        "rtf": round(latency / duration, 4),
+        "throughput": round(throughput, 3)  # audio seconds per wall second
+    }
+
+def calibrate(model_size: str, clip: str, objective: str = "throughput", grid: List[RuntimeConfig] = None,
+              beam_size: int = 5, repeats: int = 2, path: str = None) -> Dict:
+    """Measure every candidate for `model_size`, persist the best and return it"""
+    from app.services.transcription_service import TranscriptionService
+
+    audio = TranscriptionService.decode(clip)
+    results = []
+    for config in grid or candidate_grid():
+        try:
+            result = measure(model_size, config, audio, beam_size, repeats)
+        except Exception as e:
+            logger.warning(f"Skipping {config}: {str(e)}")
+            continue
+        results.append(result)
+        print(
+            f"  {model_size:<10} {config.compute_type:<13} threads={config.cpu_threads:<3} workers={config.num_workers:<2}"
+            f" latency={result['latency_seconds']:.2f}s rtf={result['rtf']:.3f} throughput={result['throughput']:.1f}x"
+        )
+
+    if not results:
+        raise RuntimeError(f"No configuration of {model_size} could be measured")
+
+    if objective == "latency":
+        best = min(results, key=lambda r: r["latency_seconds"])
+    else:
+        best = max(results, key=lambda r: r["throughput"])
+
+    entry = {
+        **best,
+        "objective": objective,
+        "beam_size": beam_size,
+        "clip_seconds": round(len(audio) / 16000, 2),
+        "measured_at": datetime.utcnow().isoformat(),
+        "candidates": results
+    }
+    _save(model_size, entry, path)
+    return entry
+
+def _save(model_size: str, entry: Dict, path: str = None):
+    path = path or settings.WHISPER_CALIBRATION_FILE
+    calibrations = _load_calibrations(path)
+    calibrations.setdefault(host_key(), {})[model_size] = entry
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    partial = f"{path}.tmp"
+    with open(partial, "w", encoding="utf-8") as f:
+        json.dump(calibrations, f, indent=2)
+    os.replace(partial, path)
+    resolve_runtime.cache_clear()
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate Whisper compute type, threads and workers on this host")
+    parser.add_argument("--clip", required=True, help="Reference recording with speech (30-120 s works well)")
+    parser.add_argument("--models", default=settings.WHISPER_MODEL, help="Comma separated model sizes")
+    parser.add_argument("--objective", choices=["throughput", "latency"], default="throughput",
+                        help="throughput for batch/upload nodes, latency for live pods")
+    parser.add_argument("--compute-types", help="Comma separated, default: int8,int8_float32,float32 (supported ones)")
+    parser.add_argument("--threads", help="Comma separated cpu_threads values, default: powers of two up to the cores")
+    parser.add_argument("--workers", help="Comma separated num_workers values, default: 1,2,4")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--file", default=settings.WHISPER_CALIBRATION_FILE, help="Calibration file to update")
+    args = parser.parse_args()
+
+    def ints(value):
+        return [int(v) for v in value.split(",")] if value else None
+
+    logging.basicConfig(level=logging.WARNING)
+    grid = candidate_grid(
+        args.compute_types.split(",") if args.compute_types else None,
+        ints(args.threads),
+        ints(args.workers)
+    )
+    print(f"Host: {host_key()} - {len(grid)} configurations per model")
+    for model_size in [m.strip() for m in args.models.split(",") if m.strip()]:
+        best = calibrate(model_size, args.clip, args.objective, grid, args.beam_size, args.repeats, args.file)
+        print(
+            f"Best for {model_size}: {best['compute_type']}, cpu_threads={best['cpu_threads']}, "
+            f"num_workers={best['num_workers']} ({best['throughput']:.1f}x, rtf {best['rtf']:.3f})"
+        )
+    print(f"Saved to {args.file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Offline benchmark suite
+Synthetic audio and transcripts, stub models and an in-memory MongoDB stand-in
+
+Run from the backend directory:
+    python -m benchmarks.run --sizes small,medium
+"""
@@ -0,0 +1,357 @@
+"""
+Concurrent load test
+Drives a mix of HTTP and live-streaming clients against the API and reports
+per-endpoint latency percentiles, error rates and live-stream lag
+
+By default the app is served in-process by uvicorn with the benchmark stubs
+(in-memory Mongo, stub models, canned LLM). Pass --url to load a real deployment.
+
+Usage (from the backend directory):
+    python -m benchmarks.loadtest --duration 60 --mix session=20,analytics=10,search=10,chatbot=5,upload=2,stream=8
+    python -m benchmarks.loadtest --url http://staging:8000 --session-id <id> --chunks-dir recordings/
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from benchmarks.run import _percentile
+from benchmarks.synthetic import SIZES, write_wav
+
+SEARCH_QUERIES = ["release", "deadline budget", "customer", "action item", "migration plan", "incident"]
+QUESTIONS = ["What was decided?", "Who owns the release?", "What are the risks?", "Summarize the action items"]
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, seconds: float, error: Optional[str] = None):
+        if error:
+            self.errors[error] += 1
+        else:
+            self.latencies.append(seconds)
+
+    def summary(self, elapsed: float) -> Dict:
+        ordered = sorted(self.latencies)
+        total = len(ordered) + sum(self.errors.values())
+        return {
+            "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(sum(self.errors.values()) / total, 4) if total else 0.0,
+            "errors": dict(self.errors),
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+            "p90_ms": round(_percentile(ordered, 90) * 1000, 1),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0
+        }
+
+@dataclass
+class StreamStats:
+    sessions: int = 0
+    connect: List[float] = field(default_factory=list)
+    final_latency: List[float] = field(default_factory=list)
+    lag: List[float] = field(default_factory=list)
+    send_drift: List[float] = field(default_factory=list)
+    pauses: int = 0
+    busy: int = 0
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def summary(self) -> Dict:
+        def pct(values):
+            ordered = sorted(values)
+            return {
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+                "p90_ms": round(_percentile(ordered, 90) * 1000, 1),
+                "p99_ms": round(_percentile(ordered, 99) * 1000, 1)
+            }
+
+        failed = sum(self.errors.values())
+        return {
+            "sessions": self.sessions,
+            "error_rate": round(failed / self.sessions, 4) if self.sessions else 0.0,
+            "errors": dict(self.errors),
+            "connect": pct(self.connect),
+            "final_latency": pct(self.final_latency),
+            "lag": pct(self.lag),
+            "send_drift": pct(self.send_drift),
+            "flow_pauses": self.pauses,
+            "busy_rejections": self.busy
+        }
+
+class LoadTest:
+    """Runs virtual users per scenario until the deadline"""
+
+    def __init__(self, args, base_url: str, session_id: str, upload_path: str, chunks: List[bytes]):
+        self.args = args
+        self.base_url = base_url.rstrip("/")
+        self.ws_url = "ws" + self.base_url[len("http"):] + "/api/transcription/stream"
+        self.session_id = session_id
+        self.upload_path = upload_path
+        self.chunks = chunks
+        self.stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.stream_stats = StreamStats()
+        self.deadline = 0.0
+
+    async def _timed(self, name: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+            error = None if response.status_code < 400 else str(response.status_code)
+        except Exception as e:
+            error = type(e).__name__
+        self.stats[name].record(time.perf_counter() - start, error)
+
+    async def _user(self, scenario: str, client):
+        run = getattr(self, f"_scenario_{scenario}")
+        while time.perf_counter() < self.deadline:
+            await run(client)
+            if self.args.think_time:
+                await asyncio.sleep(random.expovariate(1 / self.args.think_time))
+
+    async def _scenario_session(self, client):
+        await self._timed("GET /session", client.get(f"/api/transcription/session/{self.session_id}"))
+
+    async def _scenario_analytics(self, client):
+        await self._timed("GET /analytics", client.get(f"/api/analytics/{self.session_id}"))
+
+    async def _scenario_search(self, client):
+        await self._timed("GET /search", client.get("/api/search", params={"q": random.choice(SEARCH_QUERIES)}))
+
+    async def _scenario_export(self, client):
+        await self._timed("GET /export/txt", client.get(f"/api/export/txt/{self.session_id}"))
+
+    async def _scenario_chatbot(self, client):
+        await self._timed("POST /chatbot/ask", client.post(
+            "/api/chatbot/ask",
+            json={"session_id": self.session_id, "question": random.choice(QUESTIONS)}
+        ))
+
+    async def _scenario_upload(self, client):
+        with open(self.upload_path, "rb") as f:
+            content = f.read()
+        await self._timed("POST /upload", client.post(
+            "/api/transcription/upload",
+            files={"file": (os.path.basename(self.upload_path), content, "audio/wav")}
+        ))
+
+    async def _scenario_stream(self, client):
+        import websockets
+
+        stats = self.stream_stats
+        stats.sessions += 1
+        interval = self.args.chunk_interval
+        count = max(int(self.args.stream_seconds / interval), 1)
+
+        try:
+            start = time.perf_counter()
+            async with websockets.connect(self.ws_url, max_size=None, open_timeout=30) as ws:
+                stats.connect.append(time.perf_counter() - start)
+                json.loads(await ws.recv())  # session event
+                await ws.send(json.dumps({"event": "start", "mimeType": "audio/webm"}))
+
+                may_send = asyncio.Event()
+                may_send.set()
+                final = asyncio.get_running_loop().create_future()
+
+                async def receive():
+                    async for raw in ws:
+                        message = json.loads(raw)
+                        event = message.get("event")
+                        if event == "flow":
+                            stats.pauses += message.get("action") == "pause"
+                            (may_send.clear if message.get("action") == "pause" else may_send.set)()
+                        elif event == "busy":
+                            stats.busy += 1
+                        elif event in ("final", "error") and not final.done():
+                            final.set_result(message)
+
+                receiver = asyncio.create_task(receive())
+                try:
+                    # Replay chunks at the recorder's pace, honouring flow control:
+                    # a chunk is only sent once its audio would have been recorded
+                    stream_start = time.perf_counter()
+                    for idx in range(count):
+                        delay = stream_start + (idx + 1) * interval - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        await may_send.wait()
+                        await ws.send(self.chunks[idx % len(self.chunks)])
+                    audio_end = stream_start + count * interval
+                    stats.send_drift.append(max(time.perf_counter() - audio_end, 0.0))
+
+                    stop_sent = time.perf_counter()
+                    await ws.send(json.dumps({"event": "stop"}))
+                    message = await asyncio.wait_for(final, self.args.timeout)
+                    received = time.perf_counter()
+                finally:
+                    receiver.cancel()
+
+                if message.get("event") == "error":
+                    stats.errors[message.get("detail", "error")] += 1
+                    return
+                stats.final_latency.append(received - stop_sent)
+                # How far behind real time the transcript for the last chunk arrived
+                stats.lag.append(received - audio_end)
+        except Exception as e:
+            stats.errors[type(e).__name__] += 1
+
+    async def run(self, mix: Dict[str, int]) -> float:
+        import httpx
+
+        limits = httpx.Limits(max_connections=sum(mix.values()) + 10)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.args.timeout, limits=limits) as client:
+            started = time.perf_counter()
+            self.deadline = started + self.args.duration
+            users = [
+                asyncio.create_task(self._user(scenario, client))
+                for scenario, count in mix.items()
+                for _ in range(count)
+            ]
+            await asyncio.gather(*users)
+            return time.perf_counter() - started
+
+    def report(self, elapsed: float) -> Dict:
+        return {
+            "elapsed": round(elapsed, 2),
+            "endpoints": {name: stats.summary(elapsed) for name, stats in sorted(self.stats.items())},
+            "stream": self.stream_stats.summary()
+        }
+
+def _print_report(report: Dict):
+    print(f"\n{'endpoint':20} {'requests':>9} {'rps':>8} {'errors':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, s in report["endpoints"].items():
+        print(
+            f"{name:20} {s['requests']:>9} {s['rps']:>8.1f} {s['error_rate']:>8.1%} "
+            f"{s['p50_ms']:>9.1f} {s['p90_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}"
+        )
+        if s["errors"]:
+            print(f"{'':20} errors: {s['errors']}")
+
+    stream = report["stream"]
+    if stream["sessions"]:
+        print(f"\nlive streams: {stream['sessions']} sessions, {stream['error_rate']:.1%} failed, "
+              f"{stream['flow_pauses']} flow pauses, {stream['busy_rejections']} busy")
+        for metric in ("connect", "final_latency", "lag", "send_drift"):
+            s = stream[metric]
+            print(f"  {metric:14} p50 {s['p50_ms']:>9.1f} ms   p90 {s['p90_ms']:>9.1f} ms   p99 {s['p99_ms']:>9.1f} ms")
+        if stream["errors"]:
+            print(f"  errors: {stream['errors']}")
+
+def _parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        scenario, _, count = part.partition("=")
+        if not hasattr(LoadTest, f"_scenario_{scenario.strip()}"):
+            raise SystemExit(f"Unknown scenario '{scenario}'")
+        mix[scenario.strip()] = int(count or 1)
+    return mix
+
+def _load_chunks(args) -> List[bytes]:
+    """Recorded MediaRecorder chunks (sorted by name) or random bytes of a typical chunk size"""
+    if args.chunks_dir:
+        names = sorted(os.listdir(args.chunks_dir))
+        chunks = []
+        for name in names:
+            with open(os.path.join(args.chunks_dir, name), "rb") as f:
+                chunks.append(f.read())
+        if not chunks:
+            raise SystemExit(f"No chunks found in {args.chunks_dir}")
+        return chunks
+    return [os.urandom(args.chunk_bytes) for _ in range(8)]
+
+def _serve_in_process(args):
+    """Start the stubbed app on a local port in a background thread"""
+    import uvicorn
+
+    from benchmarks import stubs
+    from benchmarks.run import build_app, prepare_fixture
+
+    stubs.install(model_rtf=args.model_rtf, llm_latency=args.llm_latency)
+    # Uploads, exports and live spills go to a directory removed at exit
+    state = {"storage": stubs.use_temp_storage()}
+    app, skipped = build_app()
+    for prefix, error in skipped.items():
+        print(f"warning: {prefix} not mounted ({error})", file=sys.stderr)
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", ws_max_size=16 * 1024 * 1024))
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        fixture = loop.run_until_complete(prepare_fixture(SIZES["small"], args.data_dir))
+        state["session_id"] = fixture.session_id
+        state["upload_path"] = fixture.audio_path
+
+        async def start():
+            task = asyncio.create_task(server.serve())
+            while not server.started:
+                await asyncio.sleep(0.05)
+            ready.set()
+            await task
+
+        loop.run_until_complete(start())
+
+    threading.Thread(target=serve, daemon=True).start()
+    if not ready.wait(60):
+        raise SystemExit("In-process server did not start")
+
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}", state["session_id"], state["upload_path"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent HTTP and WebSocket load test")
+    parser.add_argument("--url", help="Target deployment; default serves the stubbed app in-process")
+    parser.add_argument("--session-id", help="Existing session used by read scenarios (required with --url)")
+    parser.add_argument("--mix", default="session=10,analytics=5,search=5,chatbot=2,export=2,upload=1,stream=4",
+                        help="Concurrent virtual users per scenario: session, analytics, search, chatbot, export, upload, stream")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request / final-transcript timeout")
+    parser.add_argument("--upload-file", help="Audio file for the upload scenario (default: synthetic WAV)")
+    parser.add_argument("--chunks-dir", help="Directory of recorded webm chunks to replay")
+    parser.add_argument("--chunk-bytes", type=int, default=6000, help="Synthetic chunk size without --chunks-dir")
+    parser.add_argument("--chunk-interval", type=float, default=0.75, help="Seconds between chunks (MediaRecorder timeslice)")
+    parser.add_argument("--stream-seconds", type=float, default=20.0, help="Audio length of each live session")
+    parser.add_argument("--model-rtf", type=float, default=0.05, help="In-process stub model cost (s per audio s)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="In-process stub LLM latency in seconds")
+    parser.add_argument("--port", type=int, default=0, help="In-process server port (0 = any free port)")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "transcripter-bench"))
+    parser.add_argument("--json", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    mix = _parse_mix(args.mix)
+    server = None
+    if args.url:
+        if not args.session_id:
+            raise SystemExit("--session-id is required with --url")
+        base_url, session_id = args.url, args.session_id
+        upload_path = args.upload_file or write_wav(os.path.join(args.data_dir, "small.wav"), SIZES["small"].audio_minutes * 60)
+    else:
+        server, base_url, session_id, upload_path = _serve_in_process(args)
+        upload_path = args.upload_file or upload_path
+
+    test = LoadTest(args, base_url, session_id, upload_path, _load_chunks(args))
+    print(f"Load testing {base_url} for {args.duration:.0f}s with {sum(mix.values())} users: {mix}", file=sys.stderr)
+    elapsed = asyncio.run(test.run(mix))
+
+    if server is not None:
+        server.should_exit = True
+
+    report = test.report(elapsed)
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"target": base_url, "mix": mix, **report}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+Benchmark runner
+Times pipeline stages, analytics helpers, services and API endpoints on
+synthetic data and compares the results with a saved baseline
+
+Usage (from the backend directory):
+    python -m benchmarks.run --sizes small,medium --repeat 5
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --baseline baseline.json --fail-on-regression
+"""
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks import stubs
+from benchmarks.synthetic import SIZES, Size, synthetic_segments, synthetic_turns, write_wav
+
+@dataclass
+class Fixture:
+    """Data shared by the benchmarks of one size"""
+    size: Size
+    audio_path: str
+    segments: List[Dict]
+    turns: List[Dict]
+    session_id: str
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.size.audio_minutes * 60
+
+@dataclass
+class Case:
+    """One benchmark: `make(fixture)` returns the callable that is timed"""
+    name: str
+    make: Callable[[Fixture], Callable]
+    units: Callable[[Fixture], float]
+    unit: str
+
+@dataclass
+class Result:
+    name: str
+    size: str
+    unit: str
+    units: float
+    samples: List[float] = field(default_factory=list)
+    peak_bytes: int = 0
+    skipped: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+    def summary(self) -> Dict:
+        if self.skipped:
+            return {"skipped": self.skipped}
+        ordered = sorted(self.samples)
+        p50 = _percentile(ordered, 50)
+        return {
+            "unit": self.unit,
+            "units": self.units,
+            "runs": len(ordered),
+            "mean": statistics.fmean(ordered),
+            "p50": p50,
+            "p90": _percentile(ordered, 90),
+            "p99": _percentile(ordered, 99),
+            "throughput": self.units / p50 if p50 else None,
+            "peak_mb": round(self.peak_bytes / 2 ** 20, 2)
+        }
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not ordered:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def _optional_module(name: str):
+    """Import an app module, returning the error text if it cannot be imported here"""
+    try:
+        return importlib.import_module(name), None
+    except Exception as e:
+        return None, f"{name} unavailable: {e}"
+
+def _stage_cases() -> List[Case]:
+    from app.services.glossary_service import get_glossary_service
+    from app.services.keyword_service import get_keyword_service
+    from app.services.pipeline_service import build_speaker_stats, get_pipeline, match_speaker
+    from app.services.search_service import get_search_service
+    from app.services.vad_service import get_vad_service
+
+    audio = lambda f: f.audio_seconds
+    segments = lambda f: len(f.segments)
+
+    def match_all(f: Fixture):
+        def run():
+            for seg in f.segments:
+                match_speaker(seg, f.turns)
+        return run
+
+    cases = [
+        Case("vad", lambda f: lambda: get_vad_service().compute(f.audio_path), audio, "audio s"),
+        Case("pipeline.analyze", lambda f: lambda: get_pipeline().analyze(f.audio_path), audio, "audio s"),
+        Case(
+            "pipeline.summarize",
+            lambda f: lambda: get_pipeline().summarize(" ".join(s["text"] for s in f.segments), f.segments),
+            segments, "segments"
+        ),
+        Case("match_speaker", match_all, segments, "segments"),
+        Case("build_speaker_stats", lambda f: lambda: build_speaker_stats(f.segments), segments, "segments"),
+        Case("keywords.count_terms", lambda f: lambda: get_keyword_service().count_terms(f.segments), segments, "segments"),
+        Case("keywords.top_keywords", lambda f: lambda: get_keyword_service().top_keywords(f.segments), segments, "segments"),
+        Case(
+            "glossary.find_in_segments",
+            lambda f: lambda: get_glossary_service().default_automaton.find_in_segments(f.segments),
+            segments, "segments"
+        ),
+        Case(
+            "search.index_session",
+            lambda f: lambda: get_search_service().index_session(f"{f.session_id}-reindex", f.segments),
+            segments, "segments"
+        ),
+        Case("search.query", lambda f: lambda: get_search_service().search("release deadline"), lambda f: 1, "queries"),
+    ]
+
+    analytics, error = _optional_module("app.api.analytics")
+    helpers = ["_calculate_speaker_stats", "_build_emotion_timeline", "_calculate_intensity"]
+    for helper in helpers:
+        make = (
+            (lambda name: lambda f: lambda: getattr(analytics, name)(f.segments))(helper)
+            if analytics is not None else _skip(error)
+        )
+        cases.append(Case(f"analytics.{helper.lstrip('_')}", make, segments, "segments"))
+    return cases
+
+def build_app():
+    """FastAPI app with every router that imports in this environment, no lifespan hooks"""
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    skipped = {}
+    for name, prefix in [
+        ("transcription", "/api/transcription"),
+        ("analytics", "/api/analytics"),
+        ("chatbot", "/api/chatbot"),
+        ("export", "/api/export"),
+        ("search", "/api/search"),
+    ]:
+        module, error = _optional_module(f"app.api.{name}")
+        if module is None:
+            skipped[prefix] = error
+        else:
+            app.include_router(module.router, prefix=prefix)
+    return app, skipped
+
+def _endpoint_cases(client, skipped: Dict[str, str]) -> List[Case]:
+    def get(path_fn):
+        def make(f: Fixture):
+            async def run():
+                response = await client.get(path_fn(f))
+                response.raise_for_status()
+            return run
+        return make
+
+    def upload(f: Fixture):
+        with open(f.audio_path, "rb") as audio_file:
+            content = audio_file.read()
+
+        async def run():
+            response = await client.post(
+                "/api/transcription/upload",
+                files={"file": ("bench.wav", content, "audio/wav")}
+            )
+            response.raise_for_status()
+        return run
+
+    def ask(f: Fixture):
+        async def run():
+            response = await client.post(
+                "/api/chatbot/ask",
+                json={"session_id": f.session_id, "question": "What was decided about the release?"}
+            )
+            response.raise_for_status()
+        return run
+
+    one = lambda f: 1
+    cases = [
+        Case("GET /api/transcription/session", get(lambda f: f"/api/transcription/session/{f.session_id}"), one, "requests"),
+        Case("GET /api/analytics", get(lambda f: f"/api/analytics/{f.session_id}"), one, "requests"),
+        Case("GET /api/analytics?width=1200", get(lambda f: f"/api/analytics/{f.session_id}?width=1200"), one, "requests"),
+        Case("GET /api/search", get(lambda f: "/api/search?q=release+deadline"), one, "requests"),
+        Case("GET /api/export/txt", get(lambda f: f"/api/export/txt/{f.session_id}"), one, "requests"),
+        Case("POST /api/chatbot/ask", ask, one, "requests"),
+        Case("POST /api/transcription/upload", upload, lambda f: f.audio_seconds, "audio s"),
+    ]
+
+    for case in cases:
+        for prefix, error in skipped.items():
+            if prefix in case.name:
+                case.make = _skip(error)
+    return cases
+
+def _skip(reason: str):
+    def make(f: Fixture):
+        raise _Skipped(reason)
+    return make
+
+class _Skipped(Exception):
+    pass
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+async def prepare_fixture(size: Size, data_dir: str) -> Fixture:
+    """Synthesize data for one size and store it as a session"""
+    from app.core.database import get_collection
+    from app.services.keyword_service import get_keyword_service
+    from app.services.pipeline_service import build_speaker_stats
+    from app.services.search_service import get_search_service
+
+    audio_path = write_wav(
+        os.path.join(data_dir, f"{size.name}.wav"),
+        size.audio_minutes * 60,
+        size.speakers
+    )
+    segments = synthetic_segments(size.segments, size.audio_minutes * 60, size.speakers)
+    session_id = f"bench-{size.name}"
+
+    await get_collection("transcriptions").insert_one({
+        "_id": session_id,
+        "session_id": session_id,
+        "segments": segments,
+        "speakers": build_speaker_stats(segments),
+        "keywords": [],
+        "summary": "Synthetic benchmark session.",
+        "action_items": [],
+        "language": "en",
+        "duration": segments[-1]["end_time"],
+        "created_at": datetime.utcnow()
+    })
+    await get_search_service().index_session(session_id, segments)
+    await get_keyword_service().ingest_session(session_id, segments)
+
+    return Fixture(size, audio_path, segments, synthetic_turns(segments), session_id)
+
+async def _call(fn: Callable):
+    result = fn()
+    if inspect.isawaitable(result):
+        await result
+
+async def _measure(case: Case, fixture: Fixture, repeat: int, warmup: int) -> Result:
+    result = Result(case.name, fixture.size.name, case.unit, case.units(fixture))
+    try:
+        fn = case.make(fixture)
+    except _Skipped as e:
+        result.skipped = str(e)
+        return result
+
+    for _ in range(warmup):
+        await _call(fn)
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await _call(fn)
+        result.samples.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run so tracing overhead stays out of the timings
+    tracemalloc.start()
+    try:
+        await _call(fn)
+        result.peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+def _compare(results: List[Result], baseline: Dict, threshold: float) -> List[str]:
+    """Print deltas against the baseline and return regressed benchmark keys"""
+    regressions = []
+    print(f"\n{'benchmark':52} {'p50 Δ':>9} {'peak Δ':>9}")
+    for result in results:
+        old = baseline.get("results", {}).get(result.key)
+        if result.skipped or not old or "p50" not in old:
+            continue
+        new = result.summary()
+        time_delta = (new["p50"] - old["p50"]) / old["p50"] if old["p50"] else 0.0
+        memory_delta = (new["peak_mb"] - old["peak_mb"]) / old["peak_mb"] if old.get("peak_mb") else 0.0
+        flag = ""
+        if time_delta > threshold or memory_delta > threshold:
+            flag = "  REGRESSION"
+            regressions.append(result.key)
+        print(f"{result.key:52} {time_delta:>+9.1%} {memory_delta:>+9.1%}{flag}")
+    return regressions
+
+def _print_table(results: List[Result]):
+    print(f"{'benchmark':52} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'throughput':>18} {'peak MB':>9}")
+    for result in results:
+        if result.skipped:
+            print(f"{result.key:52} skipped: {result.skipped}")
+            continue
+        s = result.summary()
+        throughput = f"{s['throughput']:.1f} {result.unit}/s" if s["throughput"] else "-"
+        print(
+            f"{result.key:52} {s['p50'] * 1000:>10.2f} {s['p90'] * 1000:>10.2f} "
+            f"{s['p99'] * 1000:>10.2f} {throughput:>18} {s['peak_mb']:>9.2f}"
+        )
+
+async def run(args) -> int:
+    stubs.install(stub_models=not args.real_models, model_rtf=args.model_rtf, llm_latency=args.llm_latency)
+    # Uploads and exports written by the endpoint cases go to a directory removed afterwards
+    with stubs.use_temp_storage():
+        return await _run(args)
+
+async def _run(args) -> int:
+    import httpx
+
+    app, skipped_routers = build_app()
+    cases = _stage_cases()
+
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        if not args.no_endpoints:
+            cases += _endpoint_cases(client, skipped_routers)
+        if args.filter:
+            cases = [case for case in cases if args.filter in case.name]
+
+        for size_name in args.sizes.split(","):
+            fixture = await prepare_fixture(SIZES[size_name.strip()], args.data_dir)
+            for case in cases:
+                print(f"  {case.name}[{fixture.size.name}]...", file=sys.stderr, flush=True)
+                results.append(await _measure(case, fixture, args.repeat, args.warmup))
+
+    _print_table(results)
+
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "host": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count()
+        },
+        "options": {
+            "real_models": args.real_models,
+            "model_rtf": args.model_rtf,
+            "llm_latency": args.llm_latency,
+            "repeat": args.repeat
+        },
+        "results": {result.key: result.summary() for result in results}
+    }
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = _compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--sizes", default="small,medium", help=f"Comma separated: {', '.join(SIZES)}")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per benchmark")
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--no-endpoints", action="store_true", help="Skip the API endpoint benchmarks")
+    parser.add_argument("--real-models", action="store_true", help="Use faster-whisper/Pyannote instead of stubs")
+    parser.add_argument("--model-rtf", type=float, default=0.0, help="Simulated stub model cost (s per audio s)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated LLM latency in seconds")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "transcripter-bench"))
+    parser.add_argument("--save", help="Write results as JSON (use as a baseline later)")
+    parser.add_argument("--baseline", help="Compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(run(args)))
+
+if __name__ == "__main__":
+    main()
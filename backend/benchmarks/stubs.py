@@ -0,0 +1,558 @@
+"""
+Stand-ins for external dependencies
+In-memory MongoDB, stub Whisper/Pyannote/VAD and canned LLM clients, so
+benchmarks and load tests run offline on a CPU-only box
+"""
+import asyncio
+import copy
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.diarization_service import DiarizationService
+from app.services.transcription_service import SAMPLE_RATE, TranscriptionService
+from app.services.vad_service import SpeechMap, VADService
+
+from benchmarks.synthetic import read_wav, synthetic_text
+
+# ---------------------------------------------------------------------------
+# MongoDB
+# ---------------------------------------------------------------------------
+
+def _get(doc: Dict, key: str):
+    value = doc
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def _matches_value(value, condition) -> bool:
+    if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+        for op, arg in condition.items():
+            if op == "$in":
+                if isinstance(value, list):
+                    if not any(v in arg for v in value):
+                        return False
+                elif value not in arg:
+                    return False
+            elif op == "$nin":
+                if (any(v in arg for v in value) if isinstance(value, list) else value in arg):
+                    return False
+            elif op == "$all":
+                if not isinstance(value, list) or not all(a in value for a in arg):
+                    return False
+            elif op == "$gte":
+                if value is None or value < arg:
+                    return False
+            elif op == "$gt":
+                if value is None or value <= arg:
+                    return False
+            elif op == "$lte":
+                if value is None or value > arg:
+                    return False
+            elif op == "$lt":
+                if value is None or value >= arg:
+                    return False
+            elif op == "$ne":
+                if value == arg:
+                    return False
+            elif op == "$exists":
+                if (value is not None) != arg:
+                    return False
+            else:
+                raise NotImplementedError(f"In-memory MongoDB does not support {op}")
+        return True
+
+    if isinstance(value, list) and not isinstance(condition, list):
+        return condition in value
+    return value == condition
+
+def matches(doc: Dict, query: Optional[Dict]) -> bool:
+    return all(_matches_value(_get(doc, key), condition) for key, condition in (query or {}).items())
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return dict(doc)
+    include = {k for k, v in projection.items() if v}
+    if include:
+        result = {}
+        for key in include:
+            value = _get(doc, key)
+            if value is None:
+                continue
+            # Dotted paths keep their nesting, e.g. "tf.word" -> {"tf": {"word": ...}}
+            *parents, leaf = key.split(".")
+            target = result
+            for part in parents:
+                target = target.setdefault(part, {})
+            target[leaf] = value
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {k: v for k, v in doc.items() if k not in projection}
+
+def _apply_update(doc: Dict, update: Dict, inserting: bool):
+    for op, fields in update.items():
+        if op == "$set" or (op == "$setOnInsert" and inserting):
+            doc.update(copy.deepcopy(fields))
+        elif op == "$inc":
+            for key, amount in fields.items():
+                doc[key] = doc.get(key, 0) + amount
+        elif op == "$push":
+            for key, value in fields.items():
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                doc.setdefault(key, []).extend(copy.deepcopy(items))
+        elif op == "$unset":
+            for key in fields:
+                doc.pop(key, None)
+        elif op != "$setOnInsert":
+            raise NotImplementedError(f"In-memory MongoDB does not support {op}")
+
+class _Result:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+class InMemoryCursor:
+    def __init__(self, docs: List[Dict], projection: Optional[Dict] = None):
+        self._docs = docs
+        self._projection = projection
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self._docs.sort(key=lambda d: (_get(d, field) is None, _get(d, field)), reverse=order < 0)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    def _results(self) -> List[Dict]:
+        # Like MongoDB, sort and limit see whole documents; the projection applies to the output
+        docs = self._docs[:self._limit] if self._limit else self._docs
+        return [_project(doc, self._projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        results = self._results()
+        return results[:length] if length else results
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._results():
+            yield doc
+
+class InMemoryCollection:
+    """The subset of the Motor collection API the app uses"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: Dict[Any, Dict] = {}
+        self._next_id = 0
+
+    def _new_id(self):
+        self._next_id += 1
+        return f"{self.name}:{self._next_id}"
+
+    def _find(self, query: Optional[Dict]) -> List[Dict]:
+        if query and set(query) == {"_id"} and not isinstance(query["_id"], dict):
+            doc = self.docs.get(query["_id"])
+            return [doc] if doc is not None else []
+        return [doc for doc in self.docs.values() if matches(doc, query)]
+
+    async def create_index(self, *args, **kwargs):
+        return None
+
+    async def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None):
+        found = self._find(query)
+        return _project(found[0], projection) if found else None
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> InMemoryCursor:
+        return InMemoryCursor(self._find(query), projection)
+
+    async def count_documents(self, query: Optional[Dict] = None) -> int:
+        return len(self._find(query))
+
+    async def insert_one(self, doc: Dict):
+        doc.setdefault("_id", self._new_id())
+        if doc["_id"] in self.docs:
+            raise ValueError(f"Duplicate _id {doc['_id']} in {self.name}")
+        self.docs[doc["_id"]] = copy.deepcopy(doc)
+        return _Result(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: List[Dict], ordered: bool = True):
+        ids = [(await self.insert_one(doc)).inserted_id for doc in docs]
+        return _Result(inserted_ids=ids)
+
+    def _update(self, query: Dict, update: Dict, upsert: bool) -> int:
+        found = self._find(query)
+        if found:
+            _apply_update(found[0], update, inserting=False)
+            return 1
+        if upsert:
+            doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+            doc.setdefault("_id", self._new_id())
+            _apply_update(doc, update, inserting=True)
+            self.docs[doc["_id"]] = doc
+        return 0
+
+    async def update_one(self, query: Dict, update: Dict, upsert: bool = False):
+        return _Result(matched_count=self._update(query, update, upsert))
+
+    async def replace_one(self, query: Dict, doc: Dict, upsert: bool = False):
+        found = self._find(query)
+        if found or upsert:
+            doc = copy.deepcopy(doc)
+            doc.setdefault("_id", found[0]["_id"] if found else query.get("_id", self._new_id()))
+            self.docs[doc["_id"]] = doc
+        return _Result(matched_count=len(found[:1]))
+
+    async def delete_one(self, query: Dict):
+        found = self._find(query)
+        if found:
+            del self.docs[found[0]["_id"]]
+        return _Result(deleted_count=len(found[:1]))
+
+    async def delete_many(self, query: Dict):
+        found = self._find(query)
+        for doc in found:
+            del self.docs[doc["_id"]]
+        return _Result(deleted_count=len(found))
+
+    async def bulk_write(self, requests: List, ordered: bool = True):
+        upserted_ids = {}
+        for idx, request in enumerate(requests):
+            # pymongo's UpdateOne/ReplaceOne/InsertOne keep their arguments in private attributes
+            if hasattr(request, "_upsert"):
+                existed = bool(self._find(request._filter))
+                if any(key.startswith("$") for key in request._doc):
+                    self._update(request._filter, request._doc, request._upsert)
+                else:
+                    await self.replace_one(request._filter, request._doc, request._upsert)
+                if not existed and request._upsert:
+                    upserted_ids[idx] = request._filter.get("_id")
+            else:
+                await self.insert_one(request._doc)
+        return _Result(acknowledged=True, upserted_ids=upserted_ids)
+
+    def aggregate(self, pipeline: List[Dict]):
+        raise NotImplementedError("In-memory MongoDB does not run aggregation pipelines")
+
+class InMemoryDatabase:
+    def __init__(self):
+        self.collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self.collections:
+            self.collections[name] = InMemoryCollection(name)
+        return self.collections[name]
+
+class _Admin:
+    async def command(self, name: str, *args, **kwargs):
+        return {"ok": 1}
+
+class InMemoryMongoClient:
+    """Drop-in for AsyncIOMotorClient as `app.core.database.db.client`"""
+
+    def __init__(self):
+        self.databases: Dict[str, InMemoryDatabase] = {}
+        self.admin = _Admin()
+
+    def __getitem__(self, name: str) -> InMemoryDatabase:
+        if name not in self.databases:
+            self.databases[name] = InMemoryDatabase()
+        return self.databases[name]
+
+    def close(self):
+        pass
+
+# ---------------------------------------------------------------------------
+# Models
+# ---------------------------------------------------------------------------
+
+def _load_audio(audio) -> np.ndarray:
+    if isinstance(audio, np.ndarray):
+        return audio
+    return read_wav(audio)
+
+def _compressed_audio(size: int) -> np.ndarray:
+    """Silence standing in for undecodable live chunks: one second per 8 kB (64 kbit/s Opus)"""
+    return np.zeros(max(size * SAMPLE_RATE // 8000, SAMPLE_RATE // 10), dtype=np.float32)
+
+def _energy_regions(audio: np.ndarray, threshold: float = 0.02, min_silence: float = 0.25) -> List[tuple]:
+    """Speech regions from 30 ms frame energy"""
+    frame = int(0.03 * SAMPLE_RATE)
+    count = len(audio) // frame
+    if not count:
+        return []
+    energy = np.sqrt((audio[:count * frame].reshape(count, frame) ** 2).mean(axis=1))
+    voiced = energy > threshold
+
+    regions = []
+    start = None
+    for idx, is_voiced in enumerate(voiced):
+        t = idx * frame / SAMPLE_RATE
+        if is_voiced and start is None:
+            start = t
+        elif not is_voiced and start is not None:
+            regions.append([start, t])
+            start = None
+    if start is not None:
+        regions.append([start, count * frame / SAMPLE_RATE])
+
+    merged = []
+    for region in regions:
+        if merged and region[0] - merged[-1][1] < min_silence:
+            merged[-1][1] = region[1]
+        else:
+            merged.append(region)
+    return [tuple(region) for region in merged]
+
+class StubVADService(VADService):
+    """Energy VAD producing a real SpeechMap"""
+
+    def compute(self, audio_path: str) -> Optional[SpeechMap]:
+        audio = _load_audio(audio_path)
+        regions = _energy_regions(audio)
+        speech = (
+            np.concatenate([audio[int(s * SAMPLE_RATE):int(e * SAMPLE_RATE)] for s, e in regions])
+            if regions else np.zeros(0, dtype=np.float32)
+        )
+        return SpeechMap(regions, speech, len(audio) / SAMPLE_RATE)
+
+class StubTranscriptionService(TranscriptionService):
+    """
+    Whisper stand-in emitting one synthetic segment per ``segment_seconds`` of audio
+
+    ``rtf`` simulates model cost by sleeping ``rtf`` seconds per audio second
+    (0 measures pure framework overhead).
+    """
+
+    def __init__(self, model_size: str = "base", rtf: float = 0.0, segment_seconds: float = 5.0):
+        super().__init__(model_size)
+        self.rtf = rtf
+        self.segment_seconds = segment_seconds
+
+    def _load_model(self):
+        return None
+
+    @staticmethod
+    def decode(source) -> np.ndarray:
+        if isinstance(source, (bytes, bytearray)):
+            return _compressed_audio(len(source))
+        if isinstance(source, str) and not source.endswith(".wav"):
+            # Spilled live audio
+            return _compressed_audio(os.path.getsize(source))
+        return _load_audio(source)
+
+    def transcribe_audio(self, audio_path, language: str = None, task: str = "transcribe", beam_size: int = 5, speech=None) -> Dict:
+        audio = speech.audio if speech is not None else _load_audio(audio_path)
+        duration = len(audio) / SAMPLE_RATE
+        if self.rtf:
+            time.sleep(duration * self.rtf)
+
+        rng = np.random.default_rng(len(audio))
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.segment_seconds, duration)
+            segments.append({
+                "id": len(segments),
+                "start": start,
+                "end": end,
+                "text": synthetic_text(rng, int(self.segment_seconds * 2.5))
+            })
+            start = end
+
+        if speech is not None:
+            speech.remap_segments(segments)
+
+        return {
+            "text": " ".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": language or "en",
+            "language_probability": 1.0 if language else 0.95
+        }
+
+    def stream_segments(self, audio_path, language: str = None, task: str = "transcribe", beam_size: int = 5, speech=None):
+        result = self.transcribe_audio(audio_path, language, task, beam_size, speech)
+        return iter(result["segments"]), result["language"]
+
+class StubDiarizationService(DiarizationService):
+    """Pyannote stand-in splitting audio into fixed-length turns, round-robin speakers"""
+
+    def __init__(self, speakers: int = 2, turn_seconds: float = 8.0):
+        super().__init__(None)
+        self.speakers = speakers
+        self.turn_seconds = turn_seconds
+
+    def identify_speakers(self, audio_path, num_speakers: int = None, min_speakers: int = 1, max_speakers: int = 10, speech=None) -> List[Dict]:
+        audio = speech.audio if speech is not None else _load_audio(audio_path)
+        duration = len(audio) / SAMPLE_RATE
+        turns = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.turn_seconds, duration)
+            turns.append({"speaker": f"Speaker {len(turns) % self.speakers + 1}", "start": start, "end": end})
+            start = end
+        return speech.remap_turns(turns) if speech is not None else turns
+
+# ---------------------------------------------------------------------------
+# LLM clients
+# ---------------------------------------------------------------------------
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+
+class _Choice:
+    def __init__(self, content: str):
+        self.message = _Message(content)
+
+class _Completion:
+    def __init__(self, content: str):
+        self.choices = [_Choice(content)]
+
+class _Completions:
+    def __init__(self, content: str, latency: float):
+        self.content = content
+        self.latency = latency
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        return _Completion(self.content)
+
+class _Chat:
+    def __init__(self, completions: _Completions):
+        self.completions = completions
+
+class StubLLMClient:
+    """OpenAI/Groq client stand-in answering after a fixed latency"""
+
+    def __init__(self, content: str, latency: float = 0.0):
+        self.chat = _Chat(_Completions(content, latency))
+
+class _Delta:
+    def __init__(self, content: str):
+        self.content = content
+
+class _ChunkChoice:
+    def __init__(self, content: str):
+        self.delta = _Delta(content)
+
+class _Chunk:
+    def __init__(self, content: str):
+        self.choices = [_ChunkChoice(content)]
+
+class _AsyncStream:
+    def __init__(self, content: str, latency: float):
+        # Word-sized tokens, the first after `latency` and the rest spread over it
+        self.tokens = [word + " " for word in content.split()]
+        self.latency = latency
+        self.closed = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.latency)
+        for token in self.tokens:
+            if self.closed:
+                return
+            yield _Chunk(token)
+            await asyncio.sleep(self.latency / max(1, len(self.tokens)))
+
+    async def close(self):
+        self.closed = True
+
+class _AsyncCompletions:
+    def __init__(self, content: str, latency: float):
+        self.content = content
+        self.latency = latency
+
+    async def create(self, stream: bool = False, **kwargs):
+        if stream:
+            return _AsyncStream(self.content, self.latency)
+        await asyncio.sleep(self.latency)
+        return _Completion(self.content)
+
+class AsyncStubLLMClient:
+    """AsyncGroq stand-in; streamed answers arrive word by word"""
+
+    def __init__(self, content: str, latency: float = 0.0):
+        self.chat = _Chat(_AsyncCompletions(content, latency))
+
+STUB_SUMMARY = (
+    '{"summary": "The team reviewed the release plan and agreed on the next milestone.", '
+    '"key_points": ["Release plan", "Milestone"], '
+    '"action_items": [{"task": "Update the roadmap", "assignee": "Speaker 1", "priority": "high"}]}'
+)
+
+STUB_ANSWER = "The team agreed to ship the release after the staging review next week."
+
+# ---------------------------------------------------------------------------
+# Installation
+# ---------------------------------------------------------------------------
+
+def use_temp_storage() -> tempfile.TemporaryDirectory:
+    """
+    Point the upload, archive, export, live spill and artifact directories at a
+    temporary directory so runs leave nothing in the working directory
+
+    Call before the API routers are imported (they create their directories
+    at import); the directory is removed by `cleanup()` or at exit.
+    """
+    from app.core.config import settings
+
+    storage = tempfile.TemporaryDirectory(prefix="transcripter-bench-")
+    for name in ("AUDIO_HOT_DIR", "AUDIO_ARCHIVE_DIR", "EXPORT_DIR", "STREAM_SPILL_DIR", "ARTIFACT_DIR"):
+        setattr(settings, name, os.path.join(storage.name, name.lower()))
+    return storage
+
+def install(stub_models: bool = True, model_rtf: float = 0.0, llm_latency: float = 0.0, speakers: int = 2) -> InMemoryMongoClient:
+    """
+    Point the app's database, LLM clients and (optionally) models at the stand-ins
+
+    Args:
+        stub_models: Replace Whisper, Pyannote and the VAD; False keeps the real models
+        model_rtf: Simulated transcription cost in seconds per audio second
+        llm_latency: Simulated LLM response time in seconds
+        speakers: Speakers produced by the stub diarizer
+
+    Returns:
+        The in-memory Mongo client now serving `get_collection`
+    """
+    from app.core import database
+    from app.core.config import settings
+    from app.services import (
+        chatbot_service,
+        diarization_service,
+        summary_service,
+        transcription_service,
+        vad_service
+    )
+
+    client = InMemoryMongoClient()
+    database.db.client = client
+    settings.MODEL_SERVER_SOCKET = None
+    # Every iteration should measure the stages, not artifact reuse
+    settings.ARTIFACTS_ENABLED = False
+
+    if stub_models:
+        sizes = {settings.WHISPER_MODEL, settings.WHISPER_LIVE_MODEL, *settings.WHISPER_MODEL_LADDER.split(",")}
+        for size in sizes:
+            size = size.strip()
+            transcription_service._transcription_services[size] = StubTranscriptionService(size, model_rtf)
+        diarization_service._diarization_service = StubDiarizationService(speakers)
+        vad_service._vad_service = StubVADService()
+
+    summary_service.get_summary_service().client = StubLLMClient(STUB_SUMMARY, llm_latency)
+    chatbot_service.get_chatbot_service().client = StubLLMClient(STUB_ANSWER, llm_latency)
+    chatbot_service.get_chatbot_service().async_client = AsyncStubLLMClient(STUB_ANSWER, llm_latency)
+    return client
@@ -0,0 +1,135 @@
+"""
+Synthetic benchmark data
+Deterministic audio, transcript segments and diarization turns at several sizes
+"""
+import os
+import wave
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+EMOTIONS = ["neutral", "happy", "sad", "angry", "stressed", "surprised"]
+
+# Mix of meeting vocabulary and function words so keyword and search code see realistic text
+VOCABULARY = (
+    "the a and to of we will it is that for on this be with as have are you our "
+    "project deadline budget release customer meeting review team design roadmap "
+    "milestone estimate priority risk dependency deployment migration database "
+    "latency throughput pipeline transcription speaker analytics dashboard report "
+    "quarter revenue forecast hiring onboarding contract invoice vendor support "
+    "ticket incident outage postmortem action item follow decided agreed important "
+    "critical must schedule sprint backlog feature bug fix test staging production "
+    "server client api endpoint model training inference accuracy benchmark memory"
+).split()
+
+@dataclass
+class Size:
+    name: str
+    audio_minutes: float
+    segments: int
+    speakers: int
+
+SIZES: Dict[str, Size] = {
+    "small": Size("small", 2, 100, 2),
+    "medium": Size("medium", 15, 2000, 4),
+    "large": Size("large", 60, 20000, 8)
+}
+
+def synthetic_text(rng: np.random.Generator, words: int) -> str:
+    """Zipf-distributed words so a few terms dominate, as in real speech"""
+    ranks = np.minimum(rng.zipf(1.3, size=words), len(VOCABULARY)) - 1
+    return " ".join(VOCABULARY[r] for r in ranks).capitalize() + "."
+
+def synthetic_segments(count: int, duration: float, speakers: int, seed: int = 0) -> List[Dict]:
+    """Transcript segments in the shape stored on sessions"""
+    rng = np.random.default_rng(seed)
+    step = duration / max(count, 1)
+    segments = []
+    speaker = 0
+
+    for idx in range(count):
+        # Speakers hold the floor for a few segments at a time
+        if rng.random() < 0.3:
+            speaker = int(rng.integers(speakers))
+        start = idx * step
+        segments.append({
+            "id": idx,
+            "text": synthetic_text(rng, int(rng.integers(4, 25))),
+            "start_time": round(start, 3),
+            "end_time": round(start + step * float(rng.uniform(0.6, 0.95)), 3),
+            "speaker": f"Speaker {speaker + 1}",
+            "emotion": EMOTIONS[int(rng.integers(len(EMOTIONS)))],
+            "confidence": 0.9
+        })
+    return segments
+
+def synthetic_turns(segments: List[Dict], seed: int = 0) -> List[Dict]:
+    """Diarization turns covering the segments with jittered boundaries"""
+    rng = np.random.default_rng(seed + 1)
+    turns = []
+    for seg in segments:
+        jitter = float(rng.normal(0, 0.2))
+        if turns and turns[-1]["speaker"] == seg["speaker"]:
+            turns[-1]["end"] = seg["end_time"] + jitter
+        else:
+            turns.append({
+                "speaker": seg["speaker"],
+                "start": max(seg["start_time"] + jitter, 0.0),
+                "end": seg["end_time"] + jitter
+            })
+    return turns
+
+def synthetic_waveform(seconds: float, speakers: int = 2, seed: int = 0, chunk_seconds: float = 60.0):
+    """
+    Yield 16 kHz float32 chunks of alternating voiced bursts and silence
+
+    Each speaker has its own pitch so spectral embeddings can tell them
+    apart; roughly a third of the signal is silence for VAD to remove.
+    """
+    rng = np.random.default_rng(seed)
+    pitches = np.linspace(110, 260, speakers)
+    total = int(seconds * SAMPLE_RATE)
+    produced = 0
+    pending = np.zeros(0, dtype=np.float32)
+
+    while produced < total:
+        while len(pending) < chunk_seconds * SAMPLE_RATE and produced + len(pending) < total:
+            burst = int(rng.uniform(1.5, 6.0) * SAMPLE_RATE)
+            gap = int(rng.uniform(0.3, 3.0) * SAMPLE_RATE)
+            t = np.arange(burst) / SAMPLE_RATE
+            f0 = pitches[int(rng.integers(speakers))]
+            voiced = sum(np.sin(2 * np.pi * f0 * h * t) / h for h in range(1, 6))
+            envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)  # syllable-rate modulation
+            burst_audio = 0.2 * voiced * envelope + 0.01 * rng.standard_normal(burst)
+            silence = 0.002 * rng.standard_normal(gap)
+            pending = np.concatenate([pending, burst_audio.astype(np.float32), silence.astype(np.float32)])
+
+        take = min(len(pending), total - produced, int(chunk_seconds * SAMPLE_RATE))
+        yield pending[:take]
+        pending = pending[take:]
+        produced += take
+
+def write_wav(path: str, seconds: float, speakers: int = 2, seed: int = 0) -> str:
+    """Write a synthetic recording as 16-bit PCM WAV (cached by path)"""
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with wave.open(tmp_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for chunk in synthetic_waveform(seconds, speakers, seed):
+            wav.writeframes((np.clip(chunk, -1, 1) * 32767).astype(np.int16).tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+def read_wav(path: str) -> np.ndarray:
+    """Read a 16-bit mono WAV as a float32 waveform"""
+    with wave.open(path, "rb") as wav:
+        frames = wav.readframes(wav.getnframes())
+    return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
@@ -2,12 +2,23 @@
 AI-Powered Real-Time Transcription & Intelligence System 
 Main FastAPI application entry point  
 """
+import asyncio
 import uvicorn 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware 
+from fastapi.middleware.gzip import GZipMiddleware
 from app.core.config import settings 
-from app.api import transcription, analytics, chatbot, export 
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.concurrency import get_admission_controller
+from app.core.metrics import mark_worker_exit, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.api import transcription, analytics, chatbot, export, search, glossary, profiling
+from app.core.database import connect_to_mongo, close_mongo_connection, db
+from app.services.search_service import get_search_service
+from app.services.keyword_service import get_keyword_service
+from app.services.org_analytics_service import get_org_analytics_service
+from app.services.prewarm_service import get_prewarm_service
+from app.services.audio_storage import get_audio_storage
 
 app = FastAPI(
     title="AI Transcription Intelligence System",
@@ -24,15 +35,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads (session documents, search results)
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_BYTES)
+
+# Opt-in request profiling; not installed at all unless an admin token is configured
+if settings.PROFILE_ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
 # Database lifecycle  
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo() 
+    await get_search_service().ensure_indexes()
+    await get_keyword_service().ensure_indexes()
+    await get_org_analytics_service().ensure_indexes()
+
+# Model prewarming runs in the background; /ready reports when it is done
+@app.on_event("startup")
+async def prewarm_models():
+    asyncio.get_running_loop().run_in_executor(None, get_prewarm_service().run)
+
+# Audio retention (archive, evict, clean exports) runs as a background loop
+_retention_task = None
+
+@app.on_event("startup")
+async def start_audio_retention():
+    global _retention_task
+    if settings.AUDIO_RETENTION_ENABLED:
+        await get_audio_storage().ensure_indexes()
+        _retention_task = asyncio.create_task(get_audio_storage().run_forever())
+
+@app.on_event("shutdown")
+async def stop_audio_retention():
+    if _retention_task is not None:
+        _retention_task.cancel()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     await close_mongo_connection()
 
+# Admission gauges are published as they change; start from this worker's limits
+@app.on_event("startup")
+async def publish_admission_limits():
+    get_admission_controller()
+
+@app.on_event("shutdown")
+async def remove_worker_metrics():
+    mark_worker_exit()
+
 # Health check 
 @app.get("/")
 async def root(): 
@@ -42,11 +92,38 @@ async def root():
         "version": "1.0.0"
     }
 
+# Readiness check (models warmed and database reachable)
+@app.get("/ready")
+async def ready():
+    prewarm = get_prewarm_service()
+    checks = {"models": prewarm.describe(), "database": "ok"}
+
+    try:
+        await db.client.admin.command("ping")
+    except Exception as e:
+        checks["database"] = f"error: {str(e)}"
+
+    is_ready = prewarm.ready and checks["database"] == "ok"
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "starting", **checks}
+    )
+
+# Prometheus metrics (stage timings, RTF, model loads, queues, caches, LLM latency);
+# run several workers only with PROMETHEUS_MULTIPROC_DIR set (see app/core/metrics.py)
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # Include routers  
 app.include_router(transcription.router, prefix="/api/transcription", tags=["Transcription"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
 app.include_router(chatbot.router, prefix="/api/chatbot", tags=["Chatbot"])
 app.include_router(export.router, prefix="/api/export", tags=["Export"]) 
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
+app.include_router(glossary.router, prefix="/api/glossary", tags=["Glossary"])
+app.include_router(profiling.router, prefix="/api/profiles", tags=["Profiling"])
 
 if __name__ == "__main__":
     uvicorn.run(